@@ -1,18 +1,31 @@
 # backend/api/endpoints.py
+import asyncio
+import json
 import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from requests import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from backend.crewai.crew_products import scrape_store_products
-from backend.crewai.crew_stores import discover_stores
-from backend.crewai.db.session import get_db
-from backend.crewai.models.affiliate_store import AffiliateStore
+from backend.api.response_cache import cached_json, response_cache
+from backend.crewai.db.job_events import list_job_events
+from backend.crewai.db.listing import MAX_PAGE_SIZE, list_products, list_stores
+from backend.crewai.db.product_search import (MAX_SEARCH_RESULTS,
+                                              search_products)
+from backend.crewai.db.session import (AsyncSessionLocal, get_async_db, get_db,
+                                       pool_stats)
+from backend.crewai.jobs import submit_job
+from backend.crewai.models.crew_job import CrewJob
 from backend.crewai.schemas.affiliate_store import AffiliateStoreInDB
+from backend.crewai.schemas.crew_job import (CrewJobResult, CrewJobStatus,
+                                             ProductBatchRequest)
 # Importe o logger
 from backend.crewai.tools.debug_logger import setup_logger
+from backend.startup import load_crews, startup_report, uptime
 
 # Configure o nível do logger
 LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
@@ -20,14 +33,12 @@ logger = setup_logger(level=LOG_LEVEL)
 
 router = APIRouter(prefix="/api")
 
-@router.get("/stores", response_model=dict, status_code=200)
-def discover_affiliate_stores(
-    pais: str = Query(..., description="País (ex: BR)"),
-    nicho: str = Query(..., description="Nicho de mercado"),
-    periodo: str = Query(..., description="Período de análise")
-):
-    logger.debug(f"[endpoint:discover_affiliate_stores] Parâmetros recebidos: {locals()}")
+# Intervalo de leitura de novos eventos de um job e de envio de comentários de keep-alive
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_HEARTBEAT_SECONDS = 15
 
+
+def _validate_store_params(pais: str, nicho: str, periodo: str):
     if not pais or len(pais.strip()) != 2:
         raise HTTPException(status_code=400, detail="País inválido. Deve ser uma sigla de 2 letras.")
 
@@ -37,8 +48,34 @@ def discover_affiliate_stores(
     if not periodo:
         periodo = datetime.now().year
 
+    return periodo
+
+
+@router.get("/health")
+def health():
+    """
+    Verificaçao de saúde: não toca no banco nem carrega as crews.
+    """
+    return {
+        "status": "ok",
+        "uptime": uptime(),
+        "startup": startup_report(),
+        "response_cache": response_cache.stats(),
+        "db_pools": pool_stats(),
+    }
+
+@router.get("/stores", response_model=dict, status_code=200)
+def discover_affiliate_stores(
+    pais: str = Query(..., description="País (ex: BR)"),
+    nicho: str = Query(..., description="Nicho de mercado"),
+    periodo: str = Query(..., description="Período de análise")
+):
+    logger.debug(f"[endpoint:discover_affiliate_stores] Parâmetros recebidos: {locals()}")
+
+    periodo = _validate_store_params(pais, nicho, periodo)
+
     try:
-        resultado = discover_stores(pais, nicho, periodo)
+        resultado = load_crews().discover_stores(pais, nicho, periodo)
         return  resultado
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
@@ -48,27 +85,229 @@ def scrape_products(
     loja: str = Query(..., description="Nome da loja"),
     url: str = Query(..., description="URL da loja"),
     nicho: str = Query(..., description="Nicho a buscar"),
-    quantidade: str = Query(..., description="Quantidade de produtos")
+    quantidade: int = Query(..., gt=0, description="Quantidade de produtos")
 ):
     logger.debug(f"[endpoint:scrape_products] Parâmetros recebidos: {locals()}")
 
-    resultado = scrape_store_products(
+    resultado = load_crews().scrape_store_products(
         loja_url=url, 
         nicho_busca= nicho, 
         quantidade_produtos= quantidade
     )
     return resultado
 
-@router.get("/list", response_model=List[AffiliateStoreInDB])
-def list_affiliate_stores(
+@router.post("/jobs/stores", response_model=CrewJobStatus, status_code=202)
+def submit_discover_stores_job(
+    pais: str = Query(..., description="País (ex: BR)"),
+    nicho: str = Query(..., description="Nicho de mercado"),
+    periodo: str = Query(..., description="Período de análise"),
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    db: Session = Depends(get_db),
+):
+    """
+    Enfileira a descoberta de lojas e retorna o job imediatamente. Reenvios com o
+    mesmo cabeçalho Idempotency-Key devolvem o job já criado.
+    """
+    logger.debug(f"[endpoint:submit_discover_stores_job] Parâmetros recebidos: {locals()}")
+
+    periodo = _validate_store_params(pais, nicho, periodo)
+    return submit_job("stores", {"pais": pais, "nicho": nicho, "periodo": periodo}, db, idempotency_key)
+
+@router.post("/jobs/products", response_model=CrewJobStatus, status_code=202)
+def submit_scrape_products_job(
+    loja: str = Query(..., description="Nome da loja"),
+    url: str = Query(..., description="URL da loja"),
+    nicho: str = Query(..., description="Nicho a buscar"),
+    quantidade: int = Query(..., gt=0, description="Quantidade de produtos"),
+    idempotency_key: Optional[str] = Header(None, max_length=128),
     db: Session = Depends(get_db),
-    skip: int = 0, 
-    limit: int = 100,
 ):
+    """
+    Enfileira a raspagem de produtos de uma loja e retorna o job imediatamente
+    (com o mesmo Idempotency-Key de /jobs/stores).
+    """
+    logger.debug(f"[endpoint:submit_scrape_products_job] Parâmetros recebidos: {locals()}")
+
+    params = {"loja_url": url, "nicho_busca": nicho, "quantidade_produtos": quantidade}
+    return submit_job("products", params, db, idempotency_key)
+
+@router.post("/jobs/products/batch", response_model=CrewJobStatus, status_code=202)
+def submit_scrape_products_batch_job(
+    batch: ProductBatchRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    db: Session = Depends(get_db),
+):
+    """
+    Enfileira a raspagem de várias lojas (ou de todas as lojas afiliadas ativas),
+    executadas em paralelo, uma por processo, com tempo máximo por loja. O resultado
+    do job agrega o status e o resultado de cada loja.
+    """
+    logger.debug(f"[endpoint:submit_scrape_products_batch_job] Parâmetros recebidos: {batch}")
+
+    params = {
+        "lojas": [
+            {"loja_url": loja.url, "nicho_busca": loja.nicho, "quantidade_produtos": loja.quantidade}
+            for loja in batch.lojas
+        ],
+        "todas_ativas": batch.todas_ativas,
+        "nicho_busca": batch.nicho,
+        "quantidade_produtos": batch.quantidade,
+        "timeout": batch.timeout,
+    }
+    return submit_job("products_batch", params, db, idempotency_key)
+
+@router.get("/jobs/{job_id}", response_model=CrewJobStatus)
+async def get_job_status(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(CrewJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return job
+
+@router.get("/jobs/{job_id}/result", response_model=CrewJobResult)
+async def get_job_result(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(CrewJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    if job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job ainda em execução (status: {job.status}).")
+    return job
+
+async def _read_job_events(job_id: str, after_id: int):
+    async with AsyncSessionLocal() as db:
+        job = await db.get(CrewJob, job_id)
+        events = await db.run_sync(lambda session: list_job_events(job_id, session, after_id=after_id))
+        return job.status if job else None, [(e.id, e.type, e.data) for e in events]
+
+
+async def _job_event_stream(job_id: str, after_id: int) -> AsyncIterator[str]:
+    last_sent = time.monotonic()
+    while True:
+        status, events = await _read_job_events(job_id, after_id)
+        for event_id, event_type, data in events:
+            after_id = event_id
+            payload = json.dumps(data or {}, ensure_ascii=False)
+            yield f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+            last_sent = time.monotonic()
+        if status in (None, "succeeded", "failed") and not events:
+            return
+        if time.monotonic() - last_sent >= JOB_EVENTS_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    after: int = Query(0, description="Enviar apenas eventos com id maior que este"),
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Transmite o progresso do job (Server-Sent Events): início e fim de tarefas,
+    passos dos agentes, produtos extraídos e o fim do job. Ao reconectar, o
+    navegador envia Last-Event-ID e a transmissão continua de onde parou.
+    """
+    if await db.get(CrewJob, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    return StreamingResponse(
+        _job_event_stream(job_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _run_query(db: AsyncSession, query, **kwargs):
+    # As consultas de backend/crewai/db usam a API síncrona; run_sync as executa na
+    # conexão assíncrona, sem ocupar uma thread do pool
+    try:
+        return await db.run_sync(lambda session: query(db=session, **kwargs))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+async def _page(db: AsyncSession, list_page, **kwargs):
+    rows, next_cursor = await _run_query(db, list_page, **kwargs)
+    return rows, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+# O modelo descreve a projeção padrão; com fields= só os campos pedidos são devolvidos
+@router.get("/list", response_model=List[AffiliateStoreInDB])
+async def list_affiliate_stores(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    platform: Optional[str] = Query(None, description="Filtra pela plataforma"),
+    active: Optional[bool] = Query(None, description="Filtra por lojas ativas/inativas"),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    skip: int = Query(0, ge=0, description="Linhas puladas (compatibilidade; prefira cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Lista as lojas afiliadas salvas no banco de dados, das mais recentes para as
+    mais antigas. A próxima página é pedida com o cursor do cabeçalho X-Next-Cursor,
+    ausente na última página; skip continua aceito para clientes antigos, mas não
+    junto com cursor. A resposta fica em cache até a próxima gravação de lojas e
+    responde 304 a If-None-Match com o ETag atual.
+    """
     logger.debug(f"[endpoint:list_affiliate_stores] Parâmetros recebidos: {locals()}")
 
+    return await cached_json(request, ("stores",), lambda: _page(
+        db, list_stores, platform=platform, active=active, fields=fields, cursor=cursor, limit=limit, skip=skip
+    ))
+
+@router.get("/products/list", response_model=List[Dict[str, Any]])
+async def list_saved_products(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    platform: Optional[str] = Query(None, description="Filtra pela plataforma"),
+    category: Optional[str] = Query(None, description="Filtra pela categoria"),
+    affiliate_store_id: Optional[int] = Query(None, description="Filtra pela loja"),
+    available: Optional[bool] = Query(None, description="Filtra por disponibilidade"),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula (description só se pedido)"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Lista os produtos salvos, dos mais recentes para os mais antigos, com a mesma
+    paginação por cursor e o mesmo cache de /list.
+    """
+    logger.debug(f"[endpoint:list_saved_products] Parâmetros recebidos: {locals()}")
+
+    return await cached_json(request, ("products",), lambda: _page(
+        db,
+        list_products,
+        platform=platform,
+        category=category,
+        affiliate_store_id=affiliate_store_id,
+        available=available,
+        fields=fields,
+        cursor=cursor,
+        limit=limit,
+    ))
+
+@router.get("/products/search", response_model=List[Dict[str, Any]])
+async def search_saved_products(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Palavras buscadas no título, marca e descrição"),
+    platform: Optional[str] = Query(None, description="Filtra pela plataforma"),
+    affiliate_store_id: Optional[int] = Query(None, description="Filtra pela loja"),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Lista as lojas afiliadas salvas no banco de dados.
+    Busca textual nos produtos salvos, pelo índice de texto completo, com os mais
+    relevantes primeiro (campo score).
     """
-    stores = db.query(AffiliateStore).offset(skip).limit(limit).all()
-    return stores
\ No newline at end of file
+    logger.debug(f"[endpoint:search_saved_products] Parâmetros recebidos: {locals()}")
+
+    async def build():
+        rows = await _run_query(
+            db, search_products, q=q, platform=platform, affiliate_store_id=affiliate_store_id,
+            fields=fields, limit=limit,
+        )
+        return rows, {}
+
+    return await cached_json(request, ("products",), build)
@@ -0,0 +1,149 @@
+# backend/api/response_cache.py
+"""
+Cache das respostas das rotas de leitura, com ETag e respostas 304.
+
+Cada resposta depende de um ou mais conjuntos de dados ("stores", "products") cujas
+versões são incrementadas pelas rotinas de gravação em backend/crewai/db. O ETag é
+derivado dessas versões e da URL pedida, então:
+
+- se o cliente manda If-None-Match com o ETag atual, a resposta é 304 sem corpo;
+- se a mesma URL já foi servida nesta versão, o corpo já serializado é reaproveitado;
+- só quando os dados mudaram a rota consulta o banco e serializa de novo.
+
+As versões são lidas no máximo uma vez por DATA_VERSION_TTL, então a maior parte
+das consultas repetidas não toca no banco. A serialização usa orjson quando ele
+está instalado.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from backend.crewai.db.data_versions import get_data_versions
+
+try:
+    import orjson
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder)
+except ImportError:  # pragma: no cover - orjson vem com as dependências do projeto
+    import json
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+
+# Cabeçalhos da resposta original guardados junto com o corpo
+CACHED_HEADERS = ("X-Next-Cursor",)
+
+# Conteúdo e cabeçalhos extras produzidos pela rota
+Built = Tuple[Any, Dict[str, str]]
+
+
+class ResponseCache:
+    """
+    LRU de corpos já serializados, por URL. Uma entrada de versão antiga é
+    descartada quando a mesma URL é pedida de novo.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str, etag: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, etag: str, body: bytes, headers: Dict[str, str]) -> None:
+        with self._lock:
+            self._entries[key] = (etag, body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _request_key(request: Request) -> str:
+    # Reencoded, so "a=x&b=y" and "a=x%26b%3Dy" never share a key
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+async def _etag(key: str, resources: Sequence[str]) -> str:
+    versions = await get_data_versions(resources)
+    tag = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return f'W/"{"-".join(str(versions[r]) for r in resources)}-{tag}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+async def cached_json(
+    request: Request,
+    resources: Sequence[str],
+    build: Callable[[], Awaitable[Built]],
+) -> Response:
+    """
+    Responde com o JSON produzido por `build`, reaproveitando a resposta anterior
+    enquanto as versões de `resources` não mudarem.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        content, headers = await build()
+        return Response(dumps(content), media_type="application/json", headers=headers)
+
+    key = _request_key(request)
+    etag = await _etag(key, resources)
+    # no-cache: o cliente pode guardar, mas revalida sempre com If-None-Match
+    common = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=common)
+
+    cached = response_cache.get(key, etag)
+    if cached is not None:
+        body, headers = cached
+    else:
+        content, extra = await build()
+        body = dumps(content)
+        headers = {h: extra[h] for h in CACHED_HEADERS if h in extra}
+        response_cache.put(key, etag, body, headers)
+
+    return Response(body, media_type="application/json", headers={**headers, **common})
@@ -1,18 +1,21 @@
 # backend/crewai/agents.py
 from crewai import Agent
 from crewai_tools import (
-    ScrapeWebsiteTool, 
     # SeleniumScrapingTool, 
     SerperDevTool
     )
 
+from backend.crewai.my_llm import MyLLM
 from backend.crewai.tools.tools import (
+    CachedScrapeWebsiteTool,
     insert_affiliate_stores_tool,
     insert_product_list_tool,
     read_website_content
     )
 from backend.crewai.tools.autodetect_product_selectors_tool  import autodetect_product_selectors
 from backend.crewai.tools.count_html_structures_tool import count_repeated_html_structures 
+from backend.crewai.tools.html_digest_tool import read_html_digest
+from backend.crewai.tools.product_pages_tool import fetch_product_pages
 
 serper_tool = SerperDevTool(
     country="br",
@@ -20,7 +23,8 @@ serper_tool = SerperDevTool(
     n_results=20,
 )
 # selenium_tool = SeleniumScrapingTool()
-scraper_tool = ScrapeWebsiteTool()
+scraper_tool = CachedScrapeWebsiteTool()
+my_llm = MyLLM()
 
 store_researcher = Agent(
     role='Affiliate Program Store Researcher',
@@ -30,6 +34,7 @@ store_researcher = Agent(
     'marketing. You use search engines, affiliate directories, and social ' \
     'signals to find high-potential stores within specified niches and ' \
     'regions.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -43,6 +48,7 @@ store_curator = Agent(
     'You are an expert in affiliate program evaluation, known for your ' \
     'critical eye. You assess trustworthiness, commission percentages, and '
     'market feedback to select only the most profitable and reliable stores.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -54,6 +60,7 @@ public_api_searcher = Agent(
     'You are an able website researcher specilized in finding public api' \
     'givem a existing store.',
     tools=[serper_tool],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -64,6 +71,7 @@ output_formatter = Agent(
     backstory=
     'You are a data format expert that identifies all aspect needed to ' \
     'create well formatted documents in any file type formats.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -78,6 +86,7 @@ database_inserter = Agent(
     'into the systems backend.  You work with precision, especially when ' \
     'dealing with store credentials and product attributes',
     tools=[insert_affiliate_stores_tool],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -91,6 +100,7 @@ product_trend_analyst = Agent(
     'You specialize in analyzing search trends and customer behavior. You ' \
     'use tools like Google Trends, search APIs, and market data to identify ' \
     'trending products in specific niches.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -104,6 +114,7 @@ product_scraper = Agent(
     'You are a web crawler specialized in extracting structured data from ' \
     'online stores. You follow guidelines to ensure data consistency and ' \
     'relevance for affiliate business strategies.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -111,6 +122,7 @@ product_scraper = Agent(
 product_structure_analyst = Agent(
     role='Especialista em Estrutura de E-commerce',
     goal='Detectar padrões e estruturas de produto em páginas HTML de e-commerce',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=True,
     backstory=(
@@ -126,6 +138,7 @@ ecommerce_structure_specialist = Agent(
     role="Scraper Inteligente",
     goal="Detectar automaticamente seletores de produto em e-commerce",
     backstory="Você é um especialista em formatação de frontend de ecommerce",
+    llm=my_llm.GTP4o_mini,
     tools=[autodetect_product_selectors]
 )
 
@@ -138,7 +151,8 @@ store_navigator_agent = Agent(
     'Você é um especialista em automaçao de navegaçao web e interaçao com formulários de busca. '
     'Sua expertise inclui superar desafios comuns como pop-ups, CAPTCHAs, e diferentes layouts de site '
     'para garantir o acesso eficiente aos resultados de busca. Você é o ponto de entrada para a coleta de dados.',
-    tools=[scraper_tool, read_website_content],
+    tools=[read_html_digest, scraper_tool, read_website_content],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -152,7 +166,8 @@ product_listing_agent = Agent(
     'Você é um extrator de dados altamente proficiente, especializado em identificar e coletar links '
     'de listagens de produtos em páginas de resultados de busca. Sua habilidade em lidar com diferentes '
     'estruturas HTML e mecanismos de paginaçao garante que todos os URLs necessários sejam capturados com precisao.',
-    tools=[scraper_tool, read_website_content],
+    tools=[read_html_digest, scraper_tool, read_website_content],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -167,7 +182,8 @@ product_detail_extractor_agent = Agent(
     'Sua especialidade é o deep scraping, capaz de mergulhar em páginas individuais de produtos para '
     'extrair dados estruturados e semi-estruturados. Você é mestre em adaptar-se a diferentes layouts de '
     'lojas online, identificando e recuperando os elementos específicos de cada produto com alta precisao.',
-    tools=[scraper_tool, read_website_content],
+    tools=[fetch_product_pages, scraper_tool, read_website_content],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -181,6 +197,7 @@ product_data_curator_agent = Agent(
     'Você é um engenheiro de dados metódico e preciso. Sua funçao é transformar dados brutos '
     'em informações limpas e padronizadas. Você aplica regras de validaçao, remove inconsistências, '
     'converte tipos de dados e garante que cada campo esteja no formato ideal para consumo por sistemas de afiliados.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -195,6 +212,7 @@ affiliate_output_formatter_agent = Agent(
     'Sua expertise reside em pegar informações processadas e apresentá-las em um formato que seja '
     'facilmente consumível por outras aplicações, garantindo que a saída seja precisa, completa e '
     'pronta para uso em uma loja de afiliados.',
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
@@ -207,6 +225,7 @@ product_database_inserter_agent = Agent(
         'validar a estrutura de cada item e inserir no banco de forma eficiente e segura.'
     ),
     tools=[insert_product_list_tool],
+    llm=my_llm.GTP4o_mini,
     verbose=True,
     memory=False
 )
\ No newline at end of file
@@ -0,0 +1,178 @@
+# backend/crewai/batch.py
+"""
+Raspagem de produtos de várias lojas em paralelo, uma loja por processo.
+
+Cada loja roda scrape_store_products num processo próprio (contexto spawn: o
+processo da API tem threads, e fork com threads não é seguro para Playwright e
+Selenium). O processo é usado em vez de um ProcessPoolExecutor porque uma loja que
+estoura BATCH_STORE_TIMEOUT precisa ser encerrada (terminate) sem derrubar as
+demais, o que um pool não permite.
+
+BATCH_MAX_PROCESSES limita os processos de todos os lotes em execução no mesmo
+processo (API ou worker), não só os de um lote.
+
+Cada filho abre a própria sessão (os.setsid), então no tempo limite o sinal vai
+para o grupo inteiro: Chromium, driver do Playwright e chromedriver iniciados pela
+loja terminam junto com ela.
+
+Os filhos gravam ao mesmo tempo no banco e nos caches de páginas e de respostas do
+LLM. Em produção o lote deve usar Postgres (DATABASE_URL); com SQLite as escritas
+são serializadas e esperam até SQLITE_BUSY_TIMEOUT pelo lock.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.crewai.progress import current_listener, emit, progress_listener
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+BATCH_MAX_PROCESSES = int(os.environ.get("BATCH_MAX_PROCESSES", str(os.cpu_count() or 2)))
+BATCH_STORE_TIMEOUT = float(os.environ.get("BATCH_STORE_TIMEOUT", "900"))
+# Espera pelo encerramento de um processo depois do terminate, antes do kill
+TERMINATE_GRACE_SECONDS = 5
+
+_slots = threading.BoundedSemaphore(BATCH_MAX_PROCESSES)
+_context = multiprocessing.get_context("spawn")
+
+
+def _scrape_in_child(conn, params: Dict[str, Any]) -> None:
+    # Executado no processo filho: importa a camada de crews e devolve o resultado pelo pipe
+    if hasattr(os, "setsid"):
+        # Líder de um grupo de processos próprio, que _stop encerra por inteiro
+        os.setsid()
+    try:
+        from backend.startup import load_crews
+        result = load_crews().scrape_store_products(**params)
+        conn.send(("succeeded", jsonable_encoder(result)))
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _signal_group(process, sig: int) -> None:
+    # Sinaliza o grupo do filho (o filho e os navegadores/drivers que ele iniciou)
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, sig)
+            return
+        except ProcessLookupError:
+            # Grupo já vazio, ou o filho ainda não chegou ao setsid
+            pass
+    if not process.is_alive():
+        return
+    if sig == getattr(signal, "SIGKILL", None):
+        process.kill()
+    else:
+        process.terminate()
+
+
+def _stop(process) -> None:
+    _signal_group(process, signal.SIGTERM)
+    process.join(TERMINATE_GRACE_SECONDS)
+    # Mata o que sobrou do grupo, inclusive o filho se ainda estiver vivo
+    _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+    process.join()
+
+
+def scrape_store(params: Dict[str, Any], timeout: float = BATCH_STORE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Raspa uma loja num processo filho, esperando no máximo `timeout` segundos
+    (contados a partir do início do processo, não da espera na fila).
+    """
+    with _slots:
+        start = time.perf_counter()
+        emit("store_started", loja_url=params["loja_url"])
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=_scrape_in_child,
+            args=(sender, params),
+            name=f"scrape-{params['loja_url']}",
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        outcome: Dict[str, Any] = {"loja_url": params["loja_url"]}
+        try:
+            if receiver.poll(timeout):
+                status, payload = receiver.recv()
+                outcome["status"] = status
+                outcome["result" if status == "succeeded" else "error"] = payload
+            else:
+                outcome.update(status="timed_out", error=f"Tempo limite de {timeout:.0f}s excedido.")
+        except EOFError:
+            # O filho morreu sem responder (falta de memória, sinal)
+            process.join(TERMINATE_GRACE_SECONDS)
+            outcome.update(status="failed", error=f"Processo encerrado com código {process.exitcode}.")
+        finally:
+            receiver.close()
+            if process.is_alive():
+                _stop(process)
+            else:
+                process.join()
+                if outcome.get("status") != "succeeded":
+                    # Filho morto sem encerrar os navegadores que iniciou
+                    _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+        outcome["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"[scrape_store] {params['loja_url']}: {outcome['status']} em {outcome['seconds']}s")
+        emit(
+            "store_finished",
+            loja_url=params["loja_url"],
+            status=outcome["status"],
+            seconds=outcome["seconds"],
+            error=outcome.get("error"),
+        )
+        return outcome
+
+
+def scrape_stores(stores: List[Dict[str, Any]], timeout: float = BATCH_STORE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Raspa várias lojas em paralelo e agrega os resultados.
+
+    Args:
+        stores: Parâmetros de scrape_store_products de cada loja
+            (loja_url, nicho_busca, quantidade_produtos).
+        timeout: Tempo máximo de cada loja, em segundos.
+
+    Returns:
+        dict: Totais por status, duração do lote e o resultado de cada loja, na ordem recebida.
+    """
+    start = time.perf_counter()
+    if not stores:
+        return {"stores": 0, "seconds": 0.0, "by_status": {}, "results": []}
+
+    # Os eventos de cada loja são publicados no job que disparou o lote
+    listener = current_listener()
+
+    def run(params):
+        with progress_listener(listener):
+            return scrape_store(params, timeout)
+
+    with ThreadPoolExecutor(max_workers=min(len(stores), BATCH_MAX_PROCESSES), thread_name_prefix="batch") as executor:
+        results = list(executor.map(run, stores))
+
+    by_status: Dict[str, int] = {}
+    for result in results:
+        by_status[result["status"]] = by_status.get(result["status"], 0) + 1
+
+    return {
+        "stores": len(stores),
+        "seconds": round(time.perf_counter() - start, 3),
+        "by_status": by_status,
+        "results": results,
+    }
@@ -1,5 +1,7 @@
 # backend/crewai/crew_product_scraper.py
+import json
 import logging
+import re
 from crewai import Crew, Process
 
 from backend.crewai.agents import (
@@ -12,6 +14,8 @@ from backend.crewai.agents import (
     store_navigator_agent,
     ecommerce_structure_specialist
     )
+from backend.crewai.metrics import CrewRunMonitor
+from backend.crewai.progress import emit
 from backend.crewai.tasks import (
     analyze_scraped_html_task,
     build_pydantic_objects_task,
@@ -22,6 +26,12 @@ from backend.crewai.tasks import (
     navigate_and_search_store_task,
     identify_ecomerce_structure_task
     )
+from backend.crewai.db.insert_product_list import insert_products
+from backend.crewai.product_extractor import extract_products
+from backend.crewai.store_structure import (
+    learn_store_selectors,
+    resolve_store_selectors
+    )
 
 # Importe o logger
 from backend.crewai.tools.debug_logger import setup_logger
@@ -31,6 +41,19 @@ LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
 logger = setup_logger(level=LOG_LEVEL)
 
 
+def _parse_selectors(raw: str):
+    """
+    Extrai o dicionário suggested_selectors da saída da tarefa de estrutura.
+    """
+    match = re.search(r"\{.*\}", raw or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    selectors = data.get("suggested_selectors", data)
+    return selectors if isinstance(selectors, dict) and selectors.get("card") else None
 
 
 def scrape_store_products(loja_url: str, nicho_busca: str, quantidade_produtos: int):
@@ -49,6 +72,35 @@ def scrape_store_products(loja_url: str, nicho_busca: str, quantidade_produtos:
 
     logger.debug(f"[scrape_store_products] parâmetros recebidos: {locals()}")
 
+    # Lojas já conhecidas reaproveitam os seletores validados, sem chamar o LLM. A
+    # extração lê a página de resultados da busca pelo nicho: sem ela os produtos não
+    # seriam do nicho e nada é extraído nem salvo com essa categoria
+    estrutura = resolve_store_selectors(loja_url, nicho_busca)
+    if estrutura is not None:
+        logger.debug(f"[scrape_store_products] Estrutura sem LLM ({estrutura['source']}): {estrutura['selectors']}")
+        emit("structure", source=estrutura["source"], selectors=estrutura["selectors"])
+        produtos = extract_products(
+            estrutura["listing_url"],
+            estrutura["selectors"],
+            render_mode=estrutura["render_mode"],
+            nicho=nicho_busca,
+            quantidade=int(quantidade_produtos)
+        )
+        if produtos:
+            registros = [p.model_dump() for p in produtos]
+            ids = insert_products(registros)
+            # Os produtos só chegam aos clientes depois de gravados
+            for registro in registros:
+                emit("product", product=registro)
+            emit("products_saved", ids=ids)
+            return {
+                "produtos_para_afiliados": registros,
+                "ids_inseridos": ids,
+                "estrutura": estrutura
+            }
+        # Sem produtos extraídos pelos seletores: segue para os agentes
+        logger.debug("[scrape_store_products] Extração direta sem resultados, usando a crew.")
+
     crew_product_scraper = Crew(
         agents=[
             product_structure_analyst,
@@ -78,14 +130,21 @@ def scrape_store_products(loja_url: str, nicho_busca: str, quantidade_produtos:
 
     # O método kickoff recebe um dicionário 'inputs'
     # As chaves aqui devem corresponder aos placeholders que você usaria na descriçao das tarefas
-    resultado_raspagem = crew_product_scraper.kickoff(
-        inputs={
-            'loja_url': loja_url,
-            'nicho_busca': nicho_busca,
-            'quantidade_produtos': quantidade_produtos
-        }
-    )
+    with CrewRunMonitor("products", crew_product_scraper):
+        resultado_raspagem = crew_product_scraper.kickoff(
+            inputs={
+                'loja_url': loja_url,
+                'nicho_busca': nicho_busca,
+                'quantidade_produtos': quantidade_produtos
+            }
+        )
+
+    # A primeira tarefa é a de estrutura; se a crew achou seletores válidos, eles ficam aprendidos
+    selectors = _parse_selectors(resultado_raspagem.tasks_output[0].raw if resultado_raspagem.tasks_output else "")
+    if selectors:
+        estrutura = learn_store_selectors(loja_url, nicho_busca, selectors) or estrutura
 
     return {
-        "produtos_para_afiliados": resultado_raspagem
+        "produtos_para_afiliados": resultado_raspagem,
+        "estrutura": estrutura
     }
@@ -2,6 +2,7 @@
 from crewai import Crew, Process
 
 from backend.crewai.agents import *
+from backend.crewai.metrics import CrewRunMonitor
 from backend.crewai.tasks import *
 
 
@@ -26,9 +27,10 @@ def discover_stores(pais, nicho, periodo):
     )
 
 
-    resultado1 = crew1.kickoff(
-        inputs={'pais': pais, 'nicho': nicho, 'periodo': periodo}
-    )
+    with CrewRunMonitor("stores", crew1):
+        resultado1 = crew1.kickoff(
+            inputs={'pais': pais, 'nicho': nicho, 'periodo': periodo}
+        )
 
     return {
         "pesquisa": resultado1
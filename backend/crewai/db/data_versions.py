@@ -0,0 +1,81 @@
+"""
+Module for the data version counters used to invalidate cached API responses.
+Every insert path bumps the counter of the data it changed inside its own
+transaction; readers compare counters instead of re-querying the data.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from ..models.data_version import DataVersion
+from .session import AsyncSessionLocal, dialect_insert
+
+# Seconds a read of the counters is reused before asking the database again
+DATA_VERSION_TTL = float(os.environ.get("DATA_VERSION_TTL", "1"))
+
+_cache: Dict[str, Tuple[float, int]] = {}
+# Bumped on every local invalidation; a read that overlapped one is not cached
+_generation = 0
+_lock = threading.Lock()
+# Session.info key with the data sets bumped in the current transaction
+_PENDING_KEY = "bumped_data_versions"
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    # This process sees its own writes once they commit, other processes within DATA_VERSION_TTL
+    names = session.info.pop(_PENDING_KEY, None)
+    if names:
+        global _generation
+        with _lock:
+            _generation += 1
+            for name in names:
+                _cache.pop(name, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def bump_data_version(name: str, db: Session) -> None:
+    """
+    Increments the version of a data set. Runs in the caller's transaction, so the
+    new version becomes visible together with the data it describes.
+    """
+    insert = dialect_insert(db)
+    stmt = insert(DataVersion).values(name=name, version=1)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    ))
+    # The local cache is cleared after the commit, when readers can see the new version
+    db.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+async def get_data_versions(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Returns the current version of each data set (0 if it was never written),
+    reading the database at most once per DATA_VERSION_TTL.
+    """
+    names = list(names)
+    now = time.monotonic()
+    with _lock:
+        cached = {n: _cache[n][1] for n in names if n in _cache and now - _cache[n][0] < DATA_VERSION_TTL}
+        generation = _generation
+    missing = [n for n in names if n not in cached]
+    if missing:
+        query = select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(missing))
+        async with AsyncSessionLocal() as db:
+            rows = dict((await db.execute(query)).all())
+        with _lock:
+            for n in missing:
+                cached[n] = rows.get(n, 0)
+                if generation == _generation:
+                    _cache[n] = (now, cached[n])
+    return {n: cached[n] for n in names}
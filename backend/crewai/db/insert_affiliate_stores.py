@@ -3,12 +3,123 @@ Module for inserting affiliate stores into the database.
 Provides functions for validating and persisting new affiliate stores.
 """
 
-from typing import Any, Dict, List, Optional
+import os
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..models.affiliate_store import AffiliateStore
-from .session import get_db
+from .data_versions import bump_data_version
+from .session import dialect_insert, get_db
+
+# Rows per INSERT ... ON CONFLICT statement
+STORE_UPSERT_CHUNK_SIZE = int(os.environ.get("STORE_UPSERT_CHUNK_SIZE", "500"))
+
+CONFLICT_COLUMNS = ("name", "platform")
+# Columns refreshed when the store already exists (the url is kept, as before)
+UPDATE_COLUMNS = ("active", "api_credentials")
+
+
+def _store_row(store_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": store_data.get("name"),
+        "platform": store_data.get("platform"),
+        "active": store_data.get("active", True),
+        "url": store_data.get("url"),
+        "api_credentials": store_data.get("api_credentials", {}),
+    }
+
+
+def _upsert_statement(db: Session, rows: List[Dict[str, Any]]):
+    insert = dialect_insert(db)
+    stmt = insert(AffiliateStore).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(CONFLICT_COLUMNS),
+        set_={
+            **{c: stmt.excluded[c] for c in UPDATE_COLUMNS},
+            "updated_at": func.now(),
+        },
+    ).returning(AffiliateStore.id, *(AffiliateStore.__table__.c[c] for c in CONFLICT_COLUMNS))
+
+
+def _attempt(db: Session):
+    """
+    Isolates one statement so its failure does not abort the batch. PostgreSQL
+    aborts the whole transaction on an error, so it needs a savepoint. SQLite
+    already undoes just the failed statement, and pysqlite savepoints do not
+    nest: releasing one that opened the transaction commits it.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return nullcontext()
+    return db.begin_nested()
+
+
+def bulk_upsert_stores(
+    stores_data: List[Dict[str, Any]],
+    db: Session,
+    chunk_size: int = STORE_UPSERT_CHUNK_SIZE,
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    Inserts or updates affiliate stores in a single transaction, with one multi-row
+    INSERT ... ON CONFLICT (name, platform) DO UPDATE per chunk.
+
+    If a chunk fails, its rows are retried one by one (see _attempt) so a bad row
+    is reported without aborting the batch.
+
+    Args:
+        stores_data: List of dictionaries containing store data.
+        db: SQLAlchemy session (PostgreSQL or SQLite).
+        chunk_size: Maximum rows per statement.
+
+    Returns:
+        Tuple with the ids of the persisted stores, one per successful row of
+        stores_data in input order (rows with the same name and platform share
+        an id), and a dict {index: error} for the rows that failed (indexes refer
+        to stores_data).
+    """
+    # The same key twice in one statement is rejected by ON CONFLICT; the last one wins
+    keys, latest = [], {}
+    for index, store_data in enumerate(stores_data):
+        row = _store_row(store_data)
+        key = tuple(row[c] for c in CONFLICT_COLUMNS)
+        keys.append(key)
+        latest[key] = (index, row)
+    indexed_rows = list(latest.values())
+
+    saved, failed = {}, {}
+
+    def upsert(rows):
+        for store_id, *key in db.execute(_upsert_statement(db, rows)).all():
+            saved[tuple(key)] = store_id
+
+    try:
+        for start in range(0, len(indexed_rows), chunk_size):
+            chunk = indexed_rows[start:start + chunk_size]
+            try:
+                with _attempt(db):
+                    upsert([row for _, row in chunk])
+                continue
+            except Exception:
+                pass
+
+            for index, row in chunk:
+                try:
+                    with _attempt(db):
+                        upsert([row])
+                except Exception as e:
+                    failed[keys[index]] = str(getattr(e, "orig", None) or e)
+        if saved:
+            bump_data_version("stores", db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    ids = [saved[key] for key in keys if key in saved]
+    errors = {index: failed[key] for index, key in enumerate(keys) if key in failed}
+    return ids, errors
 
 
 def insert_store(store_data: Dict[str, Any], db: Session) -> AffiliateStore:
@@ -20,63 +131,31 @@ def insert_store(store_data: Dict[str, Any], db: Session) -> AffiliateStore:
     Returns:
         AffiliateStore: The inserted store instance.
     """
-    name = store_data.get("name")
-    platform = store_data.get("platform")
-    active = store_data.get("active", True)
-    url = store_data.get("url")
-    api_credentials = store_data.get("api_credentials", {})
-
-    existing_store = db.query(AffiliateStore).filter(
-        AffiliateStore.name == name,
-        AffiliateStore.platform == platform
-    ).first()
-
-    if existing_store:
-        # Update existing store
-        existing_store.active = active
-        existing_store.api_credentials = api_credentials
-        db.commit()
-        db.refresh(existing_store)
-        return existing_store
-
-    # Insert new store
-    new_store = AffiliateStore(
-        name=name,
-        platform=platform,
-        active=active,
-        url=url,
-        api_credentials=api_credentials
-    )
-    db.add(new_store)
-    db.commit()
-    db.refresh(new_store)
-    return new_store
-
-
-def insert_stores(stores_data: List[Dict[str, Any]], db_session: Optional[Session] = None) -> List[AffiliateStore]:
+    ids, errors = bulk_upsert_stores([store_data], db)
+    if errors:
+        raise ValueError(errors[0])
+    return db.get(AffiliateStore, ids[0])
+
+
+def insert_stores(stores_data: List[Dict[str, Any]], db_session: Optional[Session] = None) -> Tuple[List[int], Dict[int, str]]:
     """
-    Inserts multiple affiliate stores into the database.
+    Inserts multiple affiliate stores into the database using one session and
+    one transaction.
 
     Args:
         stores_data: List of dictionaries containing store data.
         db_session: Optional existing database session.
 
     Returns:
-        List[AffiliateStore]: List of inserted store instances.
+        Tuple with the ids of the persisted stores and a dict {index: error}.
     """
+    if not stores_data:
+        return [], {}
     if db_session:
-        return _insert_with_session(stores_data, db_session)
+        return bulk_upsert_stores(stores_data, db_session)
     else:
         db = next(get_db())
         try:
-            return _insert_with_session(stores_data, db)
+            return bulk_upsert_stores(stores_data, db)
         finally:
             db.close()
-
-
-def _insert_with_session(stores_data: List[Dict[str, Any]], db: Session) -> List[AffiliateStore]:
-    inserted = []
-    for store_data in stores_data:
-        store = insert_store(store_data, db)
-        inserted.append(store)
-    return inserted
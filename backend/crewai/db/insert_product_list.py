@@ -3,12 +3,94 @@ Module for inserting products into the database.
 Provides functions for validating and persisting new products.
 """
 
+import os
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..models.products import Product
-from .session import get_db
+from .data_versions import bump_data_version
+from .session import dialect_insert, get_db
+
+# Rows per INSERT ... ON CONFLICT statement
+PRODUCT_UPSERT_CHUNK_SIZE = int(os.environ.get("PRODUCT_UPSERT_CHUNK_SIZE", "500"))
+
+PRODUCT_COLUMNS = (
+    "external_id", "platform", "title", "description", "price", "sale_price",
+    "image_url", "product_url", "affiliate_url", "category", "brand", "available",
+    "affiliate_store_id",
+)
+CONFLICT_COLUMNS = ("platform", "external_id")
+# Kept when the incoming row does not bring them (scrapers don't know the affiliate link)
+PRESERVED_COLUMNS = ("affiliate_url", "affiliate_store_id")
+
+
+def _product_row(product_data: Dict[str, Any]) -> Dict[str, Any]:
+    row = {column: product_data.get(column) for column in PRODUCT_COLUMNS}
+    if row["available"] is None:
+        row["available"] = True
+    return row
+
+
+def bulk_upsert_products(
+    products_data: List[Dict[str, Any]],
+    db: Session,
+    chunk_size: int = PRODUCT_UPSERT_CHUNK_SIZE,
+) -> List[int]:
+    """
+    Inserts or updates products with one multi-row INSERT ... ON CONFLICT DO UPDATE
+    per chunk, keyed by (platform, external_id), all in a single transaction.
+
+    Args:
+        products_data: List of dictionaries containing product data.
+        db: SQLAlchemy session (PostgreSQL or SQLite).
+        chunk_size: Maximum rows per statement.
+
+    Returns:
+        List[int]: Id of the inserted or updated product for each row of
+        products_data, in input order (rows with the same key share an id).
+
+    Raises:
+        ValueError: If a product has no platform or external_id.
+    """
+    insert = dialect_insert(db)
+
+    # The same key twice in one statement is rejected by ON CONFLICT; the last one wins
+    keys, rows, missing_key = [], {}, []
+    for index, product_data in enumerate(products_data):
+        row = _product_row(product_data)
+        key = tuple(row[c] for c in CONFLICT_COLUMNS)
+        if None in key:
+            missing_key.append(index)
+            continue
+        keys.append(key)
+        rows[key] = row
+    if missing_key:
+        # NULL never conflicts, so these rows would be duplicated on every run
+        raise ValueError(f"Produtos sem platform/external_id nas posições {missing_key}")
+    rows = list(rows.values())
+
+    saved = {}
+    try:
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(Product).values(rows[start:start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(CONFLICT_COLUMNS),
+                set_={
+                    **{c: stmt.excluded[c] for c in PRODUCT_COLUMNS if c not in CONFLICT_COLUMNS + PRESERVED_COLUMNS},
+                    **{c: func.coalesce(stmt.excluded[c], Product.__table__.c[c]) for c in PRESERVED_COLUMNS},
+                    "updated_at": func.now(),
+                },
+            ).returning(Product.id, *(Product.__table__.c[c] for c in CONFLICT_COLUMNS))
+            for product_id, *key in db.execute(stmt).all():
+                saved[tuple(key)] = product_id
+        bump_data_version("products", db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return [saved[key] for key in keys]
 
 
 def insert_product(product_data: Dict[str, Any], db: Session) -> Product:
@@ -20,59 +102,11 @@ def insert_product(product_data: Dict[str, Any], db: Session) -> Product:
     Returns:
         Products: The inserted product instance.
     """
-    external_id = product_data.get("external_id")
-    platform = product_data.get("platform")
-    title = product_data.get("title")
-    description = product_data.get("description")
-    price = product_data.get("price")
-    sale_price = product_data.get("sale_price")
-    image_url = product_data.get(["image_url"])
-    product_url = product_data.get("product_url")
-    category = product_data.get("category")
-    brand = product_data.get("brand")
-    available = product_data.get("available", True)
-
-    existing_product = db.query(Product).filter(
-        Product.title == title,
-        Product.platform == platform
-    ).first()
-
-    if existing_product:
-        # Update existing product
-        existing_product.external_id = external_id
-        existing_product.description = description
-        existing_product.price = price
-        existing_product.sale_price = sale_price
-        existing_product.image_url = image_url
-        existing_product.product_url = product_url
-        existing_product.category = category
-        existing_product.brand = brand
-        existing_product.available = available
-        db.commit()
-        db.refresh(existing_product)
-        return existing_product
-
-    # Insert new product
-    new_product = Product(
-        title=title,
-        platform=platform,
-        external_id=external_id,
-        description=description,
-        price=price,
-        sale_price=sale_price,
-        image_url=image_url,
-        product_url=product_url,
-        category=category,
-        brand=brand,
-        available=available
-    )
-    db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
-    return new_product
-
-
-def insert_products(products_data: List[Dict[str, Any]], db_session: Optional[Session] = None) -> List[Product]:
+    product_id = bulk_upsert_products([product_data], db)[0]
+    return db.get(Product, product_id)
+
+
+def insert_products(products_data: List[Dict[str, Any]], db_session: Optional[Session] = None) -> List[int]:
     """
     Inserts multiple products into the database.
 
@@ -81,21 +115,15 @@ def insert_products(products_data: List[Dict[str, Any]], db_session: Optional[Se
         db_session: Optional existing database session.
 
     Returns:
-        List[Products]: List of inserted product instances.
+        List[int]: Id of each row of products_data, in input order.
     """
+    if not products_data:
+        return []
     if db_session:
-        return _insert_with_session(products_data, db_session)
+        return bulk_upsert_products(products_data, db_session)
     else:
         db = next(get_db())
         try:
-            return _insert_with_session(products_data, db)
+            return bulk_upsert_products(products_data, db)
         finally:
             db.close()
-
-
-def _insert_with_session(products_data: List[Dict[str, Any]], db: Session) -> List[Product]:
-    inserted = []
-    for product_data in products_data:
-        product = insert_product(product_data, db)
-        inserted.append(product)
-    return inserted
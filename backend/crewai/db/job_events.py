@@ -0,0 +1,42 @@
+"""
+Module for the progress events of crew jobs.
+Provides functions for appending events and reading them after a given id.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models.crew_job_event import CrewJobEvent
+from .session import SessionLocal
+
+
+def add_job_event(job_id: str, type: str, data: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Appends an event to a job in its own short transaction, so it is visible to
+    readers while the job is still running.
+
+    Returns:
+        int: The event id.
+    """
+    db = SessionLocal()
+    try:
+        event = CrewJobEvent(job_id=job_id, type=type, data=data)
+        db.add(event)
+        db.commit()
+        return event.id
+    finally:
+        db.close()
+
+
+def list_job_events(job_id: str, db: Session, after_id: int = 0, limit: int = 500) -> List[CrewJobEvent]:
+    """
+    Returns the events of a job with id greater than after_id, oldest first.
+    """
+    return (
+        db.query(CrewJobEvent)
+        .filter(CrewJobEvent.job_id == job_id, CrewJobEvent.id > after_id)
+        .order_by(CrewJobEvent.id)
+        .limit(limit)
+        .all()
+    )
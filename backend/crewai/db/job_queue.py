@@ -0,0 +1,253 @@
+"""
+Module for the durable crew job queue stored in the crew_jobs table.
+Workers claim jobs with a lease: on PostgreSQL the candidate row is locked with
+SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers never wait on or take
+the same job; on SQLite a conditional UPDATE decides the winner. A worker that
+stops renewing its lease (crash, lost container) lets the job become claimable
+again once the lease expires. Failures are retried with exponential backoff up
+to max_attempts. Every state change after the claim is fenced by the lease owner,
+so a worker that lost its lease cannot overwrite the outcome of another one.
+The job_retry/job_finished event is written in the same transaction as the
+status change, so a reader that sees a terminal status also sees its event.
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.crew_job import CrewJob
+from ..models.crew_job_event import CrewJobEvent
+
+# Seconds a claim stays valid without a heartbeat (visibility timeout)
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# Delay before the first retry; doubles on each further attempt
+JOB_RETRY_BACKOFF = float(os.environ.get("JOB_RETRY_BACKOFF", "30"))
+# Candidates tried per claim when other workers win the race (SQLite)
+CLAIM_RETRIES = 5
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_expired(now: datetime):
+    # Jobs left running by the in-process executor used before the queue have no lease
+    return and_(
+        CrewJob.status == "running",
+        or_(CrewJob.lease_expires_at.is_(None), CrewJob.lease_expires_at < now),
+    )
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(CrewJob.status == "queued", or_(CrewJob.available_at.is_(None), CrewJob.available_at <= now)),
+        and_(_lease_expired(now), CrewJob.attempts < CrewJob.max_attempts),
+    )
+
+
+def _add_event(db: Session, job_id: str, type: str, data: Dict[str, Any]) -> None:
+    db.add(CrewJobEvent(job_id=job_id, type=type, data=data))
+
+
+def _owned(job_id: str, worker_id: str):
+    return and_(CrewJob.id == job_id, CrewJob.status == "running", CrewJob.lease_owner == worker_id)
+
+
+def enqueue_job(
+    kind: str,
+    params: Dict[str, Any],
+    db: Session,
+    idempotency_key: Optional[str] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> CrewJob:
+    """
+    Persists a queued job. A job already submitted with the same idempotency key
+    is returned instead of creating a new one.
+    """
+    if idempotency_key:
+        existing = db.execute(select(CrewJob).where(CrewJob.idempotency_key == idempotency_key)).scalar()
+        if existing is not None:
+            return existing
+
+    job = CrewJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        params=params,
+        status="queued",
+        idempotency_key=idempotency_key,
+        attempts=0,
+        max_attempts=max_attempts,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request with the same key committed first
+        db.rollback()
+        existing = db.execute(select(CrewJob).where(CrewJob.idempotency_key == idempotency_key)).scalar()
+        if existing is None:
+            raise
+        return existing
+    db.refresh(job)
+    return job
+
+
+def expire_exhausted_jobs(db: Session) -> int:
+    """
+    Fails running jobs whose lease expired on their last allowed attempt and
+    writes their job_finished event.
+
+    Returns:
+        int: Number of jobs marked as failed.
+    """
+    now = _now()
+    candidates = select(CrewJob.id).where(_lease_expired(now), CrewJob.attempts >= CrewJob.max_attempts)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    job_ids = db.execute(candidates).scalars().all()
+
+    error = "Lease expirado na última tentativa (worker interrompido)."
+    expired = 0
+    for job_id in job_ids:
+        # The WHERE repeats the condition: another worker may have expired it first (SQLite)
+        result = db.execute(
+            update(CrewJob)
+            .where(CrewJob.id == job_id, _lease_expired(now), CrewJob.attempts >= CrewJob.max_attempts)
+            .values(status="failed", error=error, finished_at=now, lease_owner=None, lease_expires_at=None)
+        )
+        if result.rowcount == 1:
+            _add_event(db, job_id, "job_finished", {"status": "failed", "error": error})
+            expired += 1
+    db.commit()
+    return expired
+
+
+def claim_job(worker_id: str, db: Session, job_id: Optional[str] = None) -> Optional[CrewJob]:
+    """
+    Claims the oldest available job (or the given one) for a worker.
+
+    Args:
+        worker_id: Lease owner written on the job.
+        db: SQLAlchemy session (PostgreSQL or SQLite).
+        job_id: Claim only this job.
+
+    Returns:
+        Optional[CrewJob]: The claimed job, now running with a fresh lease, or
+        None if nothing is available.
+    """
+    for _ in range(CLAIM_RETRIES):
+        now = _now()
+        candidate = select(CrewJob.id).where(_claimable(now)).order_by(CrewJob.created_at).limit(1)
+        if job_id is not None:
+            candidate = candidate.where(CrewJob.id == job_id)
+        if db.get_bind().dialect.name == "postgresql":
+            candidate = candidate.with_for_update(skip_locked=True)
+
+        claimed_id = db.execute(candidate).scalar()
+        if claimed_id is None:
+            db.rollback()
+            return None
+
+        # The WHERE repeats the claim condition: on SQLite the first UPDATE wins
+        result = db.execute(
+            update(CrewJob)
+            .where(CrewJob.id == claimed_id, _claimable(now))
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS),
+                attempts=CrewJob.attempts + 1,
+                started_at=now,
+                available_at=None,
+            )
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(CrewJob, claimed_id)
+    return None
+
+
+def extend_lease(job_id: str, worker_id: str, db: Session) -> bool:
+    """
+    Renews the lease of a running job.
+
+    Returns:
+        bool: False if the worker no longer owns the job.
+    """
+    result = db.execute(
+        update(CrewJob)
+        .where(_owned(job_id, worker_id))
+        .values(lease_expires_at=_now() + timedelta(seconds=JOB_LEASE_SECONDS))
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete_job(job_id: str, worker_id: str, result: Any, db: Session) -> bool:
+    """
+    Stores the result of a job run by this worker.
+
+    Returns:
+        bool: False if the lease was lost and the result was discarded.
+    """
+    updated = db.execute(
+        update(CrewJob)
+        .where(_owned(job_id, worker_id))
+        .values(
+            status="succeeded",
+            result=result,
+            error=None,
+            finished_at=_now(),
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    )
+    if updated.rowcount == 1:
+        _add_event(db, job_id, "job_finished", {"status": "succeeded", "error": None})
+    db.commit()
+    return updated.rowcount == 1
+
+
+def fail_job(job_id: str, worker_id: str, error: str, db: Session) -> Optional[str]:
+    """
+    Records a failed attempt: the job is queued again with backoff while it has
+    attempts left, otherwise it is marked as failed.
+
+    Returns:
+        Optional[str]: The new status ("queued" or "failed"), or None if the
+        lease was lost.
+    """
+    job = db.execute(select(CrewJob).where(_owned(job_id, worker_id))).scalar()
+    if job is None:
+        db.rollback()
+        return None
+
+    now = _now()
+    if job.attempts < job.max_attempts:
+        values = {
+            "status": "queued",
+            "available_at": now + timedelta(seconds=JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)),
+        }
+    else:
+        values = {"status": "failed", "finished_at": now}
+
+    updated = db.execute(
+        update(CrewJob)
+        .where(_owned(job_id, worker_id))
+        .values(error=error, lease_owner=None, lease_expires_at=None, **values)
+    )
+    if updated.rowcount != 1:
+        db.rollback()
+        return None
+    if values["status"] == "queued":
+        _add_event(db, job_id, "job_retry", {"attempt": job.attempts, "error": error})
+    else:
+        _add_event(db, job_id, "job_finished", {"status": "failed", "error": error})
+    db.commit()
+    return values["status"]
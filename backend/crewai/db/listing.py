@@ -0,0 +1,187 @@
+"""
+Module for listing stores and products with keyset pagination.
+Pages are ordered by (created_at, id), newest first, and the next page starts
+right after the last row of the previous one, so deep pages cost the same as the
+first. Each filter combination is backed by a composite index ending in
+(created_at, id).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.orm import Session
+
+from ..models.affiliate_store import AffiliateStore
+from ..models.products import Product
+
+MAX_PAGE_SIZE = 500
+
+# Columns that may be requested through `fields`; api_credentials is never listed
+STORE_FIELDS = ("id", "name", "platform", "url", "active", "created_at", "updated_at")
+STORE_DEFAULT_FIELDS = STORE_FIELDS
+
+PRODUCT_FIELDS = (
+    "id", "external_id", "platform", "title", "description", "price", "sale_price",
+    "image_url", "product_url", "affiliate_url", "category", "brand", "available",
+    "affiliate_store_id", "created_at", "updated_at",
+)
+# List views skip the description, the largest column
+PRODUCT_DEFAULT_FIELDS = tuple(f for f in PRODUCT_FIELDS if f != "description")
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Returns an opaque cursor pointing right after the given row.
+    """
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Reverses encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Sequence[str]) -> List[str]:
+    """
+    Parses a comma separated field list, falling back to the default projection.
+
+    Raises:
+        ValueError: If a field is not allowed.
+    """
+    if not fields:
+        return list(default)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Campos inválidos: {', '.join(unknown)}. Permitidos: {', '.join(allowed)}")
+    return list(dict.fromkeys(requested))
+
+
+def _cursor_created_at(db: Session, created_at: datetime) -> Any:
+    # SQLite stores DateTime as text and CURRENT_TIMESTAMP has no fractional seconds;
+    # the cursor value must use the same format for the comparison to hold
+    if db.get_bind().dialect.name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S" if created_at.microsecond == 0 else "%Y-%m-%d %H:%M:%S.%f"
+        return literal(created_at.strftime(fmt), String)
+    return created_at
+
+
+def keyset_page(
+    db: Session,
+    model: Any,
+    fields: Iterable[str],
+    filters: Dict[str, Any],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Returns one page of rows as dicts with only the requested fields.
+
+    Args:
+        db: SQLAlchemy session.
+        model: Mapped class with created_at and id columns.
+        fields: Columns to return.
+        filters: Column equality filters; None values are ignored.
+        cursor: Cursor returned with the previous page.
+        limit: Page size, capped at MAX_PAGE_SIZE.
+        offset: Rows skipped first, for clients of the old skip parameter; it costs
+            a scan of the skipped rows, so the returned cursor should be used next.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str]]: The rows and the cursor of the
+        next page (None on the last page).
+
+    Raises:
+        ValueError: If both cursor and offset are given.
+    """
+    if cursor and offset:
+        raise ValueError("Use cursor ou skip, não os dois.")
+    fields = list(fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # created_at and id are always selected: they are the cursor key
+    columns = list(dict.fromkeys(fields + ["created_at", "id"]))
+
+    query = db.query(*(getattr(model, c) for c in columns))
+    for column, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(model, column) == value)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(model.created_at, model.id) < tuple_(_cursor_created_at(db, created_at), literal(last_id))
+        )
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).offset(offset).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [{f: getattr(row, f) for f in fields} for row in rows], next_cursor
+
+
+def list_stores(
+    db: Session,
+    platform: Optional[str] = None,
+    active: Optional[bool] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Returns a page of affiliate stores, newest first.
+    """
+    return keyset_page(
+        db,
+        AffiliateStore,
+        parse_fields(fields, STORE_FIELDS, STORE_DEFAULT_FIELDS),
+        {"platform": platform, "active": active},
+        cursor,
+        limit,
+        offset=skip,
+    )
+
+
+def list_products(
+    db: Session,
+    platform: Optional[str] = None,
+    category: Optional[str] = None,
+    affiliate_store_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Returns a page of products, newest first.
+    """
+    return keyset_page(
+        db,
+        Product,
+        parse_fields(fields, PRODUCT_FIELDS, PRODUCT_DEFAULT_FIELDS),
+        {
+            "platform": platform,
+            "category": category,
+            "affiliate_store_id": affiliate_store_id,
+            "available": available,
+        },
+        cursor,
+        limit,
+    )
@@ -0,0 +1,159 @@
+"""
+Module for full-text product search over title, brand and description.
+On PostgreSQL a stored generated column holds the weighted tsvector (Portuguese
+stemming by default) and carries the GIN index, so the database keeps it current
+on every insert and update, and ranking reads the column instead of re-parsing
+the text of every match. On SQLite an external-content FTS5 table mirrors the
+products table through triggers. Both return the best ranked matches first.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+from ..models.products import Product
+from .listing import PRODUCT_DEFAULT_FIELDS, PRODUCT_FIELDS, parse_fields
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+# Text search configuration used by to_tsvector (PostgreSQL only)
+PRODUCT_SEARCH_CONFIG = os.environ.get("PRODUCT_SEARCH_CONFIG", "portuguese")
+if not re.fullmatch(r"[a-z_]+", PRODUCT_SEARCH_CONFIG):
+    raise ValueError(f"PRODUCT_SEARCH_CONFIG inválido: {PRODUCT_SEARCH_CONFIG}")
+
+MAX_SEARCH_RESULTS = 100
+
+PG_DOCUMENT = (
+    f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(brand, '')), 'B') || "
+    f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(description, '')), 'C')"
+)
+PG_STATEMENTS = (
+    f"ALTER TABLE products ADD COLUMN IF NOT EXISTS search_document tsvector "
+    f"GENERATED ALWAYS AS ({PG_DOCUMENT}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_document ON products USING GIN (search_document)",
+    # Expression index of earlier versions, replaced by the column above
+    "DROP INDEX IF EXISTS ix_products_search",
+)
+search_document = literal_column("products.search_document")
+
+FTS_COLUMNS = "title, brand, description"
+# Column weights for bm25, in FTS_COLUMNS order
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+products_fts = table("products_fts", column("rowid"))
+SQLITE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE products_fts USING fts5({FTS_COLUMNS}, content='products', "
+    f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+)
+SQLITE_FTS_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+        INSERT INTO products_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Creates the full-text index if it does not exist yet. On SQLite, a newly
+    created FTS table is filled from the existing products.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            for statement in PG_STATEMENTS:
+                conn.execute(text(statement))
+        elif dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+            ).first()
+            if not exists:
+                conn.execute(text(SQLITE_FTS_TABLE))
+                conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+                logger.info("[ensure_search_index] Índice FTS5 de produtos criado.")
+            for trigger in SQLITE_FTS_TRIGGERS:
+                conn.execute(text(trigger))
+        else:
+            logger.warning(f"[ensure_search_index] Busca textual não suportada para o dialeto {dialect}")
+
+
+def _fts5_query(q: str) -> str:
+    # Each word becomes a quoted prefix term, so user input never hits FTS5 syntax
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_products(
+    q: str,
+    db: Session,
+    platform: Optional[str] = None,
+    affiliate_store_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the products matching the query, best ranked first.
+
+    Args:
+        q: Search words; all of them must match (prefixes on SQLite, stems on PostgreSQL).
+        db: SQLAlchemy session.
+        platform: Optional platform filter.
+        affiliate_store_id: Optional store filter.
+        fields: Comma separated columns to return (see listing.PRODUCT_FIELDS).
+        limit: Maximum results, capped at MAX_SEARCH_RESULTS.
+
+    Returns:
+        List[Dict[str, Any]]: The products with the requested fields and a "score"
+        (higher is better).
+
+    Raises:
+        ValueError: If a field is not allowed.
+        NotImplementedError: If the database has no full-text search support here.
+    """
+    columns = parse_fields(fields, PRODUCT_FIELDS, PRODUCT_DEFAULT_FIELDS)
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{PRODUCT_SEARCH_CONFIG}'"), q)
+        score = func.ts_rank(search_document, tsquery)
+        query = db.query(*(getattr(Product, c) for c in columns), score.label("score"))
+        query = query.filter(search_document.op("@@")(tsquery))
+    elif dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        # bm25 is lower for better matches
+        score = -literal_column(f"bm25(products_fts, {weights})")
+        query = db.query(*(getattr(Product, c) for c in columns), score.label("score"))
+        query = query.select_from(Product).join(products_fts, products_fts.c.rowid == Product.id)
+        query = query.filter(literal_column("products_fts").op("MATCH")(match))
+    else:
+        raise NotImplementedError(f"Busca textual não suportada para o dialeto {dialect}")
+
+    if platform is not None:
+        query = query.filter(Product.platform == platform)
+    if affiliate_store_id is not None:
+        query = query.filter(Product.affiliate_store_id == affiliate_store_id)
+
+    rows = query.order_by(score.desc()).limit(limit).all()
+    return [{**{c: getattr(row, c) for c in columns}, "score": float(row.score)} for row in rows]
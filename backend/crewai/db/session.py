@@ -2,7 +2,12 @@
 import logging
 import os
 
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 # Importe o logger
 from backend.crewai.tools.debug_logger import setup_logger
@@ -13,13 +18,77 @@ logger = setup_logger(level=LOG_LEVEL)
 
 
 
+# As crews agora carregam sob demanda: o .env precisa ser lido aqui, antes da URL
+load_dotenv()
+
 DATABASE_URL = os.environ.get("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL não definido (variável de ambiente ou .env)")
 logger.debug(f"[DATABASE_URL] Parâmetros recebidos: {DATABASE_URL}")
 
-engine = create_engine(DATABASE_URL)
+# Pool de conexões, compartilhado pelas configurações do engine síncrono e do assíncrono
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))  # segundos; -1 desativa
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+
+# Espera por um lock de escrita do SQLite antes de "database is locked" (processos
+# do lote de lojas e workers gravam no mesmo arquivo)
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "30"))
+
+# Drivers assíncronos de cada banco (asyncpg no Postgres, aiosqlite no SQLite local)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _pool_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    parsed = make_url(url)
+    # SQLite em memória usa um pool de uma conexão por thread, sem tamanho configurável
+    if parsed.get_backend_name() != "sqlite" or parsed.database not in (None, "", ":memory:"):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT}
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """
+    Troca o driver da URL síncrona pelo driver assíncrono do mesmo banco.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise NotImplementedError(f"Sem driver assíncrono para o banco {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# O engine assíncrono só é criado no primeiro uso: jobs e scripts usam apenas o síncrono
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+_async_engine = None
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
+
+def get_async_engine():
+    global _async_engine, _async_sessionmaker
+    with _async_lock:
+        if _async_engine is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+            url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+            _async_engine = create_async_engine(url, **_pool_options(url))
+            _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        return _async_engine
+
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_sessionmaker()
+
 
 def get_db():
     db = SessionLocal()
@@ -32,3 +101,162 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+async def dispose_async_engine() -> None:
+    """
+    Fecha as conexões do engine assíncrono (no desligamento da API).
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """
+    Dependência do FastAPI que entrega uma AsyncSession; a conexão só é tirada do
+    pool quando a rota executa a primeira consulta.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.debug(f"[get_async_db] Erro: {e}")
+            raise
+
+
+def _pool_status(pool) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def pool_stats() -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Ocupação dos pools de conexão (o assíncrono aparece como None até ser criado).
+    """
+    return {
+        "sync": _pool_status(engine.pool),
+        "async": _pool_status(_async_engine.sync_engine.pool) if _async_engine is not None else None,
+    }
+
+
+def dialect_insert(db):
+    """
+    Retorna a construção insert() do dialeto da sessão, que suporta ON CONFLICT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert em lote não suportado para o dialeto {dialect}")
+    return insert
+
+
+def _add_missing_columns():
+    """
+    create_all não altera tabelas existentes: acrescenta as colunas novas dos modelos
+    (todas anuláveis ou com server_default).
+    """
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+            if column.server_default is not None:
+                default = column.server_default.arg
+                default = f"'{default}'" if isinstance(default, str) else default.compile(dialect=engine.dialect)
+                ddl += f" DEFAULT {default}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            logger.info(f"[init_db] Coluna {table.name}.{column.name} adicionada.")
+
+
+# Índices únicos usados como chave dos upserts em lote -> colunas (tabela, coluna)
+# que referenciam as linhas da tabela
+UPSERT_KEY_REFERENCES: Dict[str, Sequence[Tuple[str, str]]] = {
+    "uq_products_platform_external_id": (),
+    "uq_affiliate_stores_name_platform": (
+        ("products", "affiliate_store_id"),
+        ("store_selectors", "affiliate_store_id"),
+    ),
+}
+
+
+def _deduplicate(table: str, columns: Sequence[str], references: Sequence[Tuple[str, str]] = ()) -> int:
+    """
+    Remove as linhas repetidas na chave `columns`, mantendo a de maior id, para que
+    o índice único possa ser criado. As referências passam a apontar para a linha
+    mantida. Chaves com NULL não se repetem num índice único e não são removidas.
+    """
+    from sqlalchemy import text
+
+    same_key = " AND ".join(f"d.{c} = k.{c}" for c in columns)
+    duplicated = f"SELECT k.id FROM {table} k JOIN {table} d ON {same_key} AND d.id > k.id"
+    with engine.begin() as conn:
+        for ref_table, ref_column in references:
+            conn.execute(text(
+                f"UPDATE {ref_table} SET {ref_column} = ("
+                f"SELECT max(d.id) FROM {table} k JOIN {table} d ON {same_key} "
+                f"WHERE k.id = {ref_table}.{ref_column}) "
+                f"WHERE {ref_column} IN ({duplicated})"
+            ))
+        removed = conn.execute(text(f"DELETE FROM {table} WHERE id IN ({duplicated})")).rowcount
+    if removed:
+        logger.warning(f"[init_db] {removed} linhas repetidas removidas de {table} ({', '.join(columns)}).")
+    return removed
+
+
+def init_db():
+    """
+    Cria as tabelas que ainda não existem no banco (as existentes não são alteradas).
+    """
+    # Importa os modelos para registrá-los no metadata
+    from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                       crew_job_event, data_version,
+                                       products, store_selectors)
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+    from backend.crewai.db.product_search import ensure_search_index
+    try:
+        ensure_search_index(engine)
+    except Exception as e:
+        logger.warning(f"[init_db] Não foi possível criar o índice de busca de produtos: {e}")
+
+    # create_all não altera tabelas existentes: cria os índices novos que faltarem
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                # Sem um índice único os upserts em lote falham: duplicatas antigas
+                # são removidas antes e um erro aqui interrompe a inicialização
+                if index.name in UPSERT_KEY_REFERENCES:
+                    _deduplicate(table.name, [c.name for c in index.columns], UPSERT_KEY_REFERENCES[index.name])
+                index.create(bind=engine)
+                continue
+            try:
+                index.create(bind=engine)
+            except Exception as e:
+                logger.warning(f"[init_db] Não foi possível criar o índice {index.name}: {e}")
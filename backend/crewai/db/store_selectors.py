@@ -0,0 +1,80 @@
+"""
+Module for the product selectors learned for each store.
+Provides functions for looking up and persisting selectors by store domain.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy.orm import Session
+
+from ..models.affiliate_store import AffiliateStore
+from ..models.store_selectors import StoreSelectors
+
+
+def store_domain(url: str) -> str:
+    """
+    Returns the host of a store URL, used as the lookup key for its selectors.
+    """
+    return (urlsplit(url if "://" in url else f"https://{url}").hostname or "").lower()
+
+
+def get_store_selectors(url: str, db: Session) -> Optional[StoreSelectors]:
+    """
+    Returns the selectors learned for the store that owns the given URL.
+    """
+    return db.query(StoreSelectors).filter(StoreSelectors.domain == store_domain(url)).first()
+
+
+def save_store_selectors(
+    url: str,
+    selectors: Dict[str, Any],
+    db: Session,
+    render_mode: str = "raw",
+    confidence: Optional[Dict[str, float]] = None,
+    listing_url: Optional[str] = None,
+    search_url: Optional[str] = None,
+) -> StoreSelectors:
+    """
+    Inserts or replaces the selectors learned for a store.
+    Args:
+        url: Any URL of the store; its host is the lookup key.
+        selectors: Dictionary with card, name, price and link selectors.
+        db: SQLAlchemy session.
+        render_mode: "raw" or "rendered", how the page must be fetched to validate them.
+        confidence: Optional confidence of each selector.
+        listing_url: Listing page where the selectors were detected (defaults to url).
+        search_url: Search URL template of the store; kept when not given.
+    Returns:
+        StoreSelectors: The persisted instance.
+    """
+    domain = store_domain(url)
+    record = db.query(StoreSelectors).filter(StoreSelectors.domain == domain).first()
+    if record is None:
+        record = StoreSelectors(domain=domain)
+        db.add(record)
+
+    if record.affiliate_store_id is None:
+        store = db.query(AffiliateStore).filter(AffiliateStore.url.ilike(f"%{domain}%")).first()
+        if store:
+            record.affiliate_store_id = store.id
+
+    record.listing_url = listing_url or url
+    if search_url:
+        record.search_url = search_url
+    record.render_mode = render_mode
+    record.card = selectors["card"]
+    record.name = selectors.get("name")
+    record.price = selectors.get("price")
+    record.link = selectors.get("link")
+    record.confidence = confidence
+    record.validated_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def mark_validated(record: StoreSelectors, db: Session) -> None:
+    record.validated_at = datetime.now(timezone.utc)
+    db.commit()
@@ -0,0 +1,263 @@
+# backend/crewai/jobs.py
+"""
+Module for running crews as background jobs.
+Jobs are persisted in the crew_jobs table, which is also the work queue (see
+db/job_queue.py), so the API answers with the job id while the crew runs on its own.
+With JOB_EXECUTION=local the API process runs CREW_MAX_WORKERS worker threads;
+with JOB_EXECUTION=queue it only enqueues and separate worker processes
+(python -m backend.worker) pull the jobs.
+"""
+
+import logging
+import os
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from backend.crewai.db.job_events import add_job_event
+from backend.crewai.db.job_queue import (JOB_LEASE_SECONDS, claim_job,
+                                         complete_job, enqueue_job,
+                                         expire_exhausted_jobs, extend_lease,
+                                         fail_job)
+from backend.crewai.db.session import SessionLocal
+from backend.crewai.models.affiliate_store import AffiliateStore
+from backend.crewai.models.crew_job import CrewJob
+from backend.crewai.progress import progress_listener
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.startup import load_crews
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+# Quantidade máxima de crews executando ao mesmo tempo neste processo
+CREW_MAX_WORKERS = int(os.environ.get("CREW_MAX_WORKERS", "2"))
+# local: a API executa os jobs; queue: só enfileira, workers separados executam
+JOB_EXECUTION = os.environ.get("JOB_EXECUTION", "local")
+# Intervalo de consulta à fila quando não há jobs disponíveis
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "2"))
+
+_wake = threading.Event()
+_stop = threading.Event()
+_workers: List["JobWorker"] = []
+
+
+def _run_discover_stores(params: Dict[str, Any]) -> Any:
+    return load_crews().discover_stores(params["pais"], params["nicho"], params["periodo"])
+
+
+def _run_scrape_products(params: Dict[str, Any]) -> Any:
+    return load_crews().scrape_store_products(
+        loja_url=params["loja_url"],
+        nicho_busca=params["nicho_busca"],
+        quantidade_produtos=params["quantidade_produtos"]
+    )
+
+
+def _run_scrape_products_batch(params: Dict[str, Any]) -> Any:
+    from backend.crewai.batch import BATCH_STORE_TIMEOUT, scrape_stores
+
+    stores = list(params.get("lojas") or [])
+    if params.get("todas_ativas"):
+        # As lojas ativas são lidas na execução, não na submissão do job
+        db = SessionLocal()
+        try:
+            urls = db.query(AffiliateStore.url).filter(AffiliateStore.active.is_(True)).all()
+        finally:
+            db.close()
+        stores += [{"loja_url": url} for (url,) in urls]
+
+    targets = {}
+    for store in stores:
+        targets.setdefault(store["loja_url"], {
+            "loja_url": store["loja_url"],
+            "nicho_busca": store.get("nicho_busca") or params["nicho_busca"],
+            "quantidade_produtos": store.get("quantidade_produtos") or params["quantidade_produtos"],
+        })
+    return scrape_stores(list(targets.values()), params.get("timeout") or BATCH_STORE_TIMEOUT)
+
+
+JOB_RUNNERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "stores": _run_discover_stores,
+    "products": _run_scrape_products,
+    "products_batch": _run_scrape_products_batch,
+}
+
+
+def submit_job(
+    kind: str,
+    params: Dict[str, Any],
+    db: Session,
+    idempotency_key: Optional[str] = None,
+) -> CrewJob:
+    """
+    Persists a new job in the queue.
+
+    Args:
+        kind: Job type, one of JOB_RUNNERS keys.
+        params: Arguments passed to the crew.
+        db: SQLAlchemy session.
+        idempotency_key: Optional client key; resubmissions return the same job.
+
+    Returns:
+        CrewJob: The queued (or previously submitted) job.
+    """
+    if kind not in JOB_RUNNERS:
+        raise ValueError(f"Tipo de job desconhecido: {kind}")
+
+    job = enqueue_job(kind, params, db, idempotency_key=idempotency_key)
+    # Acorda os workers locais sem esperar o próximo ciclo de consulta
+    _wake.set()
+    logger.debug(f"[submit_job] Job {job.id} ({kind}) enfileirado: {params}")
+    return job
+
+
+def get_job(job_id: str, db: Session) -> Optional[CrewJob]:
+    return db.get(CrewJob, job_id)
+
+
+class _LeaseHeartbeat:
+    """
+    Renova o lease do job enquanto a crew executa, numa thread à parte.
+    """
+
+    def __init__(self, job_id: str, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id[:8]}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._done.wait(JOB_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                if not extend_lease(self.job_id, self.worker_id, db):
+                    logger.warning(f"[lease] Job {self.job_id}: lease perdido por {self.worker_id}.")
+                    return
+            except Exception as e:
+                logger.warning(f"[lease] Falha ao renovar o lease do job {self.job_id}: {e}")
+            finally:
+                db.close()
+
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._done.set()
+        self._thread.join()
+
+
+def execute_job(job: CrewJob, worker_id: str) -> None:
+    """
+    Runs a job claimed by worker_id, storing its result or recording the failed
+    attempt (retried with backoff while attempts remain).
+    """
+    job_id, kind, params, attempt = job.id, job.kind, dict(job.params), job.attempts
+    add_job_event(job_id, "job_started", {"kind": kind, "params": params, "attempt": attempt})
+
+    def publish(type: str, data: Dict[str, Any]) -> None:
+        add_job_event(job_id, type, jsonable_encoder(data))
+
+    error = None
+    with _LeaseHeartbeat(job_id, worker_id):
+        try:
+            with progress_listener(publish):
+                result = JOB_RUNNERS[kind](params)
+        except Exception as e:
+            logger.error(f"[execute_job] Job {job_id} falhou (tentativa {attempt}): {e}", exc_info=True)
+            error = str(e)
+
+    db = SessionLocal()
+    try:
+        if error is None:
+            status = "succeeded" if complete_job(job_id, worker_id, jsonable_encoder(result), db) else None
+        else:
+            status = fail_job(job_id, worker_id, error, db)
+    finally:
+        db.close()
+
+    # complete_job/fail_job gravam job_retry ou job_finished junto com o status
+    if status is None:
+        logger.warning(f"[execute_job] Job {job_id}: lease perdido, resultado descartado.")
+
+
+def run_job(job_id: str, worker_id: Optional[str] = None) -> None:
+    """
+    Claims and executes one specific job, if it is available.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    db = SessionLocal()
+    try:
+        job = claim_job(worker_id, db, job_id=job_id)
+    finally:
+        db.close()
+    if job is not None:
+        execute_job(job, worker_id)
+
+
+class JobWorker(threading.Thread):
+    """
+    Laço de um worker: pega o próximo job disponível na fila e o executa.
+    """
+
+    def __init__(self, index: int):
+        super().__init__(name=f"crew-job-{index}", daemon=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    def run(self) -> None:
+        while not _stop.is_set():
+            try:
+                db = SessionLocal()
+                try:
+                    expire_exhausted_jobs(db)
+                    job = claim_job(self.worker_id, db)
+                finally:
+                    db.close()
+                if job is not None:
+                    logger.info(f"[worker] {self.worker_id} executando o job {job.id} (tentativa {job.attempts}).")
+                    execute_job(job, self.worker_id)
+                    continue
+            except Exception as e:
+                logger.error(f"[worker] {self.worker_id}: erro no laço da fila: {e}", exc_info=True)
+            _wake.wait(WORKER_POLL_SECONDS)
+            _wake.clear()
+
+
+def start_workers(count: int = CREW_MAX_WORKERS) -> List[JobWorker]:
+    """
+    Starts worker threads in this process.
+    """
+    _stop.clear()
+    started = [JobWorker(i) for i in range(len(_workers), len(_workers) + count)]
+    for worker in started:
+        worker.start()
+    _workers.extend(started)
+    logger.debug(f"[start_workers] {count} workers iniciados.")
+    return started
+
+
+def stop_workers(timeout: Optional[float] = None) -> None:
+    """
+    Stops claiming new jobs and waits for the running ones. Jobs still running
+    after the timeout are retried by another worker once their lease expires.
+    """
+    _stop.set()
+    _wake.set()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
+
+
+def start_local_workers() -> None:
+    """
+    Starts the API's own workers when JOB_EXECUTION=local.
+    """
+    if JOB_EXECUTION == "local":
+        start_workers(CREW_MAX_WORKERS)
+    else:
+        logger.debug("[start_local_workers] JOB_EXECUTION=queue: jobs executados pelos workers externos.")
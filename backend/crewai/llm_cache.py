@@ -0,0 +1,247 @@
+# backend/crewai/llm_cache.py
+"""
+Cache persistente das respostas do LLM usadas pelas crews.
+
+Chamadas repetidas de discover_stores/scrape_store_products mandam os mesmos prompts
+de pesquisa, curadoria e formatação. CachedLLM guarda cada resposta num SQLite local,
+com chave formada pelo modelo, parâmetros de geração, mensagens normalizadas e o
+estado das ferramentas; uma execução repetida ou reexecutada volta em milissegundos
+sem gastar tokens.
+
+- LLM_CACHE_TTL: validade das respostas, em segundos;
+- LLM_CACHE_MAX_ENTRIES: acima disso as respostas menos usadas recentemente saem;
+- skip_llm_cache(task): desliga o cache para tarefas com efeito colateral;
+- get_llm_cache().stats(): contadores de acertos e falhas.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from crewai import LLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.task_events import (TaskCompletedEvent,
+                                                 TaskFailedEvent,
+                                                 TaskStartedEvent)
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join("cache", "llm", "responses.sqlite3"))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+
+# Parâmetros do LLM que mudam a resposta e por isso entram na chave
+KEY_PARAMS = (
+    "model", "base_url", "api_base", "temperature", "top_p", "n", "stop", "max_tokens",
+    "max_completion_tokens", "presence_penalty", "frequency_penalty", "seed", "reasoning_effort",
+)
+
+
+def _normalize_messages(messages: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            # Indentação e quebras de linha dos prompts não mudam o pedido
+            content = " ".join(content.split())
+        normalized.append({"role": message.get("role"), "content": content})
+    return normalized
+
+
+def cache_key(llm: LLM, messages, tools: Optional[List[dict]] = None) -> str:
+    params = {name: getattr(llm, name, None) for name in KEY_PARAMS}
+    response_format = getattr(llm, "response_format", None)
+    if response_format is not None:
+        params["response_format"] = getattr(response_format, "__name__", str(response_format))
+    payload = {"params": params, "messages": _normalize_messages(messages), "tools": tools or []}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Respostas do LLM num SQLite, com validade (TTL) e limite de entradas (LRU).
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl: int = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count(row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": entries,
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+# Tarefas que não usam o cache (por id) e a tarefa em execução em cada thread,
+# acompanhada pelos eventos do CrewAI (emitidos na thread que executa a tarefa)
+_uncached_tasks = set()
+_current = threading.local()
+
+
+def skip_llm_cache(*tasks) -> None:
+    """Desliga o cache do LLM para as tarefas informadas."""
+    for task in tasks:
+        _uncached_tasks.add(task.id)
+
+
+@crewai_event_bus.on(TaskStartedEvent)
+def _on_task_started(source, event):
+    _current.task_id = getattr(event.task, "id", None)
+
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def _on_task_completed(source, event):
+    _current.task_id = None
+
+
+@crewai_event_bus.on(TaskFailedEvent)
+def _on_task_failed(source, event):
+    _current.task_id = None
+
+
+class CachedLLM(LLM):
+    """
+    LLM que consulta o cache de respostas antes de chamar o provedor.
+    """
+
+    def __init__(self, model: str, cache: bool = True, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.cache_enabled = cache
+
+    def _use_cache(self, available_functions) -> bool:
+        # Com available_functions o próprio LLM executa a ferramenta: o efeito não pode ser pulado
+        return (
+            LLM_CACHE_ENABLED
+            and self.cache_enabled
+            and not self.stream
+            and not available_functions
+            and getattr(_current, "task_id", None) not in _uncached_tasks
+        )
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        if not self._use_cache(available_functions):
+            return super().call(messages, tools, callbacks, available_functions)
+
+        cache = get_llm_cache()
+        key = cache_key(self, messages, tools)
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"[llm_cache] Resposta em cache para {self.model} ({key[:12]}).")
+            return cached
+
+        response = super().call(messages, tools, callbacks, available_functions)
+        if isinstance(response, str) and response.strip():
+            cache.put(key, self.model, response)
+        return response
@@ -0,0 +1,293 @@
+# backend/crewai/metrics.py
+"""
+Métricas das execuções das crews no formato de texto do Prometheus.
+
+Para cada tarefa de discover_stores e scrape_store_products são registrados o tempo
+de parede, os passos dos agentes (step_callback), o número de chamadas ao LLM
+(eventos do CrewAI) e os tokens de prompt e de resposta (diferença de crew.calculate_usage_metrics()
+entre o fim de uma tarefa e o da anterior, via task_callback). A duração de cada
+chamada de ferramenta vem dos eventos do CrewAI. Tudo é agregado em histogramas
+expostos por `render_metrics()` na rota /metrics. Os mesmos callbacks publicam os
+eventos de progresso (início e fim de tarefa, passos parciais) via progress.emit.
+
+Os agentes são objetos de módulo compartilhados entre execuções; com mais de uma
+crew rodando ao mesmo tempo (CREW_MAX_WORKERS > 1) a divisão dos tokens entre
+tarefas é aproximada.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from backend.crewai.progress import emit, partial
+
+LabelValues = Tuple[str, ...]
+
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+TOKEN_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Para cada combinação de labels: contagem por bucket, soma e total
+        self._series: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, INF_LABEL)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+TASK_LABELS = ("crew", "task", "agent")
+
+CREW_RUN_SECONDS = Histogram(
+    "crew_run_duration_seconds", "Tempo total de uma execução de crew.", ("crew", "status"))
+CREW_RUNS = Counter(
+    "crew_runs_total", "Execuções de crew por resultado.", ("crew", "status"))
+TASK_SECONDS = Histogram(
+    "crew_task_duration_seconds", "Tempo de parede de cada tarefa.", TASK_LABELS)
+TASK_STEPS = Histogram(
+    "crew_task_steps", "Passos dos agentes por tarefa.", TASK_LABELS, COUNT_BUCKETS)
+TASK_LLM_CALLS = Histogram(
+    "crew_task_llm_calls", "Chamadas ao LLM por tarefa.", TASK_LABELS, COUNT_BUCKETS)
+TASK_PROMPT_TOKENS = Histogram(
+    "crew_task_prompt_tokens", "Tokens de prompt por tarefa.", TASK_LABELS, TOKEN_BUCKETS)
+TASK_COMPLETION_TOKENS = Histogram(
+    "crew_task_completion_tokens", "Tokens de resposta por tarefa.", TASK_LABELS, TOKEN_BUCKETS)
+LLM_CALLS = Counter(
+    "crew_llm_calls_total", "Chamadas ao LLM por agente.", ("crew", "agent"))
+TOKENS = Counter(
+    "crew_tokens_total", "Tokens consumidos por agente.", ("crew", "agent", "kind"))
+TOOL_SECONDS = Histogram(
+    "crew_tool_duration_seconds", "Duração das chamadas de ferramenta.", ("crew", "tool", "agent"))
+TOOL_ERRORS = Counter(
+    "crew_tool_errors_total", "Chamadas de ferramenta com erro.", ("crew", "tool", "agent"))
+
+REGISTRY = [
+    CREW_RUN_SECONDS, CREW_RUNS, TASK_SECONDS, TASK_STEPS, TASK_LLM_CALLS, TASK_PROMPT_TOKENS,
+    TASK_COMPLETION_TOKENS, LLM_CALLS, TOKENS, TOOL_SECONDS, TOOL_ERRORS,
+]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Monitor ativo em cada thread: as ferramentas e os callbacks rodam na thread que
+# executa a crew
+_current = threading.local()
+_events_registered = False
+_events_lock = threading.Lock()
+
+
+def _register_events() -> None:
+    global _events_registered
+    with _events_lock:
+        if _events_registered:
+            return
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.llm_events import LLMCallCompletedEvent
+        from crewai.utilities.events.task_events import TaskStartedEvent
+        from crewai.utilities.events.tool_usage_events import (
+            ToolUsageErrorEvent, ToolUsageFinishedEvent)
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def _on_task_started(source, event):
+            monitor = getattr(_current, "monitor", None)
+            if monitor is not None and event.task is not None:
+                monitor.on_task_start(event.task)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def _on_llm_call(source, event):
+            monitor = getattr(_current, "monitor", None)
+            if monitor is not None:
+                monitor.llm_calls += 1
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def _on_tool_finished(source, event):
+            monitor = getattr(_current, "monitor", None)
+            seconds = (event.finished_at - event.started_at).total_seconds()
+            TOOL_SECONDS.observe(
+                seconds, crew=monitor.crew_name if monitor else "", tool=event.tool_name, agent=event.agent_role or "")
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def _on_tool_error(source, event):
+            monitor = getattr(_current, "monitor", None)
+            TOOL_ERRORS.inc(crew=monitor.crew_name if monitor else "", tool=event.tool_name, agent=event.agent_role or "")
+
+        _events_registered = True
+
+
+# Os agentes são globais e o Crew só preenche agent.step_callback quando ele está vazio,
+# então os callbacks instalados são sempre estas funções, que repassam ao monitor da thread
+def _step_callback(step: Any) -> None:
+    monitor = getattr(_current, "monitor", None)
+    if monitor is not None:
+        monitor.on_step(step)
+
+
+def _task_callback(output: Any) -> None:
+    monitor = getattr(_current, "monitor", None)
+    if monitor is not None:
+        monitor.on_task(output)
+
+
+class CrewRunMonitor:
+    """
+    Registra as métricas de cada tarefa de uma execução de crew. Uso:
+
+        with CrewRunMonitor("stores", crew):
+            crew.kickoff(...)
+    """
+
+    def __init__(self, crew_name: str, crew: Any):
+        _register_events()
+        self.crew_name = crew_name
+        self.crew = crew
+        crew.step_callback = _step_callback
+        crew.task_callback = _task_callback
+        self._task_start = 0.0
+        self._run_start = 0.0
+        self._steps = 0
+        self.llm_calls = 0
+        self._tokens = (0, 0)
+        self._task = ("", "")
+
+    def _usage(self) -> Tuple[int, int]:
+        usage = self.crew.calculate_usage_metrics()
+        return usage.prompt_tokens, usage.completion_tokens
+
+    def __enter__(self) -> "CrewRunMonitor":
+        self._previous = getattr(_current, "monitor", None)
+        _current.monitor = self
+        self._run_start = self._task_start = time.perf_counter()
+        self._steps = 0
+        self.llm_calls = 0
+        self._tokens = self._usage()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        status = "failed" if exc_type else "succeeded"
+        CREW_RUN_SECONDS.observe(time.perf_counter() - self._run_start, crew=self.crew_name, status=status)
+        CREW_RUNS.inc(crew=self.crew_name, status=status)
+        _current.monitor = self._previous
+
+    def on_task_start(self, task: Any) -> None:
+        agent = getattr(task.agent, "role", "") if task.agent else ""
+        self._task = (task.name or " ".join(task.description.split())[:60], agent)
+        emit("task_started", crew=self.crew_name, task=self._task[0], agent=agent)
+
+    def on_step(self, step: Any) -> None:
+        self._steps += 1
+        # AgentAction (pensamento, ferramenta e resultado) ou AgentFinish (resposta)
+        emit(
+            "step",
+            crew=self.crew_name,
+            task=self._task[0],
+            agent=self._task[1],
+            thought=partial(getattr(step, "thought", "")),
+            tool=getattr(step, "tool", None),
+            output=partial(getattr(step, "result", None) or getattr(step, "output", "")),
+        )
+
+    def on_task(self, output: Any) -> None:
+        now = time.perf_counter()
+        prompt, completion = self._usage()
+        labels = {
+            "crew": self.crew_name,
+            "task": output.name or " ".join(output.description.split())[:60],
+            "agent": output.agent or "",
+        }
+        prompt_delta = max(prompt - self._tokens[0], 0)
+        completion_delta = max(completion - self._tokens[1], 0)
+
+        TASK_SECONDS.observe(now - self._task_start, **labels)
+        TASK_STEPS.observe(self._steps, **labels)
+        TASK_LLM_CALLS.observe(self.llm_calls, **labels)
+        TASK_PROMPT_TOKENS.observe(prompt_delta, **labels)
+        TASK_COMPLETION_TOKENS.observe(completion_delta, **labels)
+        LLM_CALLS.inc(self.llm_calls, crew=self.crew_name, agent=labels["agent"])
+        TOKENS.inc(prompt_delta, crew=self.crew_name, agent=labels["agent"], kind="prompt")
+        TOKENS.inc(completion_delta, crew=self.crew_name, agent=labels["agent"], kind="completion")
+
+        emit(
+            "task_finished",
+            crew=self.crew_name,
+            task=labels["task"],
+            agent=labels["agent"],
+            seconds=round(now - self._task_start, 3),
+            output=partial(output.raw),
+        )
+
+        self._task_start = now
+        self._steps = 0
+        self.llm_calls = 0
+        self._tokens = (prompt, completion)
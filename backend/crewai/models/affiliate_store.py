@@ -1,12 +1,21 @@
 # app/models/affiliate_store.py
-from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import (JSON, Boolean, Column, DateTime, Index, Integer,
+                        String, func)
 
 from ..db.session import Base
 
 
 class AffiliateStore(Base):
     __tablename__ = "affiliate_stores"
-    
+    __table_args__ = (
+        # Chave natural usada pelo upsert em lote
+        Index("uq_affiliate_stores_name_platform", "name", "platform", unique=True),
+        # Paginação por (created_at, id), sem filtro e com cada filtro da listagem
+        Index("ix_affiliate_stores_created_id", "created_at", "id"),
+        Index("ix_affiliate_stores_platform_created_id", "platform", "created_at", "id"),
+        Index("ix_affiliate_stores_active_created_id", "active", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     platform = Column(String, index=True, nullable=False)  # mercadolivre, amazon, etc.
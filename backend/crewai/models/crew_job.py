@@ -0,0 +1,35 @@
+# app/models/crew_job.py
+from sqlalchemy import (JSON, Column, DateTime, Index, Integer, String, Text,
+                        func)
+
+from ..db.session import Base
+
+
+class CrewJob(Base):
+    __tablename__ = "crew_jobs"
+    __table_args__ = (
+        # Busca do próximo job disponível e dos leases vencidos
+        Index("ix_crew_jobs_status_available_at", "status", "available_at"),
+        Index("ix_crew_jobs_status_lease_expires_at", "status", "lease_expires_at"),
+        # Submissões repetidas com a mesma chave devolvem o mesmo job
+        Index("uq_crew_jobs_idempotency_key", "idempotency_key", unique=True),
+    )
+
+    id = Column(String(36), primary_key=True)  # uuid4 gerado na submissão
+    kind = Column(String(32), index=True, nullable=False)  # stores, products, products_batch
+    params = Column(JSON, nullable=False)  # Argumentos repassados para a crew
+    status = Column(String(16), index=True, nullable=False, default="queued")  # queued, running, succeeded, failed
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    idempotency_key = Column(String(128), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")  # Execuções iniciadas
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    available_at = Column(DateTime(timezone=True), nullable=True)  # Início da próxima tentativa (backoff)
+    lease_owner = Column(String(128), nullable=True)  # Worker que está executando o job
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # Sem renovação até aqui, outro worker assume
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<CrewJob {self.id} {self.kind} {self.status}>"
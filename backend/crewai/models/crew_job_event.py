@@ -0,0 +1,18 @@
+# app/models/crew_job_event.py
+from sqlalchemy import (JSON, Column, DateTime, ForeignKey, Integer, String,
+                        func)
+
+from ..db.session import Base
+
+
+class CrewJobEvent(Base):
+    __tablename__ = "crew_job_events"
+
+    id = Column(Integer, primary_key=True, index=True)  # Crescente: usado como Last-Event-ID no SSE
+    job_id = Column(String(36), ForeignKey('crew_jobs.id'), index=True, nullable=False)
+    type = Column(String(32), nullable=False)  # job_started, task_started, step, task_finished, product, job_retry, job_finished
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<CrewJobEvent {self.job_id} #{self.id} {self.type}>"
@@ -0,0 +1,15 @@
+# app/models/data_version.py
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from ..db.session import Base
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String(32), primary_key=True)  # stores, products
+    version = Column(Integer, nullable=False, default=0)  # Incrementada a cada gravação
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DataVersion {self.name} {self.version}>"
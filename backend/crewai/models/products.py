@@ -1,5 +1,5 @@
 # app/models/product.py
-from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Integer,
+from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
                         Numeric, String, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -9,6 +9,16 @@ from ..db.session import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Chave natural usada pelo upsert em lote
+        Index("uq_products_platform_external_id", "platform", "external_id", unique=True),
+        # Paginação por (created_at, id), sem filtro e com cada filtro da listagem
+        Index("ix_products_created_id", "created_at", "id"),
+        Index("ix_products_platform_created_id", "platform", "created_at", "id"),
+        Index("ix_products_category_created_id", "category", "created_at", "id"),
+        Index("ix_products_store_created_id", "affiliate_store_id", "created_at", "id"),
+        Index("ix_products_available_created_id", "available", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, index=True)
@@ -0,0 +1,32 @@
+# app/models/store_selectors.py
+from sqlalchemy import (JSON, Column, DateTime, ForeignKey, Integer, String,
+                        func)
+from sqlalchemy.orm import relationship
+
+from ..db.session import Base
+
+
+class StoreSelectors(Base):
+    __tablename__ = "store_selectors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String(255), unique=True, index=True, nullable=False)  # ex: www.americanas.com.br
+    affiliate_store_id = Column(Integer, ForeignKey('affiliate_stores.id'), nullable=True, index=True)
+    affiliate_store = relationship('AffiliateStore', backref="selectors")
+    listing_url = Column(String, nullable=False)  # Página em que os seletores foram detectados
+    search_url = Column(String, nullable=True)  # Busca da loja, com {busca} no lugar do termo
+    render_mode = Column(String(16), nullable=False, default="raw")  # raw (HTML bruto) ou rendered (navegador)
+    card = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    price = Column(String, nullable=True)
+    link = Column(String, nullable=True)
+    confidence = Column(JSON, nullable=True)
+    validated_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def as_dict(self):
+        return {"card": self.card, "name": self.name, "price": self.price, "link": self.link}
+
+    def __repr__(self):
+        return f"<StoreSelectors {self.domain}>"
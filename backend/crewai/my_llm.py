@@ -1,22 +1,115 @@
 import os
+import threading
+from typing import Any, Dict, Optional
 
+import httpx
 from crewai import LLM
 from dotenv import load_dotenv
 
+from backend.crewai.llm_cache import CachedLLM
+
 load_dotenv()
 
+# Configuraçao única dos provedores: URL base, variável com a chave e o tipo de
+# cliente HTTP compartilhado que o litellm aceita para cada um. O deepseek fica sem
+# cliente próprio: conforme a versão do litellm ele passa pelo handler da OpenAI ou
+# pelo HTTP genérico, e um cliente do tipo errado quebra ou é ignorado.
+PROVIDERS: Dict[str, Dict[str, Any]] = {
+    'openai':    {'base_url': os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1'), 'api_key_env': 'OPENAI_API_KEY', 'client': 'openai'},
+    'groq':      {'base_url': os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1'), 'api_key_env': 'GROQ_API_KEY', 'client': 'http'},
+    'deepseek':  {'base_url': os.getenv('DEEPSEEK_BASE_URL', 'https://api.deepseek.com'), 'api_key_env': 'DEEPSEEK_API_KEY', 'client': None},
+    'ollama':    {'base_url': os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434'), 'api_key_env': None, 'client': None},
+    'anthropic': {'base_url': None, 'api_key_env': 'ANTHROPIC_API_KEY', 'client': None},
+}
+
+# Nome do atributo -> (provedor, modelo, usa o cache de respostas)
+MODELS: Dict[str, tuple] = {
+    'GTP4o_mini':            ('openai', 'gpt-4o-mini', True),
+    'GPT4o_mini_2024_07_18': ('openai', 'gpt-4o-mini-2024-07-18', False),
+    'GPT_4o_2024_08_06':     ('openai', 'gpt-4o-2024-08-06', False),
+    'GTP4o':                 ('openai', 'gpt4o', False),
+    'GPT_o1':                ('openai', 'o1-preview', False),
+    'GPT_o1_mini':           ('openai', 'o1-mini', False),
+    'Ollama_llama_3_1':      ('ollama', 'ollama/llama3.1', False),
+    'Claude_3_opus':         ('anthropic', 'claude-3-opus-20240229', False),
+    'LLAMA3_70B':            ('groq', 'groq/llama3-70b-8192', False),
+    'GROQ_LLAMA':            ('groq', 'groq/llama-3.2-3b-preview', False),
+    'GROQ_LLAMA2':           ('groq', 'groq/llama-3.2-11b-vision-preview', False),
+    'GROQ_MIXTRAL':          ('groq', 'groq/mixtral-8x7b-32768', False),
+    'DEEPSEEK_R1':           ('deepseek', 'deepseek/deepseek-reasoner', False),
+    'DEEPSEEK_CHAT':         ('deepseek', 'deepseek/deepseek-chat', False),
+}
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv('LLM_HTTP_MAX_CONNECTIONS', '20'))
+LLM_HTTP_TIMEOUT = float(os.getenv('LLM_HTTP_TIMEOUT', '120'))
+
+_clients: Dict[str, Any] = {}
+_llms: Dict[str, LLM] = {}
+_lock = threading.Lock()
+
+
+def _provider_client(provider: str) -> Optional[Any]:
+    """
+    Cliente compartilhado por todos os modelos do provedor, com um único pool de
+    conexões HTTP. Criado no primeiro uso.
+    """
+    settings = PROVIDERS[provider]
+    if settings['client'] is None:
+        return None
+    if settings['api_key_env'] and not os.getenv(settings['api_key_env']):
+        # Sem chave o erro aparece na chamada, como antes, e não ao montar os agentes
+        return None
+    if provider not in _clients:
+        http_client = httpx.Client(
+            timeout=LLM_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        if settings['client'] == 'openai':
+            from openai import OpenAI
+            _clients[provider] = OpenAI(
+                api_key=os.getenv(settings['api_key_env']),
+                base_url=settings['base_url'],
+                http_client=http_client,
+            )
+        else:
+            from litellm.llms.custom_httpx.http_handler import HTTPHandler
+            _clients[provider] = HTTPHandler(client=http_client)
+    return _clients[provider]
+
+
+def get_llm(name: str) -> LLM:
+    """
+    Devolve o LLM registrado com esse nome, construindo-o no primeiro uso.
+    """
+    with _lock:
+        if name not in _llms:
+            provider, model, cached = MODELS[name]
+            settings = PROVIDERS[provider]
+            kwargs: Dict[str, Any] = {'model': model}
+            if settings['base_url']:
+                kwargs['base_url'] = settings['base_url']
+            if settings['api_key_env']:
+                kwargs['api_key'] = os.getenv(settings['api_key_env'])
+            client = _provider_client(provider)
+            if client is not None:
+                kwargs['client'] = client
+            _llms[name] = CachedLLM(**kwargs) if cached else LLM(**kwargs)
+        return _llms[name]
+
+
 class MyLLM():
-    GTP4o_mini            = LLM(model='gpt-4o-mini', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    GPT4o_mini_2024_07_18 = LLM(model='gpt-4o-mini-2024-07-18', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    GPT_4o_2024_08_06     = LLM(model='gpt-4o-2024-08-06', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    GTP4o                 = LLM(model='gpt4o', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    GPT_o1                = LLM(model='o1-preview', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    GPT_o1_mini           = LLM(model='o1-mini', base_url='https://api.openai.com/v1',api_key=os.getenv('OPENAI_API_KEY'))
-    Ollama_llama_3_1      = LLM(model="ollama/llama3.1", base_url="http://localhost:11434")
-    Claude_3_opus         = LLM(model='claude-3-opus-20240229')
-    LLAMA3_70B            = LLM(model='groq/llama3-70b-8192', base_url='https://api.groq.com/openai/v1', api_key=os.getenv('GROQ_API_KEY'))
-    GROQ_LLAMA            = LLM(model='groq/llama-3.2-3b-preview', base_url='https://api.groq.com/openai/v1', api_key=os.getenv('GROQ_API_KEY'))
-    GROQ_LLAMA2           = LLM(model='groq/llama-3.2-11b-vision-preview', base_url='https://api.groq.com/openai/v1', api_key=os.getenv('GROQ_API_KEY'))
-    GROQ_MIXTRAL          = LLM(model='groq/mixtral-8x7b-32768', base_url='https://api.groq.com/openai/v1', api_key=os.getenv('GROQ_API_KEY'))
-    DEEPSEEK_R1           = LLM(model='deepseek/deepseek-reasoner', base_url='https://api.deepseek.com',api_key=os.getenv('DEEPSEEK_API_KEY'))
-    DEEPSEEK_CHAT         = LLM(model='deepseek/deepseek-chat', base_url='https://api.deepseek.com',api_key=os.getenv('DEEPSEEK_API_KEY'))
\ No newline at end of file
+    """
+    Acesso aos modelos por nome (my_llm.GTP4o_mini). Nada é criado no import: cada
+    LLM é montado na primeira vez que o atributo é lido e reaproveitado depois.
+    """
+
+    def __getattr__(self, name: str) -> LLM:
+        if name in MODELS:
+            return get_llm(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(MODELS))
@@ -0,0 +1,251 @@
+# backend/crewai/product_extractor.py
+"""
+Extração determinística de produtos a partir dos seletores da loja.
+
+Com os seletores de card, nome, preço e link já conhecidos, as páginas de listagem
+são baixadas (em paralelo quando a paginação segue um parâmetro numérico), os cards
+são lidos direto do HTML e cada produto vira um ProductCreate, sem chamadas ao LLM.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from pydantic import ValidationError
+
+from backend.crewai.db.store_selectors import store_domain
+from backend.crewai.schemas.product import ProductCreate
+from backend.crewai.store_structure import RENDER_FETCHERS
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.html_analysis import parse_html
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+EXTRACTOR_MAX_PAGES = int(os.environ.get("EXTRACTOR_MAX_PAGES", "10"))
+EXTRACTOR_MAX_WORKERS = int(os.environ.get("EXTRACTOR_MAX_WORKERS", "4"))
+
+PAGE_PARAMS = ("page", "pagina", "p", "pg")
+NEXT_LINK_TEXTS = {"próxima", "próximo", "proxima", "proximo", "next", "›", "»", ">"}
+PRICE_VALUE_RE = re.compile(r'\d[\d.,]*')
+
+
+def parse_price(text: str) -> Optional[float]:
+    """
+    Converte preços como "R$ 1.299,90" ou "$1,299.90" em float.
+    """
+    match = PRICE_VALUE_RE.search(text or "")
+    if not match:
+        return None
+    value = match.group(0).rstrip(".,")
+    # O último separador seguido de 1 ou 2 dígitos é o decimal; os demais são de milhar
+    last = max(value.rfind(","), value.rfind("."))
+    if last != -1 and len(value) - last - 1 in (1, 2):
+        integer, decimal = value[:last], value[last + 1:]
+    else:
+        integer, decimal = value, ""
+    integer = re.sub(r"[.,]", "", integer)
+    return float(f"{integer}.{decimal}" if decimal else integer)
+
+
+def _external_id(product_url: str) -> str:
+    parts = urlsplit(product_url)
+    segments = [s for s in parts.path.split("/") if s]
+    return segments[-1] if segments else parts.netloc
+
+
+def _first_text(card, selector: Optional[str]) -> str:
+    if not selector:
+        return ""
+    try:
+        found = card.cssselect(selector)
+    except Exception:
+        return ""
+    return " ".join(found[0].text_content().split()) if found else ""
+
+
+def _card_link(card, selector: Optional[str]) -> Optional[str]:
+    candidates = []
+    if selector:
+        try:
+            candidates = card.cssselect(selector)
+        except Exception:
+            candidates = []
+    if card.tag == "a":
+        candidates.append(card)
+    candidates += card.cssselect("a[href]")
+    for el in candidates:
+        href = el.get("href")
+        if href and not href.startswith(("#", "javascript:")):
+            return href
+    return None
+
+
+def _card_image(card) -> Optional[str]:
+    for img in card.iter("img"):
+        for attr in ("src", "data-src", "data-lazy-src", "data-original"):
+            src = img.get(attr)
+            if src and not src.startswith("data:"):
+                return src
+    return None
+
+
+def parse_listing(html, page_url: str, selectors: Dict[str, Any], nicho: str = "") -> List[ProductCreate]:
+    """
+    Lê os cards de uma página de listagem e devolve os produtos válidos.
+    """
+    tree = parse_html(html)
+    platform = store_domain(page_url)
+    products = []
+    for card in tree.cssselect(selectors["card"]):
+        title = _first_text(card, selectors.get("name"))
+        href = _card_link(card, selectors.get("link"))
+        if not title or not href:
+            continue
+        product_url = urljoin(page_url, href)
+        image = _card_image(card)
+        try:
+            products.append(ProductCreate(
+                external_id=_external_id(product_url),
+                platform=platform,
+                title=title,
+                description="",
+                price=parse_price(_first_text(card, selectors.get("price"))),
+                image_url=urljoin(page_url, image) if image else None,
+                product_url=product_url,
+                category=nicho,
+            ))
+        except ValidationError as ve:
+            logger.debug(f"[parse_listing] Card ignorado ({product_url}): {ve.errors()}")
+    return products
+
+
+def _next_page_url(html, page_url: str) -> Optional[str]:
+    tree = parse_html(html)
+    for el in tree.cssselect("a[rel~=next], link[rel~=next]"):
+        if el.get("href"):
+            return urljoin(page_url, el.get("href"))
+    for el in tree.iter("a"):
+        text = " ".join(el.text_content().split()).lower()
+        label = (el.get("aria-label") or el.get("title") or "").lower()
+        if el.get("href") and (text in NEXT_LINK_TEXTS or label in NEXT_LINK_TEXTS):
+            return urljoin(page_url, el.get("href"))
+    return None
+
+
+def _numbered_pages(next_url: str, count: int) -> Optional[List[str]]:
+    """
+    Se a próxima página é `?page=2` (ou equivalente), gera as `count` URLs seguintes
+    para baixá-las em paralelo.
+    """
+    parts = urlsplit(next_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for i, (key, value) in enumerate(query):
+        if key.lower() in PAGE_PARAMS and value.isdigit():
+            first = int(value)
+            urls = []
+            for number in range(first, first + count):
+                query[i] = (key, str(number))
+                urls.append(urlunsplit(parts._replace(query=urlencode(query))))
+            return urls
+    return None
+
+
+def _read_page(fetch, url: str, selectors: Dict[str, Any], nicho: str):
+    """
+    Baixa e lê uma página de listagem. Uma falha fica restrita à página: devolve
+    (None, None) e a extração segue com as demais.
+    """
+    try:
+        html = parse_html(fetch(url))
+        return html, parse_listing(html, url, selectors, nicho)
+    except Exception as e:
+        logger.warning(f"[iter_products] Falha ao ler a página {url}: {e}")
+        return None, None
+
+
+def iter_products(
+    listing_url: str,
+    selectors: Dict[str, Any],
+    render_mode: str = "raw",
+    nicho: str = "",
+    quantidade: int = 20,
+    max_pages: int = EXTRACTOR_MAX_PAGES,
+) -> Iterator[ProductCreate]:
+    """
+    Percorre as páginas de listagem e emite os produtos à medida que cada página é lida,
+    sem repetir URLs, até atingir `quantidade`. Uma página que falha é pulada (ou
+    encerra a paginação sequencial) sem descartar o que já foi lido.
+    """
+    fetch = RENDER_FETCHERS[render_mode]
+    seen = set()
+
+    def unseen(products):
+        for product in products:
+            if len(seen) >= quantidade:
+                return
+            if product.product_url not in seen:
+                seen.add(product.product_url)
+                yield product
+
+    html, first_page = _read_page(fetch, listing_url, selectors, nicho)
+    if not first_page:
+        return
+    yield from unseen(first_page)
+    if len(seen) >= quantidade:
+        return
+
+    # Estima quantas páginas ainda são necessárias pelo tamanho da primeira
+    missing_pages = -(-(quantidade - len(seen)) // len(first_page))
+    next_url = _next_page_url(html, listing_url)
+    numbered = _numbered_pages(next_url, min(missing_pages, max_pages - 1)) if next_url else None
+
+    if numbered:
+        def load(url):
+            return _read_page(fetch, url, selectors, nicho)[1]
+
+        # No modo rendered as threads só esperam: as páginas são renderizadas pelos
+        # navegadores do pool compartilhado (browser_pool), que limita os Chromium abertos
+        with ThreadPoolExecutor(max_workers=EXTRACTOR_MAX_WORKERS) as executor:
+            for products in executor.map(load, numbered):
+                if products is None:
+                    continue
+                if len(seen) >= quantidade or not products:
+                    break
+                yield from unseen(products)
+        return
+
+    pages = 1
+    while next_url and pages < max_pages and len(seen) < quantidade:
+        html, products = _read_page(fetch, next_url, selectors, nicho)
+        if not products:
+            break
+        yield from unseen(products)
+        pages += 1
+        next_url = _next_page_url(html, next_url)
+
+
+def extract_products(
+    listing_url: str,
+    selectors: Dict[str, Any],
+    render_mode: str = "raw",
+    nicho: str = "",
+    quantidade: int = 20,
+) -> List[ProductCreate]:
+    """
+    Extrai os produtos da listagem. Um erro inesperado encerra a extração mas mantém
+    os produtos já lidos. Os eventos `product` ficam para quem grava os produtos, para
+    que os clientes só vejam o que foi salvo.
+    """
+    products = []
+    try:
+        for product in iter_products(listing_url, selectors, render_mode, nicho, quantidade):
+            products.append(product)
+    except Exception as e:
+        logger.error(f"[extract_products] Falha na extração de {listing_url}: {e}", exc_info=True)
+    return products
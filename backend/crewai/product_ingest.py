@@ -0,0 +1,152 @@
+# backend/crewai/product_ingest.py
+"""
+Ingestão de produtos em lote.
+
+Cada bloco de INGEST_CHUNK_SIZE registros é validado de uma vez (ProductCreateList)
+e as linhas válidas seguem para um upsert em lote. Para entradas grandes demais para
+caber numa string JSON, `iter_json_records` lê um arquivo JSON Lines ou um array JSON
+aos poucos. Cada bloco é gravado na sua própria transação: a importação não é
+atômica, e um erro (de leitura ou de banco) só atinge os registros afetados.
+"""
+
+import json
+import logging
+import os
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.crewai.db.insert_product_list import bulk_upsert_products
+from backend.crewai.db.session import SessionLocal
+from backend.crewai.schemas.product import validate_product_list
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+INGEST_CHUNK_SIZE = int(os.environ.get("INGEST_CHUNK_SIZE", "1000"))
+# Único diretório de onde a ferramenta de inserção dos agentes lê arquivos de produtos
+PRODUCT_IMPORT_DIR = os.environ.get("PRODUCT_IMPORT_DIR", "imports")
+READ_BLOCK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def _iter_json_array(f, buffer: str) -> Iterator[Any]:
+    """
+    Decodifica os itens de um array JSON um por vez, lendo o arquivo em blocos.
+    `buffer` começa logo depois do '['.
+    """
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = _decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            block = f.read(READ_BLOCK_SIZE)
+            eof = not block
+            buffer += block
+            continue
+        yield item
+        buffer = buffer[end:]
+
+
+def resolve_import_path(name: str) -> str:
+    """
+    Caminho de um arquivo dentro de PRODUCT_IMPORT_DIR. Caminhos absolutos ou que
+    saem do diretório (por .. ou links simbólicos) são recusados com ValueError.
+    """
+    base = os.path.realpath(PRODUCT_IMPORT_DIR)
+    path = os.path.realpath(os.path.join(base, name))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"arquivo fora do diretório de importação ({PRODUCT_IMPORT_DIR}): {name}")
+    return path
+
+
+def iter_json_records(path: str) -> Iterator[Any]:
+    """
+    Lê os registros de um arquivo JSON Lines (um objeto por linha) ou de um array
+    JSON, sem carregar o arquivo inteiro na memória.
+    """
+    with open(path, encoding="utf-8") as f:
+        head = f.read(READ_BLOCK_SIZE)
+        stripped = head.lstrip()
+        if stripped.startswith("["):
+            yield from _iter_json_array(f, stripped[1:])
+            return
+
+        # JSON Lines: o primeiro bloco pode ter cortado uma linha no meio
+        rest = head + f.readline()
+        for line in rest.splitlines():
+            if line.strip():
+                yield json.loads(line)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_chunk(records: Iterator[Any], size: int) -> Tuple[List[Any], Optional[Exception]]:
+    """
+    Lê até `size` registros. Um erro de leitura (por exemplo JSON inválido no meio do
+    arquivo) devolve o que foi lido antes dele, junto com o erro.
+    """
+    chunk: List[Any] = []
+    try:
+        for record in islice(records, size):
+            chunk.append(record)
+    except Exception as e:
+        return chunk, e
+    return chunk, None
+
+
+def ingest_products(
+    records: Iterable[Any],
+    chunk_size: int = INGEST_CHUNK_SIZE,
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    Valida e grava produtos em blocos, numa sessão com uma transação por bloco. Os
+    blocos já gravados continuam gravados se um bloco seguinte falhar.
+
+    Returns:
+        Tupla com os ids gravados, um por registro de entrada gravado com sucesso e na
+        ordem da entrada (registros com a mesma platform/external_id repetem o id), e
+        um dict {índice: erro} (índices a partir de 0, relativos à sequência de entrada).
+        Um erro de leitura é registrado na posição em que ocorreu e encerra a leitura.
+    """
+    ids: List[int] = []
+    errors: Dict[int, str] = {}
+    records = iter(records)
+    offset = 0
+
+    db = SessionLocal()
+    try:
+        while True:
+            chunk, read_error = _read_chunk(records, chunk_size)
+            if chunk:
+                rows, chunk_errors = validate_product_list(chunk)
+                errors.update({offset + i: msg for i, msg in chunk_errors.items()})
+                if rows:
+                    try:
+                        ids.extend(bulk_upsert_products(rows, db))
+                    except Exception as e:
+                        logger.error(f"[ingest_products] Falha ao gravar o bloco {offset}-{offset + len(chunk) - 1}: {e}")
+                        for i in range(len(chunk)):
+                            if offset + i not in errors:
+                                errors[offset + i] = f"Erro ao inserir no banco: {e}"
+                offset += len(chunk)
+            if read_error is not None:
+                logger.error(f"[ingest_products] Leitura interrompida no registro {offset}: {read_error}")
+                errors[offset] = f"Erro ao ler a entrada: {read_error}"
+                break
+            if not chunk:
+                break
+    finally:
+        db.close()
+
+    logger.debug(f"[ingest_products] {len(ids)} produtos gravados, {len(errors)} com erro.")
+    return ids, errors
@@ -0,0 +1,59 @@
+# backend/crewai/progress.py
+"""
+Eventos de progresso das execuções das crews.
+
+Quem executa uma crew (por exemplo run_job) registra um ouvinte com
+`progress_listener`; enquanto a crew roda na mesma thread, os callbacks de passo e
+de tarefa (ver metrics.CrewRunMonitor) e a gravação dos produtos extraídos chamam
+`emit`, e cada evento chega ao ouvinte na hora. Sem ouvinte registrado, `emit` não faz nada.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+# Tamanho máximo dos textos parciais (pensamentos, saídas) enviados nos eventos
+PARTIAL_TEXT_LIMIT = 2000
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+_current = threading.local()
+
+
+@contextmanager
+def progress_listener(listener: Optional[Listener]) -> Iterator[None]:
+    previous: Optional[Listener] = getattr(_current, "listener", None)
+    _current.listener = listener
+    try:
+        yield
+    finally:
+        _current.listener = previous
+
+
+def current_listener() -> Optional[Listener]:
+    """Ouvinte da thread atual, para repassá-lo a threads auxiliares."""
+    return getattr(_current, "listener", None)
+
+
+def emit(type: str, **data: Any) -> None:
+    listener = getattr(_current, "listener", None)
+    if listener is None:
+        return
+    try:
+        listener(type, data)
+    except Exception as e:
+        # Progresso é acessório: uma falha ao publicar não interrompe a crew
+        logger.warning(f"[progress] Falha ao publicar o evento {type}: {e}")
+
+
+def partial(text: Any) -> str:
+    text = str(text or "")
+    return text if len(text) <= PARTIAL_TEXT_LIMIT else text[:PARTIAL_TEXT_LIMIT] + "..."
@@ -0,0 +1,47 @@
+# app/schemas/crew_job.py
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class CrewJobStatus(BaseModel):
+    id: str
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    error: Optional[str] = None
+    attempts: int = 0
+    idempotency_key: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CrewJobResult(BaseModel):
+    id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StoreTarget(BaseModel):
+    url: str
+    nicho: Optional[str] = None  # Sobrepõe o nicho do lote para esta loja
+    quantidade: Optional[int] = Field(None, gt=0)
+
+class ProductBatchRequest(BaseModel):
+    lojas: List[StoreTarget] = []
+    todas_ativas: bool = Field(False, description="Inclui todas as lojas afiliadas ativas")
+    nicho: str
+    quantidade: int = Field(20, gt=0)
+    timeout: Optional[float] = Field(None, gt=0, description="Tempo máximo por loja, em segundos")
+
+    @model_validator(mode="after")
+    def check_targets(self):
+        if not self.lojas and not self.todas_ativas:
+            raise ValueError("Informe as lojas ou todas_ativas=true.")
+        return self
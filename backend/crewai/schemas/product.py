@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, HttpUrl
+from pydantic import (BaseModel, ConfigDict, HttpUrl, TypeAdapter,
+                      ValidationError)
 
 
 class ProductBase(BaseModel):
@@ -20,6 +21,34 @@ class ProductBase(BaseModel):
 class ProductCreate(ProductBase):
     pass
 
+ProductCreateList = TypeAdapter(List[ProductCreate])
+
+
+def validate_product_list(items: List[Any]) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+    """
+    Validates a whole list of products in one pass.
+
+    Returns the valid rows as dicts (in input order) and a dict {index: error}
+    for the items that failed validation.
+
+    Raises:
+        ValueError: If `items` itself is invalid (e.g. not a list).
+    """
+    try:
+        return [p.model_dump() for p in ProductCreateList.validate_python(items)], {}
+    except ValidationError as ve:
+        messages: Dict[int, List[str]] = {}
+        for error in ve.errors():
+            if not error["loc"] or not isinstance(error["loc"][0], int):
+                # Erro da entrada inteira, não de um item (por exemplo, não é uma lista)
+                raise ValueError(f"Lista de produtos inválida: {error['msg']}") from ve
+            index, *field = error["loc"]
+            messages.setdefault(index, []).append(f"{'.'.join(map(str, field)) or 'item'}: {error['msg']}")
+
+    errors = {index: "; ".join(msgs) for index, msgs in messages.items()}
+    valid = [item for i, item in enumerate(items) if i not in errors]
+    return [p.model_dump() for p in ProductCreateList.validate_python(valid)], errors
+
 class ProductUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -0,0 +1,160 @@
+# backend/crewai/store_structure.py
+"""
+Seletores de produto aprendidos por loja.
+
+Antes de pedir a um agente que descubra a estrutura de uma loja, os seletores já
+conhecidos são validados contra a página de resultados da busca pelo nicho, a mesma
+que o extrator lê (HTML bruto ou renderizado, conforme foram aprendidos). Só quando a validação falha a detecção roda de novo: primeiro o
+detector determinístico e, se ele não encontrar seletores válidos, a crew.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from backend.crewai.db.session import SessionLocal
+from backend.crewai.db.store_selectors import (get_store_selectors,
+                                               mark_validated,
+                                               save_store_selectors)
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.html_analysis import (detect_search_template,
+                                                detect_selectors, fetch_html,
+                                                search_listing_url,
+                                                validate_selectors)
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+
+def _fetch_rendered_html(url: str) -> str:
+    # Import tardio: o Playwright só é carregado quando o HTML bruto não basta
+    from backend.crewai.tools.browser_pool import fetch_rendered_html
+    return fetch_rendered_html(url)
+
+
+RENDER_FETCHERS: Dict[str, Callable[[str], Any]] = {
+    "raw": fetch_html,
+    "rendered": _fetch_rendered_html,
+}
+
+
+def _try_fetch(render_mode: str, url: str):
+    try:
+        return RENDER_FETCHERS[render_mode](url)
+    except Exception as e:
+        logger.warning(f"[store_structure] Falha ao obter {url} ({render_mode}): {e}")
+        return None
+
+
+def _search_url(loja_url: str, known) -> Optional[str]:
+    """
+    Modelo da URL de busca da loja: o salvo junto com os seletores ou, sem ele, o do
+    formulário de busca da página inicial.
+    """
+    if known is not None and known.search_url:
+        return known.search_url
+    for render_mode in RENDER_FETCHERS:
+        html = _try_fetch(render_mode, loja_url)
+        template = detect_search_template(html, loja_url) if html else None
+        if template:
+            return template
+    return None
+
+
+def resolve_store_selectors(loja_url: str, nicho: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna os seletores de card, nome, preço e link da loja sem usar LLM, ou None
+    se nem os seletores salvos nem o detector determinístico servirem. A validação e
+    a detecção usam a página de resultados da busca pelo nicho, a mesma que o
+    extrator lê; sem busca conhecida na loja não há página a validar e o retorno é None.
+
+    Returns:
+        dict com `selectors`, `render_mode`, `source` ("learned" ou "detected"),
+        `validation` e `listing_url`.
+    """
+    db = SessionLocal()
+    try:
+        known = get_store_selectors(loja_url, db)
+        search_url = _search_url(loja_url, known)
+        if search_url is None:
+            logger.debug(f"[resolve_store_selectors] Sem busca conhecida em {loja_url}")
+            return None
+        listing_url = search_listing_url(search_url, nicho)
+
+        if known is not None:
+            html = _try_fetch(known.render_mode, listing_url)
+            validation = validate_selectors(html, known.as_dict()) if html else {"valid": False}
+            if validation["valid"]:
+                known.search_url = search_url
+                mark_validated(known, db)
+                logger.debug(f"[resolve_store_selectors] Seletores aprendidos válidos para {known.domain}")
+                return {
+                    "selectors": known.as_dict(),
+                    "render_mode": known.render_mode,
+                    "source": "learned",
+                    "validation": validation,
+                    "listing_url": listing_url,
+                }
+            logger.debug(f"[resolve_store_selectors] Seletores de {known.domain} inválidos em {listing_url}: {validation}")
+
+        for render_mode in RENDER_FETCHERS:
+            html = _try_fetch(render_mode, listing_url)
+            if not html:
+                continue
+            detected = detect_selectors(html)
+            if "erro" in detected:
+                continue
+            selectors = detected["suggested_selectors"]
+            validation = validate_selectors(html, selectors)
+            if validation["valid"]:
+                save_store_selectors(loja_url, selectors, db, render_mode, detected["confidence"],
+                                     listing_url=listing_url, search_url=search_url)
+                return {
+                    "selectors": selectors,
+                    "render_mode": render_mode,
+                    "source": "detected",
+                    "validation": validation,
+                    "listing_url": listing_url,
+                }
+        return None
+    finally:
+        db.close()
+
+
+def learn_store_selectors(
+    loja_url: str,
+    nicho: str,
+    selectors: Dict[str, Any],
+    render_mode: str = "rendered",
+) -> Optional[Dict[str, Any]]:
+    """
+    Salva seletores obtidos pela crew, desde que passem na validação sobre a página
+    de resultados da busca pelo nicho.
+
+    Returns:
+        A estrutura salva (como em resolve_store_selectors) ou None.
+    """
+    if not selectors.get("card"):
+        return None
+    db = SessionLocal()
+    try:
+        search_url = _search_url(loja_url, get_store_selectors(loja_url, db))
+        if search_url is None:
+            return None
+        listing_url = search_listing_url(search_url, nicho)
+        html = _try_fetch(render_mode, listing_url)
+        validation = validate_selectors(html, selectors) if html else {"valid": False}
+        if not validation["valid"]:
+            return None
+        save_store_selectors(loja_url, selectors, db, render_mode,
+                             listing_url=listing_url, search_url=search_url)
+        return {
+            "selectors": selectors,
+            "render_mode": render_mode,
+            "source": "crew",
+            "validation": validation,
+            "listing_url": listing_url,
+        }
+    finally:
+        db.close()
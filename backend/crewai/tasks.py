@@ -1,7 +1,8 @@
 # backend/crewai/tasks.py
+import os
+
 from crewai import Task
 from crewai_tools import (
-    ScrapeWebsiteTool, 
     # SeleniumScrapingTool, 
     SerperDevTool)
 
@@ -17,8 +18,11 @@ from backend.crewai.agents import (
     store_navigator_agent, store_researcher,
     ecommerce_structure_specialist
     )
+from backend.crewai.llm_cache import skip_llm_cache
 from backend.crewai.my_llm import MyLLM
+from backend.crewai.product_ingest import PRODUCT_IMPORT_DIR
 from backend.crewai.tools.tools import (
+    CachedScrapeWebsiteTool,
     insert_affiliate_stores_tool,
     insert_product_list_tool, 
     read_website_content
@@ -29,13 +33,16 @@ from backend.crewai.tools.autodetect_product_selectors_tool import(
 from backend.crewai.tools.count_html_structures_tool import(
     count_repeated_html_structures
     )
+from backend.crewai.tools.html_digest_tool import read_html_digest
+from backend.crewai.tools.product_pages_tool import fetch_product_pages
 
-scraper_tool = ScrapeWebsiteTool()
+scraper_tool = CachedScrapeWebsiteTool()
 # selenium_tool = SeleniumScrapingTool()
 serper_tool = SerperDevTool()
 my_llm = MyLLM()
 
 research_affiliate_stores = Task(
+    name='research_affiliate_stores',
     description=
     """
        Research and compile a list of online stores that offer affiliate 
@@ -53,6 +60,7 @@ research_affiliate_stores = Task(
 )
 
 curate_top_affiliate_stores = Task(
+    name='curate_top_affiliate_stores',
     description=
     """
        Evaluate the list of discovered affiliate stores based on their 
@@ -69,6 +77,7 @@ curate_top_affiliate_stores = Task(
 )
 
 format_output = Task(
+    name='format_output',
     description=
     """
         Crie uma lista de objetos do tipo AffiliateStoreCreate com os 
@@ -96,6 +105,7 @@ format_output = Task(
 )
 
 search_public_api = Task(
+    name='search_public_api',
     description=
     """
         Busque, para as lojas selecionadas, se existe disponível uma API pública
@@ -116,6 +126,7 @@ search_public_api = Task(
 )
 
 insert_curated_stores = Task(
+    name='insert_curated_stores',
     description=
     """
        Utilize o InsertAffiliateStoresTool para inserir os dados gerados anteriormente. 
@@ -134,6 +145,7 @@ insert_curated_stores = Task(
 )
 
 identify_ecomerce_structure_task = Task(
+    name='identify_ecomerce_structure_task',
     description=
     """
     Acesse a URL informada e utilize a ferramenta de auto-detecção para sugerir
@@ -142,43 +154,44 @@ identify_ecomerce_structure_task = Task(
     """,
     expected_output=
     """
-        uma lista com os seletores identificados e as respectivas quantidades de vezes que aparecem na página
+      Um dicionário (JSON) contendo:
+        - card_tag: nome da tag principal dos cards (ex: div, li, article)
+        - card_count: quantidade de cards identificados
+        - suggested_selectors:
+            card: seletor CSS do card de produto
+            name: seletor CSS do nome do produto
+            price: seletor CSS do preço do produto
+            link: seletor CSS do link do produto
     """,
-    #   Um dicionário (JSON) contendo:
-    #     - card_tag: nome da tag principal dos cards (ex: div, li, article)
-    #     - card_count: quantidade de cards identificados
-    #     - suggested_selectors:
-    #         card: seletor CSS do card de produto
-    #         name: seletor CSS do nome do produto
-    #         price: seletor CSS do preço do produto
-    #         link: seletor CSS do link do produto
-
     agent=ecommerce_structure_specialist,
-    tools=[count_repeated_html_structures],
-    # tools=[autodetect_product_selectors],
+    tools=[autodetect_product_selectors, count_repeated_html_structures],
     llm=my_llm.GTP4o_mini,
     verbose=True,
 )
 
 navigate_and_search_store_task = Task(
+    name='navigate_and_search_store_task',
     description=
     """
        Acessar a loja online '{loja_url}' e navegar até a funcionalidade de busca.
        Realizar uma busca pelo nicho de produtos '{nicho_busca}' e garantir que a página
        de resultados da busca seja carregada com sucesso.
        A saída deve conter o conteúdo HTML da página de resultados da busca ou um identificador único para essa página.
+       Leia as páginas com a ferramenta 'Read page HTML digest', que já entrega o HTML reduzido
+       (sem scripts, estilos e SVG, com os cards repetidos colapsados e os links preservados).
     """,
     expected_output=
     """
-        O conteúdo HTML completo da página de resultados da busca para o nicho especificado,
-        pronto para a extraçao de URLs de produtos.
+        A URL da página de resultados da busca para o nicho especificado e o seu HTML reduzido
+        (digest), pronto para a extraçao de URLs de produtos.
     """,
     llm=my_llm.GTP4o_mini,
     agent=store_navigator_agent,
-    tools=[scraper_tool] 
+    tools=[read_html_digest, scraper_tool] 
 )
 
 analyze_scraped_html_task = Task(
+    name='analyze_scraped_html_task',
     description=(
         "Você receberá o conteúdo HTML completo de uma página de e-commerce. "
         "Seu trabalho é analisar a estrutura do HTML e identificar padrões que representem blocos de produtos. "
@@ -198,6 +211,7 @@ analyze_scraped_html_task = Task(
 )
 
 identify_product_urls_task = Task(
+    name='identify_product_urls_task',
     description=
     """
        A partir do conteúdo HTML da página de resultados da busca, identificar e extrair os URLs
@@ -211,17 +225,21 @@ identify_product_urls_task = Task(
     """,
     llm=my_llm.GTP4o_mini,
     agent=product_listing_agent,
-    tools=[scraper_tool, read_website_content],
-    output_file="products_list.csv"
+    tools=[read_html_digest, scraper_tool, read_website_content],
+    # No diretório de importação, o único de onde 'Fetch product pages' lê arquivos
+    output_file=os.path.join(PRODUCT_IMPORT_DIR, "products_list.csv")
 )
 
 extract_individual_product_details_task = Task(
+    name='extract_individual_product_details_task',
     description=
     """
        Para cada URL de produto fornecido, acessar a página individual do produto e extrair
        as seguintes informações: nome do produto, descriçao completa, URL(s) da imagem principal e secundárias,
        preço normal, preço promocional (se houver), validade da oferta (se aplicável),
        e quaisquer outras informações relevantes para a criaçao de uma listagem de afiliado (ex: SKU, marca, categorias).
+       Chame a ferramenta 'Fetch product pages' uma única vez com a lista completa de URLs: ela baixa
+       todas as páginas em paralelo. Use 'Read a website content' só para páginas que vierem com erro.
     """,
     expected_output=
     """
@@ -232,10 +250,11 @@ extract_individual_product_details_task = Task(
     """,
     llm=my_llm.GTP4o_mini,
     agent=product_detail_extractor_agent,
-    tools=[read_website_content] 
+    tools=[fetch_product_pages, read_website_content] 
 )
 
 clean_and_format_product_data_task = Task(
+    name='clean_and_format_product_data_task',
     description=
     """
        Pegar a lista de dicionários de produtos com informações brutas e realizar a limpeza,
@@ -258,6 +277,7 @@ clean_and_format_product_data_task = Task(
 
 
 build_pydantic_objects_task = Task(
+    name='build_pydantic_objects_task',
     description=
     """
         Transformar os dados dos produtos em objetos do tipo ProductCreate,
@@ -288,6 +308,7 @@ build_pydantic_objects_task = Task(
 )
 
 insert_scraped_products_task = Task(
+    name='insert_scraped_products_task',
     description="""
         Utilizar a ferramenta InsertProductListTool para persistir os produtos no banco.
     """,
@@ -301,4 +322,5 @@ insert_scraped_products_task = Task(
     llm=my_llm.GTP4o_mini
 )
 
-
+# As tarefas de inserçao gravam no banco: sempre consultam o LLM
+skip_llm_cache(insert_curated_stores, insert_scraped_products_task)
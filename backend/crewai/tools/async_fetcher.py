@@ -0,0 +1,168 @@
+# backend/crewai/tools/async_fetcher.py
+"""
+Download concorrente de páginas de produto com asyncio + httpx.
+
+Recebe uma lista de URLs (por exemplo a gravada em products_list.csv) e baixa todas
+ao mesmo tempo, respeitando um limite global (FETCH_MAX_CONCURRENCY) e um limite por
+domínio (FETCH_MAX_PER_DOMAIN), para não martelar uma única loja. Os resultados saem
+à medida que cada download termina, então 100 páginas levam perto do tempo das mais
+lentas, e não a soma de todas. Páginas já no cache de páginas (modo "raw", o mesmo de
+fetch_html) não são baixadas de novo.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.html_analysis import REQUEST_HEADERS, REQUEST_TIMEOUT
+from backend.crewai.tools.page_cache import get_page_cache
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+FETCH_MAX_CONCURRENCY = int(os.environ.get("FETCH_MAX_CONCURRENCY", "20"))
+FETCH_MAX_PER_DOMAIN = int(os.environ.get("FETCH_MAX_PER_DOMAIN", "4"))
+
+URL_RE = re.compile(r"https?://[^\s\"'<>,\]\)]+")
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    html: Optional[bytes] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.html is not None
+
+
+def read_url_list(path: str) -> List[str]:
+    """
+    Lê a lista de URLs de produtos gravada pelos agentes (products_list.csv), que pode
+    vir como lista JSON/Python, CSV ou uma URL por linha. Mantém a ordem e remove repetidas;
+    itens que não são URLs http(s) são descartados.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    try:
+        urls = [u for u in json.loads(content) if isinstance(u, str) and URL_RE.match(u.strip())]
+    except (ValueError, TypeError):
+        urls = URL_RE.findall(content)
+    return list(dict.fromkeys(u.strip() for u in urls if u.strip()))
+
+
+class _DomainLimiter:
+    """Um semáforo por domínio, criado sob demanda dentro do event loop."""
+
+    def __init__(self, per_domain: int):
+        self.per_domain = per_domain
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        domain = (httpx.URL(url).host or "").lower()
+        if domain not in self._semaphores:
+            self._semaphores[domain] = asyncio.Semaphore(self.per_domain)
+        return self._semaphores[domain]
+
+
+async def iter_fetch(
+    urls: Iterable[str],
+    max_concurrency: int = FETCH_MAX_CONCURRENCY,
+    max_per_domain: int = FETCH_MAX_PER_DOMAIN,
+    timeout: float = REQUEST_TIMEOUT,
+) -> AsyncIterator[FetchResult]:
+    """
+    Baixa as URLs concorrentemente e emite cada FetchResult assim que fica pronto
+    (fora de ordem). Erros de rede, HTTP ou de URL inválida viram FetchResult com
+    `error`, sem interromper os demais downloads.
+    """
+    urls = list(dict.fromkeys(urls))
+    cache = get_page_cache()
+    global_limit = asyncio.Semaphore(max_concurrency)
+    domain_limit = _DomainLimiter(max_per_domain)
+
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    async with httpx.AsyncClient(
+        headers=REQUEST_HEADERS, timeout=timeout, limits=limits, follow_redirects=True
+    ) as client:
+
+        async def fetch_one(url: str) -> FetchResult:
+            try:
+                return await download(url)
+            except Exception as e:
+                # URL inválida ou qualquer outra falha fica restrita a esta URL
+                return FetchResult(url=url, error=f"{type(e).__name__}: {e}")
+
+        async def download(url: str) -> FetchResult:
+            cached = await asyncio.to_thread(cache.get, url, "raw")
+            if cached is not None:
+                return FetchResult(url=url, status=200, html=cached, from_cache=True)
+
+            # Ordem fixa (domínio e depois global) para um domínio cheio não segurar vagas globais
+            async with domain_limit(url), global_limit:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    return FetchResult(url=url, status=e.response.status_code, error=str(e),
+                                       elapsed=time.perf_counter() - start)
+                except httpx.HTTPError as e:
+                    return FetchResult(url=url, error=f"{type(e).__name__}: {e}",
+                                       elapsed=time.perf_counter() - start)
+                elapsed = time.perf_counter() - start
+
+            await asyncio.to_thread(cache.put, url, "raw", response.content)
+            return FetchResult(url=url, status=response.status_code, html=response.content, elapsed=elapsed)
+
+        tasks = [asyncio.create_task(fetch_one(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def fetch_pages(urls: Iterable[str], **kwargs) -> Iterator[FetchResult]:
+    """
+    Versão síncrona de `iter_fetch` para as ferramentas do CrewAI: o event loop roda
+    numa thread própria e os resultados chegam por uma fila, à medida que terminam.
+    """
+    results: "queue.Queue" = queue.Queue()
+    done = object()
+
+    async def produce():
+        async for result in iter_fetch(urls, **kwargs):
+            results.put(result)
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except Exception as e:
+            logger.error(f"[async_fetcher] Falha no download concorrente: {e}", exc_info=True)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=run, name="async-fetcher", daemon=True).start()
+    while True:
+        item = results.get()
+        if item is done:
+            return
+        yield item
@@ -1,77 +1,100 @@
-import re
 import json
 from crewai.tools import tool
-from playwright.sync_api import sync_playwright
+
+from backend.crewai.tools.browser_pool import get_browser_pool
+from backend.crewai.tools.html_analysis import detect_selectors, fetch_html
+from backend.crewai.tools.page_cache import get_page_cache
+from backend.crewai.tools.selector_inference import (
+    CANDIDATE_TAGS,
+    MAX_CARDS,
+    MAX_CARDS_PER_GROUP,
+    MAX_GROUPS,
+    MAX_NODES_PER_CARD,
+    MAX_TEXT_LENGTH,
+    MIN_CARDS,
+    infer_selectors
+    )
+
+# Tempo máximo (ms) gasto dentro da página montando o resumo do DOM
+SUMMARY_BUDGET_MS = 1500
+
+# Agrupa os elementos candidatos por tag+classes e devolve, numa única avaliação,
+# um resumo compacto dos cards de cada grupo (ver selector_inference).
+DOM_SUMMARY_JS = """
+([candidateTags, minCards, maxCards, maxGroups, maxCardsPerGroup, maxNodesPerCard, maxText, budgetMs]) => {
+    const deadline = performance.now() + budgetMs;
+    const classesOf = el => (el.getAttribute('class') || '').trim().split(/\\s+/).filter(Boolean);
+    const textOf = el => (el.textContent || '').replace(/\\s+/g, ' ').trim().slice(0, maxText);
+
+    const groups = new Map();
+    for (const el of document.querySelectorAll(candidateTags.join(','))) {
+        const tag = el.tagName.toLowerCase();
+        const classes = classesOf(el);
+        const key = tag + '|' + classes.join(' ');
+        let group = groups.get(key);
+        if (!group) {
+            group = {tag: tag, classes: classes, elements: []};
+            groups.set(key, group);
+        }
+        group.elements.push(el);
+    }
+
+    const candidates = [...groups.values()]
+        .filter(g => g.elements.length >= minCards && g.elements.length <= maxCards)
+        .filter(g => g.elements.slice(0, 5).some(el => el.querySelector('a[href]')))
+        .sort((a, b) => (b.classes.length > 0) - (a.classes.length > 0) || b.elements.length - a.elements.length)
+        .slice(0, maxGroups);
+
+    let truncated = false;
+    const summary = [];
+    for (const group of candidates) {
+        const step = Math.max(1, Math.ceil(group.elements.length / maxCardsPerGroup));
+        const cards = [];
+        for (let i = 0; i < group.elements.length; i += step) {
+            if (performance.now() > deadline) {
+                truncated = true;
+                break;
+            }
+            const card = group.elements[i];
+            const nodes = [card, ...card.querySelectorAll('*')].slice(0, maxNodesPerCard).map(el => [
+                el.tagName.toLowerCase(),
+                classesOf(el),
+                textOf(el),
+                el.childElementCount,
+                el.getAttribute('href') || ''
+            ]);
+            cards.push(nodes);
+        }
+        summary.push({tag: group.tag, classes: group.classes, count: group.elements.length, cards: cards});
+        if (truncated) break;
+    }
+    return {groups: summary, truncated: truncated};
+}
+"""
 
 @tool("Auto Detect Product Selectors")
-def autodetect_product_selectors(url: str) -> str:
+def autodetect_product_selectors(url: str, render: bool = True) -> str:
     """
     Analisa uma página de e-commerce e sugere seletores para identificar cards de produto,
-    nome, preço e link, retornando como JSON em string.
+    nome, preço e link, com a confiança (0 a 1) de cada seletor, retornando como JSON em string.
+    Use render=False para analisar o HTML bruto sem navegador (páginas renderizadas no servidor).
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, wait_until='networkidle')
-        
-        candidate_tags = ['div', 'li', 'article', 'section']
-        candidates = []
-        for tag in candidate_tags:
-            elements = page.query_selector_all(tag)
-            if 10 < len(elements) < 200:
-                candidates.append((tag, elements, len(elements)))
-        if not candidates:
-            browser.close()
-            return json.dumps({"erro": "Nenhum possível card de produto detectado."}, ensure_ascii=False)
-        
-    card_tag, card_elements, card_count = sorted(candidates, key=lambda x: x[2], reverse=True)[0]
-    # Tenta encontrar uma classe marcante do card para sugerir
-    card_selector = None
-    for card in card_elements:
-        card_class = card.get_attribute("class")
-        if card_class:
-            card_selector = f".{card_class.strip().replace(' ','.')}"
-            break
-    if not card_selector:
-        card_selector = card_tag  # fallback para só o nome da tag
-    
-    name_selector, price_selector, link_selector = None, None, None
-    for card in card_elements[:3]:
-        children = card.query_selector_all("*")
-        for child in children:
-            try:
-                tag_name = child.evaluate("el => el.tagName").lower()
-                if tag_name not in candidate_tags + ['a', 'span', 'h2', 'h3', 'h4', 'p', 'strong']:
-                    continue
-                text = (child.inner_text() or "").strip()
-            except Exception:
-                continue
-            
-            if not name_selector and 5 < len(text) < 100:
-                name_class = child.get_attribute("class")
-                if name_class:
-                    name_selector = f".{name_class.strip().replace(' ','.')}"
-            if not price_selector and re.search(r'R\$\s?\d', text):
-                price_class = child.get_attribute("class")
-                if price_class:
-                    price_selector = f".{price_class.strip().replace(' ','.')}"
-            if not link_selector:
-                href = child.get_attribute("href")
-                if href:
-                    link_class = child.get_attribute("class")
-                    if link_class:
-                        link_selector = f".{link_class.strip().replace(' ','.')}"
-        if name_selector and price_selector and link_selector:
-            break
-    browser.close()
-    result = {
-        "card_tag": card_tag,
-        "card_count": card_count,
-        "suggested_selectors": {
-            "card": card_selector,
-            "name": name_selector,
-            "price": price_selector,
-            "link": link_selector
-        }
-    }
+    if not render:
+        return json.dumps(detect_selectors(fetch_html(url)), ensure_ascii=False, indent=2)
+
+    rendered_html = get_page_cache().get(url, "rendered")
+    if rendered_html is not None:
+        # Página já renderizada recentemente: analisa o HTML salvo sem abrir o navegador
+        return json.dumps(detect_selectors(rendered_html), ensure_ascii=False, indent=2)
+
+    summary, html = get_browser_pool().run(url, lambda page: (
+        page.evaluate(DOM_SUMMARY_JS, [
+            CANDIDATE_TAGS, MIN_CARDS, MAX_CARDS, MAX_GROUPS,
+            MAX_CARDS_PER_GROUP, MAX_NODES_PER_CARD, MAX_TEXT_LENGTH, SUMMARY_BUDGET_MS
+        ]),
+        page.content(),
+    ))
+    get_page_cache().put(url, "rendered", html)
+
+    result = infer_selectors(summary)
     return json.dumps(result, ensure_ascii=False, indent=2)
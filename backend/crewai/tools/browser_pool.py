@@ -0,0 +1,225 @@
+# backend/crewai/tools/browser_pool.py
+"""
+Pool de navegadores Playwright compartilhado pelas ferramentas de análise de HTML.
+
+A API síncrona do Playwright só pode ser usada pela thread que a iniciou, então o pool
+tem PLAYWRIGHT_MAX_PAGES threads próprias, cada uma dona de um Chromium, e as demais
+threads mandam o trabalho para elas. Os contextos são reciclados, o navegador é
+reiniciado quando cai ou depois de PLAYWRIGHT_BROWSER_MAX_USES páginas e fechado
+depois de PLAYWRIGHT_IDLE_SECONDS sem uso.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, TypeVar
+
+from playwright.sync_api import BrowserContext, Page, sync_playwright
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.page_cache import get_page_cache
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+PLAYWRIGHT_MAX_PAGES = int(os.environ.get("PLAYWRIGHT_MAX_PAGES", "4"))
+PLAYWRIGHT_BROWSER_MAX_USES = int(os.environ.get("PLAYWRIGHT_BROWSER_MAX_USES", "50"))
+PLAYWRIGHT_MAX_IDLE_CONTEXTS = int(os.environ.get("PLAYWRIGHT_MAX_IDLE_CONTEXTS", "2"))
+PLAYWRIGHT_IDLE_SECONDS = float(os.environ.get("PLAYWRIGHT_IDLE_SECONDS", "300"))
+
+T = TypeVar("T")
+
+
+class _ThreadBrowser:
+    """Chromium pertencente a uma única thread."""
+
+    def __init__(self, max_uses: int, max_idle_contexts: int):
+        self.max_uses = max_uses
+        self.max_idle_contexts = max_idle_contexts
+        self.playwright = None
+        self.browser = None
+        self.uses = 0
+        self.idle_contexts: List[BrowserContext] = []
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    def ensure(self) -> None:
+        if not self.is_healthy() or self.uses >= self.max_uses:
+            self.restart()
+
+    def restart(self) -> None:
+        if self.browser is not None:
+            logger.debug(f"[browser_pool] Reciclando navegador após {self.uses} usos.")
+        self.close()
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=True)
+        self.uses = 0
+
+    def acquire_context(self) -> BrowserContext:
+        while self.idle_contexts:
+            context = self.idle_contexts.pop()
+            try:
+                context.clear_cookies()
+                return context
+            except Exception:
+                continue
+        return self.browser.new_context()
+
+    def release_context(self, context: BrowserContext) -> None:
+        if self.is_healthy() and len(self.idle_contexts) < self.max_idle_contexts:
+            self.idle_contexts.append(context)
+            return
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        for context in self.idle_contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self.idle_contexts = []
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception:
+                pass
+        self.browser = None
+        self.playwright = None
+
+
+class BrowserPool:
+    """
+    Número fixo de threads, cada uma dona de um Chromium. As chamadas de qualquer
+    thread entram numa fila e são executadas por uma dessas threads, então o número
+    de navegadores (e de páginas abertas) nunca passa do tamanho do pool, não importa
+    quantas threads da API ou dos executores renderizem páginas.
+    """
+
+    def __init__(
+        self,
+        size: int = PLAYWRIGHT_MAX_PAGES,
+        max_uses: int = PLAYWRIGHT_BROWSER_MAX_USES,
+        max_idle_contexts: int = PLAYWRIGHT_MAX_IDLE_CONTEXTS,
+        idle_seconds: float = PLAYWRIGHT_IDLE_SECONDS,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_idle_contexts = max_idle_contexts
+        self.idle_seconds = idle_seconds
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                thread = threading.Thread(target=self._serve, name=f"playwright-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _serve(self) -> None:
+        # Laço da thread dona do navegador: o Chromium é iniciado no primeiro pedido
+        # e fechado depois de idle_seconds sem uso
+        browser = _ThreadBrowser(self.max_uses, self.max_idle_contexts)
+        try:
+            while True:
+                try:
+                    task = self._tasks.get(timeout=self.idle_seconds)
+                except queue.Empty:
+                    if browser.browser is not None:
+                        logger.debug("[browser_pool] Navegador ocioso, fechando.")
+                        browser.close()
+                    continue
+                if task is None:
+                    return
+                future, url, wait_until, action = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._render(browser, url, wait_until, action))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            browser.close()
+
+    def _render(self, browser: _ThreadBrowser, url: Optional[str], wait_until: str, action: Callable[[Page], T]) -> T:
+        browser.ensure()
+        try:
+            context = browser.acquire_context()
+        except Exception as e:
+            # Navegador travado ou desconectado: reinicia uma vez
+            logger.warning(f"[browser_pool] Falha ao abrir contexto, reiniciando navegador: {e}")
+            browser.restart()
+            context = browser.acquire_context()
+
+        browser.uses += 1
+        page = context.new_page()
+        try:
+            if url:
+                page.goto(url, wait_until=wait_until)
+            return action(page)
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+            browser.release_context(context)
+
+    def run(self, url: Optional[str], action: Callable[[Page], T], wait_until: str = "networkidle") -> T:
+        """
+        Executa `action(page)` numa página nova de um dos navegadores do pool e devolve
+        o resultado; se `url` for informada, ela já é carregada. A página só existe
+        dentro de `action`, que roda na thread dona do navegador.
+        """
+        self._start()
+        future: Future = Future()
+        self._tasks.put((future, url, wait_until, action))
+        return future.result()
+
+    def close(self) -> None:
+        """Encerra as threads do pool depois dos pedidos já enfileirados, fechando os navegadores."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(None)
+        for thread in threads:
+            thread.join()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def fetch_rendered_html(url: str) -> str:
+    """
+    Retorna o HTML da página depois de renderizada pelo navegador, via cache de páginas.
+    """
+    def render() -> str:
+        return get_browser_pool().run(url, lambda page: page.content(), wait_until='networkidle')
+
+    return get_page_cache().fetch(url, "rendered", render)
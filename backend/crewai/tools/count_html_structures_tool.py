@@ -1,50 +1,74 @@
 import json
-from collections import Counter
 from crewai.tools import tool
-from playwright.sync_api import sync_playwright
+
+from backend.crewai.tools.browser_pool import get_browser_pool
+from backend.crewai.tools.html_analysis import count_structures, fetch_html
+from backend.crewai.tools.page_cache import get_page_cache
+from backend.crewai.tools.selector_inference import CANDIDATE_TAGS
+
+# Monta o histograma tag+classes dentro da página e devolve apenas os totais,
+# evitando uma ida e volta ao navegador por elemento.
+STRUCTURE_HISTOGRAM_JS = """
+([tags, rootSelector, topN]) => {
+    let root = document;
+    if (rootSelector) {
+        // Seletor inválido: devolve o erro em vez de lançar uma DOMException
+        try { root = document.querySelector(rootSelector); }
+        catch (e) { return {error: e.message}; }
+    }
+    if (!root) return null;
+    const counts = new Map();
+    for (const el of root.querySelectorAll(tags.join(','))) {
+        // Formata: <tag>.classe1.classe2
+        const classes = (el.getAttribute('class') || '').trim().split(/\\s+/).filter(Boolean);
+        const structure = el.tagName.toLowerCase() + (classes.length ? '.' + classes.join('.') : '');
+        counts.set(structure, (counts.get(structure) || 0) + 1);
+    }
+    const top = [...counts.entries()].sort((a, b) => b[1] - a[1]).slice(0, topN);
+    return {unique: counts.size, top: top};
+}
+"""
 
 @tool("Count Repeated HTML Structures")
-def count_repeated_html_structures(url: str) -> str:
+def count_repeated_html_structures(url: str, root_selector: str = "", render: bool = True) -> str:
     """
     Analisa uma página HTML e retorna as estruturas de tags+classes mais repetidas,
     ajudando a identificar listas e grupos de elementos semelhantes (ex: cards, banners).
+    Use root_selector (seletor CSS) para limitar a análise a uma parte da página e
+    render=False para analisar o HTML bruto sem navegador (páginas renderizadas no servidor).
     Retorna JSON com os 10 mais comuns.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, wait_until='networkidle')
-
-        # Vamos olhar para as tags mais comuns em cards/listas
-        candidate_tags = ['div', 'li', 'article', 'section']
-
-        structure_counter = Counter()
-
-        for tag in candidate_tags:
-            elements = page.query_selector_all(tag)
-            for el in elements:
-                try:
-                    # Formata: <tag>.classe1.classe2
-                    class_attr = el.get_attribute("class")
-                    classes = ""
-                    if class_attr:
-                        classes = "." + ".".join(
-                            c.strip() for c in class_attr.strip().split() if c.strip()
-                        )
-                    structure_id = f"{tag}{classes}"
-                    structure_counter[structure_id] += 1
-                except Exception:
-                    continue
+    rendered_html = get_page_cache().get(url, "rendered") if render else None
+    try:
+        if rendered_html is not None:
+            # Página já renderizada recentemente: analisa o HTML salvo sem abrir o navegador
+            histogram = count_structures(rendered_html, root_selector or None, 10)
+        elif render:
+            histogram, html = get_browser_pool().run(url, lambda page: (
+                page.evaluate(STRUCTURE_HISTOGRAM_JS, [CANDIDATE_TAGS, root_selector or None, 10]),
+                page.content(),
+            ))
+            get_page_cache().put(url, "rendered", html)
+            if histogram is not None and "error" in histogram:
+                raise ValueError(f"Seletor raiz inválido '{root_selector}': {histogram['error']}")
+        else:
+            histogram = count_structures(fetch_html(url), root_selector or None, 10)
+    except ValueError as e:
+        return json.dumps({"erro": str(e)}, ensure_ascii=False)
 
-        # Top 10 mais comuns
-        most_common = structure_counter.most_common(10)
-        browser.close()
+    if histogram is None:
+        return json.dumps(
+            {"erro": f"Nenhum elemento encontrado para o seletor raiz '{root_selector}'."},
+            ensure_ascii=False
+        )
 
-        result = {
-            "url": url,
-            "unique_structures_found": len(structure_counter),
-            "top_structures": [
-                {"structure": s, "count": c} for s, c in most_common
-            ]
-        }
-        return json.dumps(result, ensure_ascii=False, indent=2)
+    result = {
+        "url": url,
+        "unique_structures_found": histogram["unique"],
+        "top_structures": [
+            {"structure": s, "count": c} for s, c in histogram["top"]
+        ]
+    }
+    if root_selector:
+        result["root_selector"] = root_selector
+    return json.dumps(result, ensure_ascii=False, indent=2)
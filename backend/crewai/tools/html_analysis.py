@@ -0,0 +1,206 @@
+# backend/crewai/tools/html_analysis.py
+"""
+Análise estrutural de páginas de e-commerce sobre o HTML bruto, sem navegador.
+
+Produz as mesmas saídas das ferramentas baseadas no Playwright (histograma de
+estruturas tag+classes e seletores sugeridos), usando o parser do lxml. Serve para
+páginas renderizadas no servidor e para processar páginas salvas em lote.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Optional, Union
+from urllib.parse import quote_plus, urlencode, urljoin, urlsplit, urlunsplit
+
+import lxml.html
+import requests
+from cssselect import SelectorError
+
+from backend.crewai.tools.page_cache import get_page_cache
+from backend.crewai.tools.selector_inference import (CANDIDATE_TAGS, MAX_CARDS,
+                                                     MAX_CARDS_PER_GROUP,
+                                                     MAX_GROUPS,
+                                                     MAX_NODES_PER_CARD,
+                                                     MAX_TEXT_LENGTH,
+                                                     MIN_CARDS,
+                                                     infer_selectors)
+
+HtmlInput = Union[str, bytes, lxml.html.HtmlElement]
+
+REQUEST_TIMEOUT = 20
+REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+}
+
+# Marcador do termo buscado nos modelos de URL de busca das lojas
+SEARCH_PLACEHOLDER = "{busca}"
+# Nomes usuais do campo de busca quando o input não é type="search"
+SEARCH_INPUT_NAMES = {"q", "query", "s", "k", "busca", "search", "termo", "keyword", "ft", "text"}
+
+
+def _download_html(url: str) -> bytes:
+    response = requests.get(url, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_html(url: str) -> bytes:
+    """Baixa o HTML bruto da página (via cache de páginas), sem executar JavaScript."""
+    return get_page_cache().fetch(url, "raw", lambda: _download_html(url))
+
+
+def parse_html(html: HtmlInput) -> lxml.html.HtmlElement:
+    if isinstance(html, lxml.html.HtmlElement):
+        return html
+    return lxml.html.document_fromstring(html)
+
+
+def _classes(el: lxml.html.HtmlElement) -> list:
+    return (el.get("class") or "").split()
+
+
+def _text(el: lxml.html.HtmlElement) -> str:
+    return " ".join(el.text_content().split())[:MAX_TEXT_LENGTH]
+
+
+def _structure(el: lxml.html.HtmlElement) -> str:
+    # Formata: <tag>.classe1.classe2
+    classes = _classes(el)
+    return el.tag + ("." + ".".join(classes) if classes else "")
+
+
+def _is_element(el) -> bool:
+    # Comentários e instruções de processamento também aparecem no iter() do lxml
+    return isinstance(el.tag, str)
+
+
+def count_structures(html: HtmlInput, root_selector: Optional[str] = None, top_n: int = 10) -> Optional[Dict[str, Any]]:
+    """
+    Conta as estruturas tag+classes mais repetidas da página.
+
+    Returns:
+        dict com `unique` e `top` (lista de pares estrutura/quantidade) ou None se
+        o root_selector não encontrar nenhum elemento.
+
+    Raises:
+        ValueError: Se o root_selector não for um seletor CSS válido.
+    """
+    tree = parse_html(html)
+    root = tree
+    if root_selector:
+        try:
+            matches = tree.cssselect(root_selector)
+        except SelectorError as e:
+            raise ValueError(f"Seletor raiz inválido '{root_selector}': {e}") from e
+        if not matches:
+            return None
+        root = matches[0]
+
+    counter = Counter(
+        _structure(el) for el in root.iter(*CANDIDATE_TAGS) if el is not root
+    )
+    return {"unique": len(counter), "top": counter.most_common(top_n)}
+
+
+def build_dom_summary(html: HtmlInput) -> Dict[str, Any]:
+    """
+    Monta o mesmo resumo compacto do DOM que a ferramenta de auto-detecção coleta
+    dentro do navegador (formato descrito em selector_inference).
+    """
+    tree = parse_html(html)
+
+    groups: Dict[tuple, list] = {}
+    for el in tree.iter(*CANDIDATE_TAGS):
+        groups.setdefault((el.tag, tuple(_classes(el))), []).append(el)
+
+    candidates = [
+        (key, elements) for key, elements in groups.items()
+        if MIN_CARDS <= len(elements) <= MAX_CARDS
+        and any(el.find(".//a[@href]") is not None for el in elements[:5])
+    ]
+    candidates.sort(key=lambda item: (bool(item[0][1]), len(item[1])), reverse=True)
+
+    summary = []
+    for (tag, classes), elements in candidates[:MAX_GROUPS]:
+        step = max(1, -(-len(elements) // MAX_CARDS_PER_GROUP))
+        cards = []
+        for card in elements[::step]:
+            nodes = [el for el in card.iter() if _is_element(el)][:MAX_NODES_PER_CARD]
+            cards.append([
+                [el.tag, _classes(el), _text(el), sum(1 for c in el if _is_element(c)), el.get("href") or ""]
+                for el in nodes
+            ])
+        summary.append({"tag": tag, "classes": list(classes), "count": len(elements), "cards": cards})
+
+    return {"groups": summary, "truncated": False}
+
+
+def detect_selectors(html: HtmlInput) -> Dict[str, Any]:
+    """Sugere os seletores de card, nome, preço e link a partir do HTML bruto."""
+    return infer_selectors(build_dom_summary(html))
+
+
+def validate_selectors(html: HtmlInput, selectors: Dict[str, Optional[str]], min_coverage: float = 0.6) -> Dict[str, Any]:
+    """
+    Confere se os seletores ainda descrevem a página: o card precisa aparecer pelo
+    menos MIN_CARDS vezes e nome, preço e link precisam existir em min_coverage dos cards.
+
+    Returns:
+        dict com `valid`, `card_count` e a cobertura de cada campo.
+    """
+    tree = parse_html(html)
+    try:
+        cards = tree.cssselect(selectors["card"])
+    except Exception:
+        cards = []
+
+    coverage = {}
+    for field in ("name", "price", "link"):
+        selector = selectors.get(field)
+        if not selector or not cards:
+            coverage[field] = 0.0
+            continue
+        try:
+            found = sum(1 for card in cards if card.cssselect(selector))
+        except Exception:
+            found = 0
+        coverage[field] = round(found / len(cards), 2)
+
+    valid = len(cards) >= MIN_CARDS and all(v >= min_coverage for v in coverage.values())
+    return {"valid": valid, "card_count": len(cards), "coverage": coverage}
+
+
+def detect_search_template(html: HtmlInput, page_url: str) -> Optional[str]:
+    """
+    Procura o formulário de busca da página (GET com um campo de texto de busca) e
+    monta a URL de resultados com SEARCH_PLACEHOLDER no lugar do termo.
+
+    Returns:
+        O modelo de URL (ex: https://loja.com/busca?q={busca}) ou None sem formulário de busca.
+    """
+    tree = parse_html(html)
+    for form in tree.iter("form"):
+        if (form.get("method") or "get").lower() != "get":
+            continue
+        fields = form.cssselect("input[name]")
+        search_field = next((
+            f for f in fields
+            if (f.get("type") or "text").lower() == "search"
+            or ((f.get("type") or "text").lower() == "text" and f.get("name").lower() in SEARCH_INPUT_NAMES)
+        ), None)
+        if search_field is None:
+            continue
+        # Campos ocultos do formulário seguem junto com o termo, como no navegador
+        hidden = [(f.get("name"), f.get("value") or "") for f in fields if (f.get("type") or "").lower() == "hidden"]
+        action = urlsplit(urljoin(page_url, form.get("action") or page_url))
+        query = urlencode(hidden + [(search_field.get("name"), "")])
+        return urlunsplit(action._replace(query=query + SEARCH_PLACEHOLDER, fragment=""))
+    return None
+
+
+def search_listing_url(template: str, term: str) -> str:
+    """Troca o marcador do modelo de busca pelo termo, codificado para a query string."""
+    return template.replace(SEARCH_PLACEHOLDER, quote_plus(term))
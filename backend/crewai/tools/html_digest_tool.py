@@ -0,0 +1,230 @@
+# backend/crewai/tools/html_digest_tool.py
+"""
+Redução do HTML antes de ele chegar ao LLM.
+
+A maior parte dos tokens de uma página de loja é script, estilo, SVG e marcação de
+rastreamento. `digest_html` remove esses nós e os atributos que não ajudam a achar
+produtos, colapsa irmãos repetidos (os cards de uma listagem) em uma amostra mais a
+contagem e os links dos demais, e corta o resultado num orçamento de tokens,
+informando o tamanho de entrada e de saída.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+from crewai.tools import tool
+from lxml import etree
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.html_analysis import fetch_html, parse_html
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+HTML_DIGEST_MAX_TOKENS = int(os.environ.get("HTML_DIGEST_MAX_TOKENS", "6000"))
+# Irmãos iguais a partir dos quais a sequência é colapsada, e quantos ficam como amostra
+COLLAPSE_MIN_RUN = 3
+COLLAPSE_SAMPLES = 1
+# Links dos irmãos colapsados mantidos no resumo (são as URLs de produto da listagem)
+COLLAPSE_MAX_LINKS = 100
+CHARS_PER_TOKEN = 4
+
+DROP_TAGS = (
+    "script", "style", "noscript", "svg", "iframe", "template", "link", "meta",
+    "object", "embed", "canvas", "video", "audio", "source",
+)
+KEEP_ATTRIBUTES = {
+    "id", "class", "href", "src", "alt", "title", "name", "type", "value", "action",
+    "method", "placeholder", "rel", "role", "aria-label", "itemprop", "itemtype",
+}
+LAZY_SRC_ATTRIBUTES = ("data-src", "data-lazy-src", "data-original")
+HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+
+@dataclass
+class HtmlDigest:
+    html: str
+    input_chars: int
+    output_chars: int
+    collapsed: int
+    truncated: bool
+
+    @property
+    def input_tokens(self) -> int:
+        return self.input_chars // CHARS_PER_TOKEN
+
+    @property
+    def output_tokens(self) -> int:
+        return self.output_chars // CHARS_PER_TOKEN
+
+    def header(self) -> str:
+        return (
+            f"<!-- digest: {self.input_chars} -> {self.output_chars} caracteres "
+            f"(~{self.input_tokens} -> ~{self.output_tokens} tokens), "
+            f"{self.collapsed} grupos colapsados{', truncado' if self.truncated else ''} -->"
+        )
+
+
+def _is_hidden(el) -> bool:
+    if el.get("hidden") is not None or el.get("aria-hidden") == "true":
+        return True
+    if el.get("type") == "hidden":
+        return True
+    if HIDDEN_STYLE_RE.search(el.get("style") or ""):
+        return True
+    # Pixels de rastreamento
+    return el.tag == "img" and el.get("width") in ("0", "1") and el.get("height") in ("0", "1")
+
+
+def _strip(root) -> None:
+    for el in root.cssselect(", ".join(DROP_TAGS)):
+        el.drop_tree()
+    for el in list(root.iter(etree.Comment, etree.ProcessingInstruction)):
+        el.drop_tree()
+    for el in list(root.iter()):
+        if not isinstance(el.tag, str) or el.getparent() is None:
+            continue
+        if _is_hidden(el):
+            el.drop_tree()
+            continue
+        if el.tag == "img" and not el.get("src", "").startswith("http"):
+            for attr in LAZY_SRC_ATTRIBUTES:
+                if el.get(attr):
+                    el.set("src", el.get(attr))
+                    break
+        for attr in list(el.attrib):
+            if attr not in KEEP_ATTRIBUTES:
+                del el.attrib[attr]
+        if el.get("src", "").startswith("data:"):
+            del el.attrib["src"]
+
+
+def _signature(el) -> Optional[str]:
+    if not isinstance(el.tag, str):
+        return None
+    return el.tag + "." + ".".join(sorted((el.get("class") or "").split()))
+
+
+def _links(el, base_url: Optional[str]) -> List[str]:
+    hrefs = [el.get("href")] if el.tag == "a" else []
+    hrefs += [a.get("href") for a in el.iter("a")]
+    links = []
+    for href in hrefs:
+        if href and not href.startswith(("#", "javascript:")):
+            links.append(urljoin(base_url, href) if base_url else href)
+    return list(dict.fromkeys(links))
+
+
+def _collapse(root, base_url: Optional[str]) -> int:
+    """
+    Troca sequências de irmãos com a mesma tag+classes por uma amostra e um
+    comentário com a contagem e os links dos demais.
+    """
+    collapsed = 0
+    # De baixo para cima, para colapsar primeiro as repetições mais internas
+    for parent in reversed(list(root.iter())):
+        if not isinstance(parent.tag, str):
+            continue
+        children = list(parent)
+        i = 0
+        while i < len(children):
+            sig = _signature(children[i])
+            j = i + 1
+            while j < len(children) and sig is not None and _signature(children[j]) == sig:
+                j += 1
+            if sig is not None and j - i >= COLLAPSE_MIN_RUN:
+                removed = children[i + COLLAPSE_SAMPLES:j]
+                links = []
+                for el in removed:
+                    links.extend(_links(el, base_url))
+                links = list(dict.fromkeys(links))
+                note = f" +{len(removed)} elementos <{sig.rstrip('.')}> iguais"
+                if links:
+                    note += f"; links: {' '.join(links[:COLLAPSE_MAX_LINKS])}"
+                    if len(links) > COLLAPSE_MAX_LINKS:
+                        note += f" (+{len(links) - COLLAPSE_MAX_LINKS})"
+                comment = etree.Comment(note.replace("--", "- -") + " ")
+                comment.tail = removed[-1].tail
+                removed[0].addprevious(comment)
+                for el in removed:
+                    el.tail = None
+                    parent.remove(el)
+                collapsed += 1
+            i = j
+    return collapsed
+
+
+def _squeeze_whitespace(root) -> None:
+    for el in root.iter():
+        if el.text:
+            el.text = " ".join(el.text.split()) or None
+        if el.tail:
+            el.tail = " ".join(el.tail.split()) or None
+
+
+def digest_html(html, max_tokens: int = HTML_DIGEST_MAX_TOKENS, base_url: Optional[str] = None) -> HtmlDigest:
+    """
+    Reduz o HTML para o LLM e informa o tamanho antes e depois.
+    Uma árvore lxml recebida é alterada no lugar.
+    """
+    if isinstance(html, (str, bytes)):
+        input_chars = len(html)
+    else:
+        input_chars = len(lxml.html.tostring(html, encoding="unicode"))
+    root = parse_html(html)
+
+    title = root.findtext(".//title")
+    body = root.find("body")
+    if body is None:
+        body = root
+
+    _strip(body)
+    collapsed = _collapse(body, base_url)
+    _squeeze_whitespace(body)
+
+    output = lxml.html.tostring(body, encoding="unicode")
+    if title:
+        output = f"<title>{' '.join(title.split())}</title>\n{output}"
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    truncated = len(output) > budget
+    if truncated:
+        output = output[:budget]
+
+    return HtmlDigest(
+        html=output,
+        input_chars=input_chars,
+        output_chars=len(output),
+        collapsed=collapsed,
+        truncated=truncated,
+    )
+
+
+@tool("Read page HTML digest")
+def read_html_digest(website_url: str, render: bool = False) -> str:
+    """
+    Baixa a página e devolve o HTML reduzido: sem scripts, estilos, SVG e rastreadores,
+    com cards repetidos colapsados em uma amostra (mais a contagem e os links dos demais)
+    e limitado a um orçamento de tokens. Use render=True para páginas montadas por JavaScript.
+    """
+    logger.debug(f"[read_html_digest] Parâmetros recebidos: {locals()}")
+    try:
+        if render:
+            from backend.crewai.tools.browser_pool import fetch_rendered_html
+            html = fetch_rendered_html(website_url)
+        else:
+            html = fetch_html(website_url)
+        digest = digest_html(html, base_url=website_url)
+    except Exception as e:
+        logger.error(f"[read_html_digest] Falha ao ler {website_url}: {e}", exc_info=True)
+        return f"Erro ao ler a página: {e}"
+
+    logger.info(f"[read_html_digest] {website_url}: {digest.header()}")
+    return f"{digest.header()}\n{digest.html}"
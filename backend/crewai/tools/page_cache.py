@@ -0,0 +1,283 @@
+# backend/crewai/tools/page_cache.py
+"""
+Cache em disco das páginas baixadas pelas ferramentas de scraping.
+
+As entradas são indexadas pela URL normalizada + modo de renderização (raw, text,
+rendered, selenium:<css>) e apontam para blobs comprimidos endereçados pelo hash do
+conteúdo, de modo que a mesma página obtida por caminhos diferentes ocupa um só blob.
+Cada entrada expira após o TTL (com sobrescrita por domínio) e, quando o tamanho total
+passa de PAGE_CACHE_MAX_BYTES, as entradas menos usadas recentemente são removidas.
+
+Configuração por variáveis de ambiente:
+    PAGE_CACHE_DIR          diretório do cache (default: cache/pages)
+    PAGE_CACHE_TTL          TTL padrão em segundos (default: 900)
+    PAGE_CACHE_MAX_BYTES    tamanho máximo dos blobs (default: 512 MB)
+    PAGE_CACHE_DOMAIN_TTLS  sobrescritas, ex: "americanas.com.br=300,amazon.com.br=3600"
+    PAGE_CACHE_ENABLED      "0" desliga o cache
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, TypeVar, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", os.path.join("cache", "pages"))
+PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", "900"))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PAGE_CACHE_DOMAIN_TTLS = os.environ.get("PAGE_CACHE_DOMAIN_TTLS", "")
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") != "0"
+
+# Parâmetros de rastreamento que não mudam o conteúdo da página
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid")
+
+Content = TypeVar("Content", str, bytes)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliza a URL para uso como chave: esquema e host em minúsculas, sem porta
+    padrão, sem fragmento, sem parâmetros de rastreamento e com a query ordenada.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _parse_domain_ttls(raw: str) -> Dict[str, int]:
+    ttls = {}
+    for item in raw.split(","):
+        if "=" in item:
+            domain, ttl = item.split("=", 1)
+            ttls[domain.strip().lower()] = int(ttl)
+    return ttls
+
+
+class PageCache:
+    def __init__(
+        self,
+        directory: str = PAGE_CACHE_DIR,
+        default_ttl: int = PAGE_CACHE_TTL,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        domain_ttls: Optional[Dict[str, int]] = None,
+    ):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.domain_ttls = domain_ttls if domain_ttls is not None else _parse_domain_ttls(PAGE_CACHE_DOMAIN_TTLS)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    is_text INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_digest ON entries (digest)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """
+        Transação de escrita exclusiva (BEGIN IMMEDIATE), também entre processos:
+        a verificação dos blobs, a gravação, a remoção e a evicção acontecem sem
+        outra escrita no meio, então nenhum blob some entre a checagem e o uso.
+        """
+        with self._lock:
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30, isolation_level=None)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], digest)
+
+    def ttl_for(self, url: str) -> int:
+        host = (urlsplit(url).hostname or "").lower()
+        for domain, ttl in self.domain_ttls.items():
+            if host == domain or host.endswith("." + domain):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def key_for(url: str, mode: str) -> str:
+        return hashlib.sha256(f"{mode}\n{normalize_url(url)}".encode("utf-8")).hexdigest()
+
+    def get(self, url: str, mode: str) -> Optional[Union[str, bytes]]:
+        key = self.key_for(url, mode)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT digest, is_text, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        digest, is_text, created_at = row
+        if now - created_at > self.ttl_for(url):
+            self._discard(key, digest, created_at)
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                content = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            self._discard(key, digest, created_at)
+            return None
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        logger.debug(f"[page_cache] HIT {mode} {url}")
+        return content.decode("utf-8") if is_text else content
+
+    def _discard(self, key: str, digest: str, created_at: float) -> None:
+        # Só remove a entrada lida: um put concorrente pode tê-la substituído
+        with self._write() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ? AND created_at = ?", (key, created_at))
+            self._delete_orphan_blob(conn, digest)
+
+    def _write_tmp(self, path: str, data: bytes) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        return tmp_path
+
+    def put(self, url: str, mode: str, content: Union[str, bytes]) -> None:
+        is_text = isinstance(content, str)
+        data = content.encode("utf-8") if is_text else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+
+        # Comprime fora da transação; a existência do blob é confirmada dentro dela
+        tmp_path = self._write_tmp(path, data) if not os.path.exists(path) else None
+
+        now = time.time()
+        key = self.key_for(url, mode)
+        with self._write() as conn:
+            if not os.path.exists(path):
+                os.replace(tmp_path or self._write_tmp(path, data), path)
+            elif tmp_path:
+                os.remove(tmp_path)
+            size = os.path.getsize(path)
+            old = conn.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), mode, (urlsplit(url).hostname or "").lower(),
+                 digest, size, int(is_text), now, now)
+            )
+            if old and old[0] != digest:
+                self._delete_orphan_blob(conn, old[0])
+            self._evict(conn)
+
+    def fetch(
+        self,
+        url: str,
+        mode: str,
+        fetcher: Callable[[], Content],
+        cacheable: Callable[[Content], bool] = lambda content: bool(content),
+    ) -> Content:
+        """
+        Retorna a página do cache ou chama `fetcher` e guarda o resultado se
+        `cacheable(resultado)` for verdadeiro.
+        """
+        cached = self.get(url, mode)
+        if cached is not None:
+            return cached
+        content = fetcher()
+        if cacheable(content):
+            self.put(url, mode, content)
+        return content
+
+    def _delete_orphan_blob(self, conn: sqlite3.Connection, digest: str) -> None:
+        # Chamado dentro de _write: nenhum put pode voltar a usar o blob no meio
+        in_use = conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY digest)"
+        ).fetchone()[0]
+        while total > self.max_bytes:
+            row = conn.execute(
+                "SELECT key, digest, size FROM entries ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            key, digest, size = row
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            in_use = conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not in_use:
+                self._delete_orphan_blob(conn, digest)
+                total -= size
+            logger.debug(f"[page_cache] Removida entrada menos usada: {key}")
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+class _DisabledPageCache:
+    def get(self, url, mode):
+        return None
+
+    def put(self, url, mode, content):
+        pass
+
+    def fetch(self, url, mode, fetcher, cacheable=None):
+        return fetcher()
+
+
+def get_page_cache() -> PageCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache() if PAGE_CACHE_ENABLED else _DisabledPageCache()
+        return _cache
@@ -0,0 +1,138 @@
+# backend/crewai/tools/product_pages_tool.py
+"""
+Ferramenta que baixa várias páginas de produto de uma vez (async_fetcher) e devolve
+ao agente um resumo compacto de cada uma: título, meta tags og:/product:, objetos
+Product do JSON-LD e o começo do texto visível.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Union
+
+from crewai.tools import tool
+
+from backend.crewai.product_ingest import (PRODUCT_IMPORT_DIR,
+                                           resolve_import_path)
+from backend.crewai.tools.async_fetcher import fetch_pages, read_url_list
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.html_analysis import parse_html
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+# Caracteres de texto visível mantidos por página
+PRODUCT_PAGE_TEXT_LIMIT = int(os.environ.get("PRODUCT_PAGE_TEXT_LIMIT", "1500"))
+# Caracteres da resposta inteira da ferramenta; as páginas que passarem disso são omitidas
+PRODUCT_PAGES_OUTPUT_LIMIT = int(os.environ.get("PRODUCT_PAGES_OUTPUT_LIMIT", "60000"))
+META_PREFIXES = ("og:", "product:", "twitter:")
+
+
+def _json_ld_products(tree) -> List[Dict[str, Any]]:
+    products = []
+    for script in tree.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text_content())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                kind = item.get("@type")
+                if kind == "Product" or (isinstance(kind, list) and "Product" in kind):
+                    products.append(item)
+                else:
+                    stack.extend(v for k, v in item.items() if k == "@graph")
+    return products
+
+
+def summarize_product_page(html, url: str) -> Dict[str, Any]:
+    """
+    Extrai de uma página de produto os dados que os agentes usam para montar a listagem.
+    """
+    tree = parse_html(html)
+    meta = {}
+    for el in tree.iter("meta"):
+        key = el.get("property") or el.get("name") or ""
+        if key.startswith(META_PREFIXES) and el.get("content"):
+            meta.setdefault(key, el.get("content"))
+
+    title = tree.findtext(".//title") or ""
+    products = _json_ld_products(tree)
+    for el in tree.xpath("//script|//style|//noscript|//svg|//template"):
+        el.drop_tree()
+    body = tree.find("body")
+    text = " ".join((body if body is not None else tree).text_content().split())
+
+    return {
+        "url": url,
+        "title": " ".join(title.split()),
+        "meta": meta,
+        "json_ld": products,
+        "text": text[:PRODUCT_PAGE_TEXT_LIMIT],
+    }
+
+
+@tool("Fetch product pages")
+def fetch_product_pages(product_urls: Union[List[str], str]) -> str:
+    """
+    Baixa várias páginas de produto em paralelo e devolve, em JSON, um resumo de cada
+    página (título, meta tags, JSON-LD de Product e texto visível).
+    Parâmetros:
+    - product_urls: lista de URLs de produto, ou o nome de um arquivo com a lista no
+      diretório de importação (por exemplo products_list.csv)
+    """
+    if isinstance(product_urls, str):
+        value = product_urls.strip()
+        if value.lower().startswith(("http://", "https://")):
+            urls = [value]
+        else:
+            # Arquivos só dentro de PRODUCT_IMPORT_DIR, como na ferramenta de inserção:
+            # o conteúdo volta para o LLM nas mensagens de erro
+            try:
+                path = resolve_import_path(value)
+            except ValueError as e:
+                return json.dumps([{"erro": str(e)}], ensure_ascii=False)
+            if not os.path.isfile(path):
+                return json.dumps([{"erro": f"arquivo não encontrado em {PRODUCT_IMPORT_DIR}: {value}"}], ensure_ascii=False)
+            urls = read_url_list(path)
+    else:
+        urls = list(product_urls)
+    logger.debug(f"[fetch_product_pages] {len(urls)} URLs recebidas.")
+
+    pages = []
+    for result in fetch_pages(urls):
+        if not result.ok:
+            pages.append({"url": result.url, "erro": result.error, "status": result.status})
+            continue
+        try:
+            pages.append(summarize_product_page(result.html, result.url))
+        except Exception as e:
+            pages.append({"url": result.url, "erro": f"Falha ao ler o HTML: {e}"})
+
+    # Devolve na ordem da entrada, mesmo que os downloads terminem fora de ordem
+    order = {url: i for i, url in enumerate(urls)}
+    pages.sort(key=lambda page: order.get(page["url"], len(order)))
+    return _within_budget(pages, PRODUCT_PAGES_OUTPUT_LIMIT)
+
+
+def _within_budget(pages: List[Dict[str, Any]], limit: int) -> str:
+    kept, size = [], 2
+    for i, page in enumerate(pages):
+        encoded = json.dumps(page, ensure_ascii=False)
+        if size + len(encoded) + 2 > limit:
+            omitted = pages[i:]
+            kept.append(json.dumps({
+                "erro": f"Limite de {limit} caracteres atingido: {len(omitted)} páginas omitidas.",
+                "urls_omitidas": [p["url"] for p in omitted[:20]],
+            }, ensure_ascii=False))
+            logger.debug(f"[fetch_product_pages] {len(omitted)} páginas omitidas pelo limite de saída.")
+            break
+        kept.append(encoded)
+        size += len(encoded) + 2
+    return "[" + ", ".join(kept) + "]"
@@ -0,0 +1,145 @@
+# backend/crewai/tools/selector_inference.py
+"""
+Inferência de seletores de produto a partir de um resumo compacto do DOM.
+
+O resumo é montado numa única passada sobre a página (no navegador ou a partir do
+HTML bruto) e tem o formato:
+
+    {
+        "groups": [
+            {
+                "tag": "li",
+                "classes": ["product-card"],
+                "count": 48,            # elementos com essa tag+classes na página
+                "cards": [              # amostra dos cards (no máximo MAX_CARDS_PER_GROUP)
+                    [[tag, classes, texto, n_filhos, href], ...],  # nós do card, incluindo ele mesmo
+                    ...
+                ],
+            },
+            ...
+        ],
+        "truncated": False,         # True se o orçamento de tempo/nós foi atingido
+    }
+
+Cada grupo é pontuado pela fração de cards em que se encontra um nome, um preço e um
+link; a confiança de cada seletor é essa cobertura.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Vamos olhar para as tags mais comuns em cards/listas
+CANDIDATE_TAGS = ['div', 'li', 'article', 'section']
+MIN_CARDS = 4
+MAX_CARDS = 500
+MAX_GROUPS = 8
+MAX_CARDS_PER_GROUP = 200
+MAX_NODES_PER_CARD = 80
+MAX_TEXT_LENGTH = 120
+
+PRICE_RE = re.compile(r'(R\$|US\$|€|£|\$)\s?\d')
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+def css_class_selector(tag: str, classes: List[str]) -> str:
+    """
+    Monta o seletor `.classe1.classe2` (ou só a tag, sem classes), escapando
+    caracteres especiais comuns em classes utilitárias (ex: `md:w-1/2`).
+    """
+    if not classes:
+        return tag
+    return "".join("." + re.sub(r'([^\w-])', r'\\\1', c) for c in classes)
+
+
+def _is_name(tag: str, text: str, n_children: int) -> bool:
+    return 5 < len(text) < 100 and n_children <= 1 and not PRICE_RE.search(text)
+
+
+def _is_price(tag: str, text: str, n_children: int) -> bool:
+    return len(text) < 40 and n_children <= 3 and bool(PRICE_RE.search(text))
+
+
+def _is_link(tag: str, href: str) -> bool:
+    return tag == 'a' and bool(href) and not href.startswith(('#', 'javascript:'))
+
+
+def _best(coverage: Counter, order: Dict[str, int], nesting: Counter, bonus: Dict[str, float], n_cards: int) -> Tuple[Optional[str], float]:
+    if not coverage:
+        return None, 0.0
+    # Empates favorecem o elemento mais interno (menos filhos), com classe e que aparece antes
+    selector = max(
+        coverage,
+        key=lambda s: (coverage[s] + bonus.get(s, 0.0), -nesting[s] / coverage[s], s.startswith('.'), -order[s])
+    )
+    return selector, coverage[selector] / n_cards
+
+
+def score_group(group: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pontua um grupo de cards candidato e escolhe os seletores de nome, preço e link.
+    """
+    cards = group["cards"]
+    n_cards = len(cards) or 1
+    coverage = {"name": Counter(), "price": Counter(), "link": Counter()}
+    name_bonus: Dict[str, float] = {}
+    order: Dict[str, int] = {}
+    nesting: Counter = Counter()
+
+    for nodes in cards:
+        seen = {"name": set(), "price": set(), "link": set()}
+        for position, (tag, classes, text, n_children, href) in enumerate(nodes):
+            selector = css_class_selector(tag, classes)
+            order.setdefault(selector, len(order))
+            nesting[selector] += n_children
+            if _is_link(tag, href):
+                seen["link"].add(selector)
+            if position == 0:
+                # O próprio card só pode ser o link (cards que são um <a>)
+                continue
+            if _is_name(tag, text, n_children):
+                seen["name"].add(selector)
+                if tag in HEADING_TAGS:
+                    # Títulos são os melhores candidatos a nome em caso de empate
+                    name_bonus[selector] = 0.5
+            if _is_price(tag, text, n_children):
+                seen["price"].add(selector)
+        for field, selectors in seen.items():
+            coverage[field].update(selectors)
+
+    selectors, confidence = {}, {}
+    for field in ("name", "price", "link"):
+        bonus = name_bonus if field == "name" else {}
+        selectors[field], confidence[field] = _best(coverage[field], order, nesting, bonus, n_cards)
+
+    # O card é tão confiável quanto a presença média dos campos em todos os cards
+    confidence["card"] = sum(confidence[f] for f in ("name", "price", "link")) / 3
+    avg_nodes = sum(len(nodes) for nodes in cards) / n_cards
+
+    return {
+        "card_tag": group["tag"],
+        "card_count": group["count"],
+        "cards_analyzed": len(cards),
+        "suggested_selectors": {
+            "card": css_class_selector(group["tag"], group["classes"]),
+            **selectors,
+        },
+        "confidence": {k: round(v, 2) for k, v in confidence.items()},
+        "_rank": (confidence["card"], avg_nodes),
+    }
+
+
+def infer_selectors(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Escolhe o grupo de cards mais provável e retorna os seletores sugeridos com
+    a confiança de cada um.
+    """
+    scored = [score_group(g) for g in summary.get("groups", []) if g.get("cards")]
+    if not scored:
+        return {"erro": "Nenhum possível card de produto detectado."}
+
+    best = max(scored, key=lambda r: r["_rank"])
+    for result in scored:
+        result.pop("_rank", None)
+    best["truncated"] = bool(summary.get("truncated"))
+    return best
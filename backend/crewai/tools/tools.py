@@ -1,25 +1,39 @@
 import json 
 import logging
-import random
-import time
-from typing import Dict, List, Union
+import os
+from typing import Any, Dict, List, Union
 
 from crewai.tools import tool
-from crewai_tools import SeleniumScrapingTool
+from crewai_tools import ScrapeWebsiteTool
 from pydantic import ValidationError
 
 from backend.crewai.db.insert_affiliate_stores import insert_stores
-from backend.crewai.db.insert_product_list import insert_products
+from backend.crewai.product_ingest import (PRODUCT_IMPORT_DIR, ingest_products,
+                                          iter_json_records,
+                                          resolve_import_path)
 from backend.crewai.schemas.affiliate_store import AffiliateStoreCreate
-from backend.crewai.schemas.product import ProductCreate
 # Importe o logger
 from backend.crewai.tools.debug_logger import setup_logger
+from backend.crewai.tools.page_cache import get_page_cache
+from backend.crewai.tools.webdriver_pool import scrape_elements
 
 # Configure o nível do logger
 LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
 logger = setup_logger(level=LOG_LEVEL)
 
 
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """
+    ScrapeWebsiteTool que consulta o cache de páginas antes de baixar o site.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url)
+        return get_page_cache().fetch(
+            website_url, "text", lambda: super(CachedScrapeWebsiteTool, self)._run(**kwargs)
+        )
+
+
 @tool("Read a website content")
 def read_website_content(website_url: str, css_element: str, max_attempts: int = 2) -> str:
     """
@@ -35,21 +49,18 @@ def read_website_content(website_url: str, css_element: str, max_attempts: int =
 
     for attempt in range(1, max_attempts + 1):
         try:
-            tool = SeleniumScrapingTool(
-                website_url=website_url,
-                css_element=css_element
+            # Sessão emprestada do pool; se ela cair, o pool a descarta e a próxima
+            # tentativa recebe outra já saudável
+            result = get_page_cache().fetch(
+                website_url, f"selenium:{css_element}", lambda: scrape_elements(website_url, css_element)
             )
-            result = tool.run()
             logger.info("[read_website_content] Conteúdo extraído com sucesso.")
-            return result 
+            return result
         except Exception as e:
             error_msg = str(e)
             errors.append(f"[Tentativa {attempt}] {error_msg}")
             logger.error(f"Erro na tentativa {attempt}: {error_msg}", exc_info=True)
 
-            if "invalid session id" in error_msg.lower():
-                time.sleep(random.uniform(0, 3))  
-
     logger.warning("Todas as tentativas falharam.")
     return f"Falha após {max_attempts} tentativas. Erros:\n" + "\n".join(errors)
 
@@ -57,25 +68,32 @@ def read_website_content(website_url: str, css_element: str, max_attempts: int =
 @tool('InsertAffiliateStoresTool')
 def insert_affiliate_stores_tool(stores: List[Dict]) -> str:
     """
-    Itera sobre uma lista de lojas afiliadas e insere cada uma no banco de dados.
+    Valida uma lista de lojas afiliadas e insere todas no banco de dados de uma vez.
     Espera que cada item siga o schema AffiliateStoreCreate.
     """
     logger.debug(f"[insert_affiliate_stores_tool] Recebido: {stores}")
 
-    success_count = 0
+    valid_stores = []
+    positions = []
     errors = []
 
     for i, store in enumerate(stores, 1):
         try:
-            validated_store = AffiliateStoreCreate(**store)
-            insert_stores([validated_store.dict()])
-            success_count += 1
+            valid_stores.append(AffiliateStoreCreate(**store).model_dump())
+            positions.append(i)
         except ValidationError as ve:
             errors.append(f"[{i}] Validaçao falhou: {ve}")
+
+    ids = []
+    if valid_stores:
+        try:
+            ids, insert_errors = insert_stores(valid_stores)
+            for index, error in sorted(insert_errors.items()):
+                errors.append(f"[{positions[index]}] Erro de inserçao: {error}")
         except Exception as e:
-            errors.append(f"[{i}] Erro de inserçao: {e}")
+            errors.append(f"Erro de inserçao do lote: {e}")
 
-    result = f"{success_count} lojas afiliadas inseridas com sucesso."
+    result = f"{len(ids)} lojas afiliadas inseridas com sucesso. IDs: {ids}"
     if errors:
         result += f"\n{len(errors)} falharam:\n" + "\n".join(errors)
     return result
@@ -84,43 +102,50 @@ def insert_affiliate_stores_tool(stores: List[Dict]) -> str:
 @tool('InsertProductsTool')
 def insert_product_list_tool(products_input: Union[str, List[Dict], Dict]) -> str:
     """
-    Itera sobre uma lista de produtos e insere cada um no banco de dados.
+    Valida uma lista de produtos de uma vez e insere todos no banco de dados em lote.
     Suporta entrada como lista de dicionários, dicionário com chave 'products_input',
-    ou string JSON equivalente.
+    string JSON equivalente, ou o nome de um arquivo JSON Lines / array JSON no
+    diretório de importação (lido e gravado em blocos, para listas grandes).
     """
-    logger.debug(f"[insert_product_list_tool] products_input: {products_input}")
+    logger.debug(f"[insert_product_list_tool] products_input: {str(products_input)[:500]}")
 
     try:
-        # Se for string, fazer o parsing
-        if isinstance(products_input, str):
-            products_input = json.loads(products_input)
-
-        # Extrair lista de produtos corretamente
-        if isinstance(products_input, dict) and 'products_input' in products_input:
-            products = products_input['products_input']
-        elif isinstance(products_input, list):
-            products = products_input
+        if isinstance(products_input, dict) and 'products_file' in products_input:
+            products_input = products_input['products_file']
+
+        # Nome de arquivo: modo streaming, só dentro de PRODUCT_IMPORT_DIR
+        if isinstance(products_input, str) and not products_input.lstrip().startswith(('[', '{')):
+            name = products_input.strip()
+            try:
+                path = resolve_import_path(name)
+            except ValueError as e:
+                return f"Erro: {e}"
+            if not os.path.isfile(path):
+                return f"Erro: arquivo nao encontrado em {PRODUCT_IMPORT_DIR}: {name}"
+            records = iter_json_records(path)
         else:
-            return f"Erro: entrada nao reconhecida. Tipo: {type(products_input)}"
+            # Se for string, fazer o parsing
+            if isinstance(products_input, str):
+                products_input = json.loads(products_input)
 
-    except Exception as e:
-        return f"Erro ao processar entrada JSON: {e}"
+            # Extrair lista de produtos corretamente
+            if isinstance(products_input, dict) and 'products_input' in products_input:
+                records = products_input['products_input']
+            elif isinstance(products_input, list):
+                records = products_input
+            else:
+                return f"Erro: entrada nao reconhecida. Tipo: {type(products_input)}"
 
-    success_count = 0
-    errors = []
+        ids, failures = ingest_products(records)
 
-    for i, product in enumerate(products, 1):
-        try:
-            validated_product = ProductCreate(**product)
-            insert_products([validated_product.dict()])
-            success_count += 1
-        except ValidationError as ve:
-            errors.append(f"[{i}] Falha na validaçao: {ve}")
-        except Exception as e:
-            errors.append(f"[{i}] Erro ao inserir no banco: {e}")
+    except Exception as e:
+        return f"Erro ao processar entrada JSON: {e}"
 
-    result = f"{success_count} produtos inseridos com sucesso."
-    if errors:
+    result = f"{len(ids)} produtos inseridos com sucesso."
+    if len(set(ids)) < len(ids):
+        result += f" Registros repetidos (mesma platform/external_id) foram combinados em {len(set(ids))} produtos."
+    if failures:
+        errors = [f"[{i + 1}] {msg}" for i, msg in sorted(failures.items())]
         result += f"\n{len(errors)} produtos falharam:\n" + "\n".join(errors)
 
     return result
\ No newline at end of file
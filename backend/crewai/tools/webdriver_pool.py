@@ -0,0 +1,166 @@
+# backend/crewai/tools/webdriver_pool.py
+"""
+Pool de sessões Selenium (Chrome headless) reaproveitadas pelas ferramentas de leitura.
+
+Criar um WebDriver custa alguns segundos; aqui as sessões ficam abertas entre chamadas
+e são emprestadas e devolvidas. Antes de cada empréstimo a sessão passa por uma checagem
+de saúde, e é descartada quando cai ("invalid session id", Chrome encerrado) ou depois
+de SELENIUM_DRIVER_MAX_USES páginas. SELENIUM_POOL_SIZE limita as sessões simultâneas.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+SELENIUM_POOL_SIZE = int(os.environ.get("SELENIUM_POOL_SIZE", "2"))
+SELENIUM_DRIVER_MAX_USES = int(os.environ.get("SELENIUM_DRIVER_MAX_USES", "50"))
+SELENIUM_PAGE_LOAD_TIMEOUT = int(os.environ.get("SELENIUM_PAGE_LOAD_TIMEOUT", "30"))
+# Espera máxima pelo seletor depois do carregamento (o SeleniumScrapingTool dormia 3 s fixos)
+SELENIUM_WAIT_TIME = float(os.environ.get("SELENIUM_WAIT_TIME", "3"))
+
+
+class _PooledDriver:
+    """Sessão do Chrome com o contador de páginas servidas."""
+
+    def __init__(self):
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        self.driver = webdriver.Chrome(options=options)
+        self.driver.set_page_load_timeout(SELENIUM_PAGE_LOAD_TIMEOUT)
+        self.uses = 0
+
+    def is_healthy(self) -> bool:
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def reset(self) -> None:
+        # Sessão devolvida limpa: sem cookies da loja anterior
+        self.driver.delete_all_cookies()
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class WebDriverPool:
+    """
+    Empresta sessões Selenium já abertas, limitando as sessões simultâneas.
+    """
+
+    def __init__(self, size: int = SELENIUM_POOL_SIZE, max_uses: int = SELENIUM_DRIVER_MAX_USES):
+        self.max_uses = max_uses
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: "queue.LifoQueue[_PooledDriver]" = queue.LifoQueue()
+
+    def _acquire(self) -> _PooledDriver:
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                logger.debug("[webdriver_pool] Abrindo nova sessão do Chrome.")
+                return _PooledDriver()
+            if pooled.is_healthy():
+                return pooled
+            logger.debug("[webdriver_pool] Sessão ociosa caiu, descartando.")
+            pooled.quit()
+
+    def _release(self, pooled: _PooledDriver, broken: bool) -> None:
+        if broken or pooled.uses >= self.max_uses or not pooled.is_healthy():
+            logger.debug(f"[webdriver_pool] Reciclando sessão após {pooled.uses} usos.")
+            pooled.quit()
+            return
+        try:
+            pooled.reset()
+        except Exception:
+            pooled.quit()
+            return
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        """
+        Empresta um WebDriver; ele volta ao pool ao sair do bloco, ou é descartado
+        se a sessão tiver caído.
+        """
+        with self._slots:
+            pooled = self._acquire()
+            pooled.uses += 1
+            broken = False
+            try:
+                yield pooled.driver
+            except WebDriverException:
+                broken = not pooled.is_healthy()
+                raise
+            finally:
+                self._release(pooled, broken)
+
+    def close(self) -> None:
+        """Encerra todas as sessões ociosas."""
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[WebDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_webdriver_pool() -> WebDriverPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def scrape_elements(url: str, css_element: str = "", wait_time: float = SELENIUM_WAIT_TIME) -> str:
+    """
+    Abre `url` numa sessão do pool e devolve o texto dos elementos que casam com
+    `css_element` (ou do body inteiro), um por linha.
+    """
+    with get_webdriver_pool().driver() as driver:
+        driver.get(url)
+        selector = (css_element or "").strip()
+        try:
+            if selector:
+                WebDriverWait(driver, wait_time).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                )
+                return "\n".join(el.text for el in driver.find_elements(By.CSS_SELECTOR, selector))
+            WebDriverWait(driver, wait_time).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            if selector:
+                # Nenhum elemento apareceu a tempo: conteúdo vazio, como no SeleniumScrapingTool
+                return ""
+        return driver.find_element(By.TAG_NAME, "body").text
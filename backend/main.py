@@ -1,10 +1,37 @@
 # backend/main.py
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 
-from backend.api.endpoints import router
+from backend.startup import mark_ready, phase
 
-app = FastAPI()
+with phase("imports"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+
+    from backend.api.endpoints import router
+    from backend.crewai.db.session import dispose_async_engine, init_db
+    from backend.crewai.jobs import start_local_workers, stop_workers
+    from backend.crewai.metrics import render_metrics
+
+
+# Espera pelos jobs em execução no desligamento (JOB_EXECUTION=local)
+SHUTDOWN_WAIT_SECONDS = 5
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with phase("init_db"):
+        init_db()
+    with phase("workers"):
+        start_local_workers()
+    mark_ready()
+    yield
+    # Jobs ainda em execução voltam para a fila quando o lease expirar
+    stop_workers(timeout=SHUTDOWN_WAIT_SECONDS)
+    await dispose_async_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Libera acesso de todas as origens durante desenvolvimento
 app.add_middleware(
@@ -13,6 +40,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # cursor da próxima página e versão das listagens
 )
 
 app.include_router(router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Formato de texto do Prometheus: tempo, chamadas ao LLM, tokens e ferramentas por tarefa
+    return render_metrics()
@@ -0,0 +1,86 @@
+# backend/startup.py
+"""
+Medição do tempo de inicialização e carga sob demanda da camada de crews.
+
+Importar crewai, agentes, tarefas, Playwright e Selenium leva segundos; a API não
+precisa disso para responder /api/health ou /api/list. As crews só são importadas na
+primeira requisição (ou job) que precisa delas, por `load_crews()`, e cada fase fica
+registrada em `startup_report()` para que o custo de import seja visível.
+
+CREW_PRELOAD=1 carrega as crews numa thread logo depois do startup, sem atrasar a
+primeira resposta da API.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Iterator, Optional
+
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+PROCESS_START = time.perf_counter()
+CREW_PRELOAD = os.environ.get("CREW_PRELOAD", "0") == "1"
+
+_phases: Dict[str, float] = {}
+_ready_at: Optional[float] = None
+_crews: Optional[SimpleNamespace] = None
+_crews_lock = threading.Lock()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Mede uma fase da inicialização (em segundos)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = round(time.perf_counter() - start, 3)
+
+
+def mark_ready() -> None:
+    global _ready_at
+    _ready_at = time.perf_counter()
+    logger.info(
+        f"[startup] API pronta em {_ready_at - PROCESS_START:.3f}s "
+        f"(fases: {', '.join(f'{k}={v:.3f}s' for k, v in _phases.items())})"
+    )
+    if CREW_PRELOAD:
+        threading.Thread(target=load_crews, name="crew-preload", daemon=True).start()
+
+
+def uptime() -> float:
+    return round(time.perf_counter() - PROCESS_START, 3)
+
+
+def startup_report() -> Dict[str, object]:
+    return {
+        "ready_in": round(_ready_at - PROCESS_START, 3) if _ready_at is not None else None,
+        "phases": dict(_phases),
+        "crews_loaded": _crews is not None,
+    }
+
+
+def load_crews() -> SimpleNamespace:
+    """
+    Importa a camada de crews uma única vez e devolve os pontos de entrada.
+    """
+    global _crews
+    with _crews_lock:
+        if _crews is None:
+            with phase("crews"):
+                from backend.crewai.crew_products import scrape_store_products
+                from backend.crewai.crew_stores import discover_stores
+            logger.info(f"[startup] Camada de crews carregada em {_phases['crews']:.3f}s.")
+            _crews = SimpleNamespace(
+                discover_stores=discover_stores,
+                scrape_store_products=scrape_store_products,
+            )
+        return _crews
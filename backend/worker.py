@@ -0,0 +1,54 @@
+# backend/worker.py
+"""
+Worker da fila de jobs das crews.
+
+Com JOB_EXECUTION=queue a API só grava os jobs; cada processo deste módulo executa
+WORKER_CONCURRENCY jobs ao mesmo tempo, pegando-os da tabela crew_jobs com lease
+(ver backend/crewai/db/job_queue.py). Vários containers podem rodar este worker
+contra o mesmo banco:
+
+    python -m backend.worker
+
+SIGTERM/SIGINT param a busca de novos jobs e esperam os que estão em execução.
+"""
+
+import logging
+import os
+import signal
+import threading
+
+from backend.crewai.db.session import init_db
+from backend.crewai.jobs import CREW_MAX_WORKERS, start_workers, stop_workers
+# Importe o logger
+from backend.crewai.tools.debug_logger import setup_logger
+from backend.startup import load_crews
+
+# Configure o nível do logger
+LOG_LEVEL = logging.DEBUG  # Altere para logging.INFO para desativar debug
+logger = setup_logger(level=LOG_LEVEL)
+
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", str(CREW_MAX_WORKERS)))
+
+
+def main() -> None:
+    init_db()
+    # O worker só existe para executar crews: carrega a camada antes do primeiro job
+    load_crews()
+
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"[worker] Sinal {signum} recebido, encerrando após os jobs em execução.")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    start_workers(WORKER_CONCURRENCY)
+    logger.info(f"[worker] {WORKER_CONCURRENCY} workers aguardando jobs.")
+    stopping.wait()
+    stop_workers()
+
+
+if __name__ == "__main__":
+    main()
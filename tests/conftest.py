@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+# session.py exige DATABASE_URL no import; os testes usam os próprios engines
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    from sqlalchemy import create_engine
+
+    from backend.crewai.db.product_search import ensure_search_index
+    from backend.crewai.db.session import Base
+    from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                       crew_job_event, data_version, products,
+                                       store_selectors)
+
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def db(sqlite_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(sqlite_path, monkeypatch):
+    """
+    Rotas da API sobre o SQLite do teste, com os caches de resposta e de versões vazios.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from backend.api import endpoints
+    from backend.api.response_cache import response_cache
+    from backend.crewai.db import data_versions
+    from backend.crewai.db.session import get_async_db
+
+    # NullPool: o TestClient pode usar um event loop diferente a cada requisição
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", poolclass=NullPool)
+    factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def test_db():
+        async with factory() as session:
+            yield session
+
+    monkeypatch.setattr(data_versions, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(data_versions, "_cache", {})
+    response_cache.clear()
+
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    app.dependency_overrides[get_async_db] = test_db
+    with TestClient(app) as test_client:
+        yield test_client
+    response_cache.clear()
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai import Agent, Task  # noqa: E402
+
+from backend.crewai import agents, tasks  # noqa: E402
+from backend.crewai.llm_cache import CachedLLM  # noqa: E402
+
+
+def module_objects(module, kind):
+    return {name: obj for name, obj in vars(module).items() if isinstance(obj, kind)}
+
+
+@pytest.mark.parametrize("name,agent", sorted(module_objects(agents, Agent).items()))
+def test_every_agent_uses_the_cached_llm(name, agent):
+    # Task(llm=...) é ignorado pela crewai: vale o LLM do agente que executa a tarefa
+    assert isinstance(agent.llm, CachedLLM), name
+
+
+@pytest.mark.parametrize("name,task", sorted(module_objects(tasks, Task).items()))
+def test_every_task_runs_on_a_cached_agent(name, task):
+    assert task.agent is not None, name
+    assert isinstance(task.agent.llm, CachedLLM), f"{name} -> {task.agent.role}"
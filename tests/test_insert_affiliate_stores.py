@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.crewai.db.insert_affiliate_stores import bulk_upsert_stores
+from backend.crewai.db.session import Base
+from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                   crew_job_event, data_version, products,
+                                   store_selectors)
+from backend.crewai.models.affiliate_store import AffiliateStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def store(name, **overrides):
+    data = {"name": name, "platform": "loja", "url": f"https://{name}.example", "active": True}
+    data.update(overrides)
+    return data
+
+
+def test_bad_row_is_reported_and_the_rest_saved(db):
+    ids, errors = bulk_upsert_stores([store("a"), store("b", url=None), store("c")], db, chunk_size=10)
+
+    assert len(ids) == 2
+    assert list(errors) == [1]
+    assert {s.name for s in db.query(AffiliateStore).all()} == {"a", "c"}
+
+
+def test_rows_merged_by_key_are_all_counted(db):
+    ids, errors = bulk_upsert_stores([store("a", active=True), store("a", active=False), store("b")], db)
+
+    assert errors == {}
+    assert len(ids) == 3
+    assert ids[0] == ids[1] != ids[2]
+    assert db.query(AffiliateStore).filter_by(name="a").one().active is False
+
+
+def test_failed_batch_is_rolled_back_entirely(db, monkeypatch):
+    from backend.crewai.db import insert_affiliate_stores
+
+    def fail(name, db):
+        raise RuntimeError("falha depois dos upserts")
+
+    monkeypatch.setattr(insert_affiliate_stores, "bump_data_version", fail)
+    with pytest.raises(RuntimeError):
+        bulk_upsert_stores([store("a"), store("b")], db, chunk_size=1)
+
+    assert db.query(AffiliateStore).count() == 0
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.crewai.db.insert_product_list import bulk_upsert_products
+from backend.crewai.db.session import Base
+from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                   crew_job_event, data_version, products,
+                                   store_selectors)
+from backend.crewai.models.products import Product
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def product(external_id, **overrides):
+    data = {
+        "external_id": external_id,
+        "platform": "loja",
+        "title": f"Produto {external_id}",
+        "description": "",
+        "price": 10.0,
+        "product_url": f"https://loja.example/p/{external_id}",
+        "category": "casa",
+    }
+    data.update(overrides)
+    return data
+
+
+def test_upsert_round_trip(db):
+    ids = bulk_upsert_products([product("a"), product("b")], db)
+    assert len(ids) == 2
+
+    updated = bulk_upsert_products([product("a", price=8.5, affiliate_url=None), product("c")], db)
+
+    assert updated[0] == ids[0]
+    rows = {p.external_id: p for p in db.query(Product).all()}
+    assert set(rows) == {"a", "b", "c"}
+    assert float(rows["a"].price) == 8.5
+
+
+def test_upsert_keeps_affiliate_url_when_missing(db):
+    bulk_upsert_products([product("a", affiliate_url="https://afiliado.example/a")], db)
+    bulk_upsert_products([product("a", title="Novo título")], db)
+
+    row = db.query(Product).one()
+    assert row.title == "Novo título"
+    assert row.affiliate_url == "https://afiliado.example/a"
+
+
+def test_duplicates_in_one_batch_keep_the_last(db):
+    ids = bulk_upsert_products([product("a", price=1.0), product("a", price=2.0)], db)
+
+    assert ids == [ids[0], ids[0]]
+    assert float(db.query(Product).one().price) == 2.0
+
+
+def test_ids_follow_input_positions(db):
+    first = bulk_upsert_products([product("b"), product("c")], db)
+    ids = bulk_upsert_products([product("a"), product("c"), product("b"), product("a")], db, chunk_size=2)
+
+    by_external_id = {p.external_id: p.id for p in db.query(Product).all()}
+    assert ids == [by_external_id[e] for e in ("a", "c", "b", "a")]
+    assert ids[1:3] == first[::-1]
+
+
+def test_rows_without_external_id_are_rejected(db):
+    with pytest.raises(ValueError):
+        bulk_upsert_products([product("a"), product(None)], db)
+    assert db.query(Product).count() == 0
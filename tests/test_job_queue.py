@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.crewai.db import job_queue
+from backend.crewai.db.job_queue import (claim_job, complete_job, enqueue_job,
+                                         expire_exhausted_jobs, extend_lease,
+                                         fail_job)
+from backend.crewai.db.session import Base
+from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                   crew_job_event, data_version, products,
+                                   store_selectors)
+from backend.crewai.models.crew_job import CrewJob
+from backend.crewai.models.crew_job_event import CrewJobEvent
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    opened = []
+
+    def session():
+        # Cada worker usa a própria sessão, como em backend.worker
+        db = sessionmaker(bind=engine)()
+        opened.append(db)
+        return db
+
+    yield session
+    for db in opened:
+        db.close()
+    engine.dispose()
+
+
+def past():
+    return datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+def expire_lease(db, job_id):
+    db.execute(update(CrewJob).where(CrewJob.id == job_id).values(lease_expires_at=past()))
+    db.commit()
+
+
+def end_backoff(db, job_id):
+    db.execute(update(CrewJob).where(CrewJob.id == job_id).values(available_at=past()))
+    db.commit()
+
+
+def events(db, job_id):
+    return [(e.type, e.data) for e in db.query(CrewJobEvent).filter(CrewJobEvent.job_id == job_id).order_by(CrewJobEvent.id)]
+
+
+def test_two_workers_claim_one_job(sessions):
+    job = enqueue_job("products", {"loja": "x"}, sessions())
+
+    first = claim_job("worker-a", sessions())
+    second = claim_job("worker-b", sessions())
+
+    assert first.id == job.id
+    assert first.lease_owner == "worker-a"
+    assert first.attempts == 1
+    assert second is None
+
+
+def test_stale_owner_cannot_complete(sessions):
+    job = enqueue_job("products", {}, sessions())
+    claim_job("worker-a", sessions())
+    expire_lease(sessions(), job.id)
+    reclaimed = claim_job("worker-b", sessions())
+
+    assert reclaimed.lease_owner == "worker-b"
+    assert extend_lease(job.id, "worker-a", sessions()) is False
+    assert complete_job(job.id, "worker-a", {"de": "a"}, sessions()) is False
+    assert complete_job(job.id, "worker-b", {"de": "b"}, sessions()) is True
+
+    db = sessions()
+    stored = db.get(CrewJob, job.id)
+    assert stored.status == "succeeded"
+    assert stored.result == {"de": "b"}
+    assert events(db, job.id) == [("job_finished", {"status": "succeeded", "error": None})]
+
+
+def test_retry_then_fail_after_max_attempts(sessions):
+    job = enqueue_job("products", {}, sessions(), max_attempts=2)
+
+    claim_job("worker-a", sessions())
+    assert fail_job(job.id, "worker-a", "falhou 1", sessions()) == "queued"
+    # Ainda no backoff
+    assert claim_job("worker-a", sessions()) is None
+
+    end_backoff(sessions(), job.id)
+    retried = claim_job("worker-b", sessions())
+    assert retried.attempts == 2
+    assert fail_job(job.id, "worker-b", "falhou 2", sessions()) == "failed"
+    assert fail_job(job.id, "worker-b", "de novo", sessions()) is None
+
+    db = sessions()
+    stored = db.get(CrewJob, job.id)
+    assert stored.status == "failed"
+    assert stored.error == "falhou 2"
+    assert claim_job("worker-c", db) is None
+    assert events(db, job.id) == [
+        ("job_retry", {"attempt": 1, "error": "falhou 1"}),
+        ("job_finished", {"status": "failed", "error": "falhou 2"}),
+    ]
+
+
+def test_backoff_doubles_per_attempt(sessions, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_RETRY_BACKOFF", 100)
+    job = enqueue_job("products", {}, sessions(), max_attempts=3)
+
+    delays = []
+    for attempt in (1, 2):
+        assert claim_job("worker-a", sessions()).attempts == attempt
+        assert fail_job(job.id, "worker-a", "erro", sessions()) == "queued"
+        # O SQLite devolve as datas sem fuso (em UTC)
+        available_at = sessions().get(CrewJob, job.id).available_at.replace(tzinfo=timezone.utc)
+        delays.append((available_at - datetime.now(timezone.utc)).total_seconds())
+        end_backoff(sessions(), job.id)
+
+    assert delays[0] == pytest.approx(100, abs=5)
+    assert delays[1] == pytest.approx(200, abs=5)
+
+
+def test_expired_lease_is_reclaimed(sessions):
+    job = enqueue_job("products", {}, sessions())
+    claim_job("worker-a", sessions())
+    assert claim_job("worker-b", sessions()) is None
+
+    expire_lease(sessions(), job.id)
+    reclaimed = claim_job("worker-b", sessions())
+
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-b"
+    assert reclaimed.attempts == 2
+
+
+def test_running_job_without_lease_is_reclaimed(sessions):
+    db = sessions()
+    db.add(CrewJob(id="antigo", kind="products", params={}, status="running", attempts=1, max_attempts=3))
+    db.commit()
+
+    assert claim_job("worker-a", sessions()).id == "antigo"
+
+
+def test_exhausted_expired_lease_fails_the_job(sessions):
+    job = enqueue_job("products", {}, sessions(), max_attempts=1)
+    claim_job("worker-a", sessions())
+    expire_lease(sessions(), job.id)
+
+    assert claim_job("worker-b", sessions()) is None
+    assert expire_exhausted_jobs(sessions()) == 1
+    assert expire_exhausted_jobs(sessions()) == 0
+
+    db = sessions()
+    assert db.get(CrewJob, job.id).status == "failed"
+    assert [t for t, _ in events(db, job.id)] == ["job_finished"]
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from backend.crewai.db.insert_affiliate_stores import bulk_upsert_stores
+from backend.crewai.db.listing import (_cursor_created_at, decode_cursor,
+                                       encode_cursor, list_stores)
+from backend.crewai.models.affiliate_store import AffiliateStore
+
+
+def stores(count):
+    return [{"name": f"Loja {i}", "platform": "shopee", "url": f"https://loja{i}.example"} for i in range(count)]
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+    cursor = encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "nao-e-base64!", encode_cursor(datetime(2025, 1, 1), 1)[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("created_at,expected", [
+    (datetime(2025, 5, 1, 12, 30, 15), "2025-05-01 12:30:15"),
+    (datetime(2025, 5, 1, 12, 30, 15, 5000), "2025-05-01 12:30:15.005000"),
+])
+def test_sqlite_cursor_uses_the_stored_text_format(db, created_at, expected):
+    assert db.execute(select(_cursor_created_at(db, created_at))).scalar() == expected
+
+
+def test_cursor_walks_rows_created_in_the_same_second(db):
+    # CURRENT_TIMESTAMP do SQLite não tem frações: todas as lojas empatam em created_at
+    bulk_upsert_stores(stores(7), db)
+
+    seen, cursor = [], None
+    for _ in range(5):
+        rows, cursor = list_stores(db, fields="id,name", cursor=cursor, limit=3)
+        seen.extend(row["id"] for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == sorted((s.id for s in db.query(AffiliateStore).all()), reverse=True)
+
+
+def test_skip_and_cursor_are_exclusive(db):
+    bulk_upsert_stores(stores(3), db)
+    _, cursor = list_stores(db, limit=1)
+
+    with pytest.raises(ValueError):
+        list_stores(db, cursor=cursor, skip=1)
+
+
+def test_list_endpoint_pages_with_skip_and_cursor(client, db):
+    bulk_upsert_stores(stores(4), db)
+
+    first = client.get("/api/list", params={"limit": 2})
+    skipped = client.get("/api/list", params={"limit": 2, "skip": 2})
+    following = client.get("/api/list", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    both = client.get("/api/list", params={"cursor": first.headers["X-Next-Cursor"], "skip": 1})
+
+    assert first.status_code == skipped.status_code == following.status_code == 200
+    assert skipped.json() == following.json()
+    assert len({s["id"] for s in first.json() + following.json()}) == 4
+    assert both.status_code == 400
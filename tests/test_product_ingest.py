@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.crewai import product_ingest
+from backend.crewai.db.session import Base
+from backend.crewai.models import (affiliate_store, crew_job,  # noqa: F401
+                                   crew_job_event, data_version, products,
+                                   store_selectors)
+from backend.crewai.models.products import Product
+from backend.crewai.product_ingest import ingest_products, iter_json_records
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(product_ingest, "SessionLocal", Session)
+    session = Session()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def product(external_id, **overrides):
+    data = {
+        "external_id": external_id,
+        "platform": "loja",
+        "title": f"Produto {external_id}",
+        "description": "",
+        "price": 10.0,
+        "product_url": f"https://loja.example/p/{external_id}",
+        "category": "casa",
+    }
+    data.update(overrides)
+    return data
+
+
+def test_read_error_keeps_committed_chunks(db, tmp_path):
+    path = tmp_path / "produtos.jsonl"
+    lines = [json.dumps(product(e)) for e in ("a", "b", "c")] + ["{quebrado", json.dumps(product("d"))]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    ids, errors = ingest_products(iter_json_records(str(path)), chunk_size=2)
+
+    assert len(ids) == 3
+    assert list(errors) == [3]
+    assert errors[3].startswith("Erro ao ler a entrada")
+    assert {p.external_id for p in db.query(Product).all()} == {"a", "b", "c"}
+
+
+def test_counts_follow_input_positions(db):
+    records = [product("a"), product("b", price="barato"), product("a", price=2.0), product("c")]
+
+    ids, errors = ingest_products(records, chunk_size=10)
+
+    assert list(errors) == [1]
+    assert len(ids) == 3
+    assert ids[0] == ids[1]
+    assert db.query(Product).count() == 2
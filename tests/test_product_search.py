@@ -0,0 +1,65 @@
+from sqlalchemy import text
+
+from backend.crewai.db.insert_product_list import bulk_upsert_products
+from backend.crewai.db.product_search import search_products
+from backend.crewai.models.products import Product
+
+
+def product(external_id, title, **overrides):
+    data = {
+        "external_id": external_id,
+        "platform": "loja",
+        "title": title,
+        "description": "",
+        "price": 10.0,
+        "product_url": f"https://loja.example/p/{external_id}",
+    }
+    data.update(overrides)
+    return data
+
+
+def titles(db, q, **filters):
+    return [row["title"] for row in search_products(q, db, fields="title", **filters)]
+
+
+def test_upsert_keeps_the_fts_index_in_sync(db):
+    bulk_upsert_products([product("a", "Cafeteira elétrica"), product("b", "Jogo de panelas")], db)
+    assert titles(db, "cafeteira") == ["Cafeteira elétrica"]
+
+    # O ON CONFLICT DO UPDATE dispara o gatilho de UPDATE do FTS5
+    bulk_upsert_products([product("a", "Chaleira elétrica")], db)
+
+    assert titles(db, "cafeteira") == []
+    assert titles(db, "chaleira") == ["Chaleira elétrica"]
+    assert db.execute(text("SELECT count(*) FROM products_fts")).scalar() == 2
+
+
+def test_delete_removes_from_the_index(db):
+    bulk_upsert_products([product("a", "Cafeteira elétrica")], db)
+    db.query(Product).delete()
+    db.commit()
+
+    assert titles(db, "cafeteira") == []
+
+
+def test_title_ranks_above_description(db):
+    bulk_upsert_products([
+        product("a", "Jogo de panelas", description="acompanha cafeteira"),
+        product("b", "Cafeteira italiana"),
+    ], db)
+
+    assert titles(db, "cafeteira") == ["Cafeteira italiana", "Jogo de panelas"]
+    assert titles(db, "italia") == ["Cafeteira italiana"]
+    assert titles(db, "cafe", platform="outra") == []
+
+
+def test_search_endpoint(client, db):
+    bulk_upsert_products([product("a", "Cafeteira elétrica", brand="Marca")], db)
+
+    found = client.get("/api/products/search", params={"q": "eletrica marca", "fields": "title"})
+    bad_field = client.get("/api/products/search", params={"q": "cafeteira", "fields": "senha"})
+
+    assert found.status_code == 200
+    assert [p["title"] for p in found.json()] == ["Cafeteira elétrica"]
+    assert found.json()[0]["score"] > 0
+    assert bad_field.status_code == 400
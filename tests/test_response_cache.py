@@ -0,0 +1,57 @@
+from backend.api.response_cache import response_cache
+from backend.crewai.db.data_versions import bump_data_version
+from backend.crewai.db.insert_affiliate_stores import bulk_upsert_stores
+
+
+def store(name):
+    return {"name": name, "platform": "shopee", "url": f"https://{name}.example"}
+
+
+def test_etag_answers_304_and_reuses_the_body(client, db):
+    bulk_upsert_stores([store("a")], db)
+
+    first = client.get("/api/list")
+    again = client.get("/api/list")
+    revalidated = client.get("/api/list", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == again.status_code == 200
+    assert again.content == first.content
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert response_cache.stats()["hits"] == 1
+    assert response_cache.stats()["not_modified"] == 1
+
+
+def test_query_strings_get_their_own_etag(client):
+    plain = client.get("/api/list", params={"platform": "a", "active": "true"})
+    encoded = client.get("/api/list", params={"platform": "a&active=true"})
+
+    assert plain.headers["ETag"] != encoded.headers["ETag"]
+
+
+def test_commit_invalidates_immediately(client, db):
+    bulk_upsert_stores([store("a")], db)
+    before = client.get("/api/list")
+
+    # Dentro de DATA_VERSION_TTL: só a invalidação no commit faz a versão nova aparecer
+    bulk_upsert_stores([store("b")], db)
+    after = client.get("/api/list", headers={"If-None-Match": before.headers["ETag"]})
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert {s["name"] for s in after.json()} == {"a", "b"}
+
+
+def test_uncommitted_bump_keeps_the_version(client, db):
+    before = client.get("/api/list").headers["ETag"]
+
+    bump_data_version("stores", db)
+    during = client.get("/api/list").headers["ETag"]
+    db.rollback()
+    after_rollback = client.get("/api/list").headers["ETag"]
+    bump_data_version("stores", db)
+    db.commit()
+    after_commit = client.get("/api/list").headers["ETag"]
+
+    assert before == during == after_rollback
+    assert after_commit != before